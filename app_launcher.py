@@ -1,11 +1,27 @@
 import argparse
 
-from dashboard.ariadne_dashboard import launch
+from backend.memory_accounting import DEFAULT_MEMORY_BUDGETS
+from dashboard.ariadne_dashboard import launch, DEFAULT_SYSTEM
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Ariadne Dashboard launcher')
     parser.add_argument('-d', dest='debug', type=bool, default=False, help='launch dashboard in debug mode')
+    parser.add_argument('--system', dest='system', type=str, default=DEFAULT_SYSTEM,
+                        help=f'hybrid system to load, as a module:factory pair (default: {DEFAULT_SYSTEM})')
+    parser.add_argument('--max-wall-time', dest='wall_seconds', type=float, default=None,
+                        help='default wall-clock budget of an evolution, in seconds (default: unlimited)')
+    parser.add_argument('--max-rss-mb', dest='max_rss_mb', type=float, default=None,
+                        help='default memory budget of an evolution, in MB (default: unlimited)')
+    parser.add_argument('--max-enclosures', dest='max_enclosures', type=int, default=None,
+                        help='default maximum number of enclosures of an evolution (default: unlimited)')
+    parser.add_argument('--max-cache-mb', dest='max_cache_mb', type=float, default=DEFAULT_MEMORY_BUDGETS['max_cache_mb'],
+                        help=f'memory budget of the cached projections, in MB (default: {DEFAULT_MEMORY_BUDGETS["max_cache_mb"]})')
+    parser.add_argument('--release-orbit', dest='release_orbit', action='store_true',
+                        help='release the orbit held by the worker once its projections are extracted')
+    parser.add_argument('--trace-memory', dest='trace_memory', action='store_true',
+                        help='trace the Python allocations, reported in the memory panel (slower)')
     # parser.add_argument('-p', dest='savepath', type=str, default='.', help='savepath for orbit dumps')
     
     args = parser.parse_args()
-    launch(args.debug)
+    launch(args.debug, args.system, {'wall_seconds': args.wall_seconds, 'max_rss_mb': args.max_rss_mb, 'max_enclosures': args.max_enclosures},
+           {'max_cache_mb': args.max_cache_mb, 'release_orbit': args.release_orbit}, args.trace_memory)
@@ -0,0 +1,89 @@
+import hashlib
+import inspect
+import json
+import os
+import sys
+from importlib import metadata
+
+CACHE_DIRECTORY = '.ariadne_cache'
+CACHE_FORMAT = 1
+
+
+def _pyariadne_version():
+    try:
+        return metadata.version('pyariadne')
+    except metadata.PackageNotFoundError:
+        # pyariadne is usually built from source rather than installed as a distribution
+        return str(getattr(sys.modules.get('pyariadne'), '__version__', 'unknown'))
+
+
+def cache_key(module, factory_name):
+    """
+    Compute the key identifying the analysis of the system built by `module.factory_name()`: the analysis is valid as long as neither the source of the
+    system module nor the pyariadne version change. Modules building different systems depending on something else (e.g. the environment) must
+    define a `cache_parameters()` function, returning the JSON-serializable parameters the system depends on, which are part of the key too.
+    
+    :param module: the (already imported) module defining the system
+    :param factory_name: the name of the function building the system
+    :return: a string key, safe to be used as file name
+    """
+    
+    with open(inspect.getsourcefile(module), 'rb') as source:
+        digest = hashlib.sha256(source.read())
+    digest.update(f'{factory_name}|{_pyariadne_version()}|{CACHE_FORMAT}'.encode())
+    if hasattr(module, 'cache_parameters'):
+        digest.update(json.dumps(module.cache_parameters(), sort_keys=True).encode())
+    return f'{module.__name__}-{factory_name}-{digest.hexdigest()[:16]}'
+
+
+def stringify_analysis(automaton_analysis):
+    """
+    Convert the pyariadne objects of an automaton analysis (assignments, functions, predicates) to their string representation, making it serializable.
+    
+    :param automaton_analysis: the analysis of an automaton obtained by the `analyze_automaton(*)` method
+    :return: the same analysis, with strings (or lists of strings) in place of the pyariadne objects
+    """
+    
+    def stringify(value):
+        if value is None or isinstance(value, str):
+            return value
+        if isinstance(value, dict):
+            return {k: stringify(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            # pybind11 converts the lists of assignments to Python lists
+            return [stringify(v) for v in value]
+        return str(value)
+    
+    return stringify(automaton_analysis)
+
+
+def load_analysis(key, directory=CACHE_DIRECTORY):
+    """
+    :param key: the key obtained via `cache_key(*)`
+    :param directory: the cache directory
+    :return: the cached analysis as saved by `save_analysis(*)`, or None if missing or unreadable
+    """
+    
+    path = os.path.join(directory, f'{key}.json')
+    try:
+        with open(path) as cache_file:
+            cached = json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+    return cached if cached.get('key') == key else None
+
+
+def save_analysis(key, analysis, directory=CACHE_DIRECTORY):
+    """
+    Persist the analysis of a system; the write is atomic, so concurrent dashboards never read a partial file.
+    
+    :param key: the key obtained via `cache_key(*)`
+    :param analysis: a JSON-serializable dictionary
+    :param directory: the cache directory
+    """
+    
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'{key}.json')
+    with open(f'{path}.tmp', 'w') as cache_file:
+        json.dump(dict(analysis, key=key), cache_file)
+    os.replace(f'{path}.tmp', path)
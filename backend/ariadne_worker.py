@@ -0,0 +1,446 @@
+import itertools
+import multiprocessing
+import time
+import traceback
+from concurrent.futures import Future
+from threading import Condition, Lock, Thread
+
+from backend.shared_frames import load_shared_dataframe, share_dataframe
+
+# requests answered right away by the worker, even while a long pyariadne call (e.g. the evolution) is running
+_IMMEDIATE_METHODS = {'ping', 'telemetry_summary', 'telemetry_snapshot', 'memory_report'}
+
+
+class WorkerCrashed(RuntimeError):
+    """
+    The worker process died while (or before) answering a request; the worker is restarted, but everything it held (e.g. the orbit) is lost.
+    """
+
+
+class WorkerKilled(WorkerCrashed):
+    """
+    The worker process was deliberately killed (e.g. because a resource budget was exceeded) while answering a request; it's restarted as well.
+    """
+
+
+class WorkerError(RuntimeError):
+    """
+    The request raised an exception inside the worker process, which is still alive.
+    """
+
+
+class _AriadneService(object):
+    """
+    The pyariadne side of the worker: it owns the system and the orbits, and answers with plain Python objects or dataframes.
+    """
+    
+    def __init__(self, system_spec):
+        from backend.systems_loader import parse_system_spec
+        
+        self.system_spec = system_spec
+        self.module, self.factory_name = parse_system_spec(system_spec)
+        self.system = getattr(self.module, self.factory_name)()
+        self.orbit = None
+        self.preview_orbits = None
+        self.telemetry = None
+        # the projection store of the orbit, for the projections extracted last
+        self._store = None
+        self._store_projections = None
+        self._activity = None
+    
+    def ping(self):
+        return True
+    
+    def analysis(self):
+        from backend.analysis_cache import cache_key, load_analysis, save_analysis, stringify_analysis
+        from backend.plotting_backend import analyze_automaton, build_cytoscape_graph, get_all_variables, layout_cytoscape_graph
+        
+        # the analysis only depends on the system module, so it's reused across restarts when possible
+        key = cache_key(self.module, self.factory_name)
+        cached = load_analysis(key)
+        if cached is None:
+            # only the textual representation of the pyariadne objects is used, which can also be cached
+            automatons_analysis = {}
+            for automaton in self.system:
+                automaton_info = stringify_analysis(analyze_automaton(automaton))
+                automatons_analysis[automaton_info['name']] = automaton_info
+            cached = {
+                'variables': get_all_variables(self.system),
+                'analysis': automatons_analysis,
+                'graphs': {
+                    automaton_name: layout_cytoscape_graph(build_cytoscape_graph(automaton_info))
+                    for automaton_name, automaton_info in automatons_analysis.items()
+                }
+            }
+            save_analysis(key, cached)
+        return dict(cached, key=key)
+    
+    def simulate(self, locations, points, final_time, max_transitions, step_size):
+        import pyariadne as ari
+        from backend.initial_sets import make_initial_set
+        
+        simulator = ari.HybridSimulator(self.system)
+        simulator.configuration().set_step_size(step_size)
+        termination = ari.HybridTerminationCriterion(ari.HybridTime(ari.dec(float(final_time)), int(max_transitions)))
+        self.preview_orbits = [simulator.orbit(make_initial_set(locations, point), termination) for point in points]
+        return len(self.preview_orbits)
+    
+    def evolve(self, locations, values, final_time, max_transitions, evolver_settings=None, strict_bounds=None):
+        import pyariadne as ari
+        from backend.evolution_telemetry import EvolutionTelemetry, capture_native_output, enable_evolver_logging
+        from backend.evolver_tuning import configure_evolver
+        from backend.initial_sets import make_initial_set
+        
+        self.orbit = None
+        self._store, self._store_projections = None, None
+        self._activity = None
+        evolver = ari.GeneralHybridEvolver(self.system)
+        settings = configure_evolver(evolver, evolver_settings)
+        self.telemetry = EvolutionTelemetry(settings['maximum_enclosure_radius'])
+        initial_set = make_initial_set(locations, values, strict_bounds)
+        termination = ari.HybridTerminationCriterion(ari.HybridTime(ari.dec(float(final_time)), int(max_transitions)))
+        self.telemetry.log_available = enable_evolver_logging(ari, evolver)
+        if not self.telemetry.log_available:
+            self.orbit = evolver.orbit(initial_set, termination, ari.Semantics.UPPER)
+        else:
+            # the evolver log is the only progress information we can get while `orbit()` is running; the caller holds the pyariadne lock, so
+            # nothing else is written by the library meanwhile
+            with capture_native_output(self.telemetry.update_from_log):
+                self.orbit = evolver.orbit(initial_set, termination, ari.Semantics.UPPER)
+            enable_evolver_logging(ari, evolver, verbosity=0)
+        return True
+    
+    def telemetry_summary(self, final_time=None):
+        return self.telemetry.summary(final_time) if self.telemetry is not None else ''
+    
+    def telemetry_snapshot(self):
+        return self.telemetry.snapshot() if self.telemetry is not None else None
+    
+    def projections(self, var_list, collapse=False, source='orbit'):
+        from backend.arrow_export import requested_projections
+        from backend.plotting_backend import orbit_to_dataframe
+        
+        if source == 'orbit' and self._store is not None:
+            # e.g. after the scatter matrix, every pair is already projected; the (x, y) and (y, x) polytopes are the same
+            swapped = var_list[::-1] if len(var_list) == 2 else var_list
+            for variables in (var_list, swapped):
+                if set(requested_projections(variables)) <= set(self._store_projections):
+                    return self._store.to_dataframe(list(variables), collapse)
+        orbit_reach = self.orbit.reach() if source == 'orbit' else self.preview_orbits
+        if orbit_reach is None:
+            raise ValueError(f'no {source} available')
+        return orbit_to_dataframe(orbit_reach=orbit_reach, var_list=var_list, collapse=collapse)
+    
+    def store_table(self, projections, table):
+        from backend.projection_store import ProjectionStore, extract_projection_store
+        
+        if self.orbit is None:
+            raise ValueError('no orbit available')
+        projections = [tuple(projection) for projection in projections]
+        # both tables of the same store are usually requested one after the other, and a store with more projections serves fewer ones too
+        if self._store is None or not set(projections) <= set(self._store_projections):
+            self._store = extract_projection_store(self.orbit.reach(), projections)
+            self._store_projections = projections
+        if table == 'vertices' and set(projections) != set(self._store_projections):
+            # only the requested projections, even when served by a larger store
+            vertices = self._store.vertices
+            return vertices[vertices['_projection'].isin([ProjectionStore.projection_name(*projection) for projection in projections])]
+        return getattr(self._store, table)
+    
+    def orbit_activity(self):
+        from backend.orbit_activity import aggregate_activity, extract_enclosure_table
+        
+        if self.orbit is None:
+            raise ValueError('no orbit available')
+        # kept along with the orbit, since it's requested again whenever the automaton graph changes
+        if self._activity is None:
+            self._activity = aggregate_activity(extract_enclosure_table(self.orbit))
+        return self._activity
+    
+    def orbit_boxes(self, var_list):
+        from backend.property_checker import extract_orbit_boxes
+        
+        if self.orbit is None:
+            raise ValueError('no orbit available')
+        return extract_orbit_boxes(self.orbit, var_list)
+    
+    def bounding_boxes(self, var_list):
+        from backend.projection_store import extract_bounding_boxes
+        
+        if self.orbit is None:
+            raise ValueError('no orbit available')
+        return extract_bounding_boxes(self.orbit.reach(), var_list)
+    
+    def release_orbit(self, preview=False):
+        import gc
+        
+        # the dashboard keeps what it extracted, the pyariadne objects are only freed once nothing references them
+        self.orbit = None
+        self._store, self._store_projections = None, None
+        self._activity = None
+        if preview:
+            self.preview_orbits = None
+            self.telemetry = None
+        gc.collect()
+        return True
+    
+    def memory_report(self):
+        from backend.memory_accounting import estimate_size
+        
+        # the pyariadne objects are native, so only their presence is reported: their memory shows up in the RSS of the worker
+        return {
+            'orbit_held': self.orbit is not None,
+            'preview_orbits': len(self.preview_orbits) if self.preview_orbits is not None else 0,
+            'artifacts': {
+                'projection store': estimate_size(self._store) / 2 ** 20,
+                'orbit activity': estimate_size(self._activity) / 2 ** 20
+            }
+        }
+
+
+def _worker_main(connection, system_spec):
+    import pandas as pd
+    from backend.evolution_telemetry import separate_python_output
+    
+    # the standard descriptors are captured during the evolution (see `capture_native_output(*)`), which must only get the evolver log, while the
+    # diagnostics of the worker (e.g. the tracebacks of the other threads) must remain visible
+    separate_python_output()
+    send_lock, ariadne_lock = Lock(), Lock()
+    
+    def respond(request_id, method, kwargs):
+        try:
+            if method in _IMMEDIATE_METHODS:
+                result = getattr(service, method)(**kwargs)
+            else:
+                # pyariadne is not meant to be used by several threads at once
+                with ariadne_lock:
+                    result = getattr(service, method)(**kwargs)
+            # dataframes travel through shared memory, everything else is pickled
+            response = (request_id, 'frame', share_dataframe(result)) if isinstance(result, pd.DataFrame) else (request_id, 'value', result)
+        except Exception as ex:
+            response = (request_id, 'error', f'{ex}\n{traceback.format_exc()}')
+        with send_lock:
+            connection.send(response)
+    
+    try:
+        service = _AriadneService(system_spec)
+    except Exception as ex:
+        connection.send((None, 'error', f'{ex}\n{traceback.format_exc()}'))
+        return
+    connection.send((None, 'value', 'ready'))
+    
+    while True:
+        try:
+            request_id, method, kwargs = connection.recv()
+        except EOFError:
+            # the web process is gone
+            return
+        if method == 'shutdown':
+            return
+        if method in _IMMEDIATE_METHODS:
+            respond(request_id, method, kwargs)
+        else:
+            Thread(target=respond, args=(request_id, method, kwargs), daemon=True).start()
+
+
+class AriadneWorker(object):
+    """
+    Supervisor of the process owning every pyariadne object, so that the web process never imports pyariadne and survives its crashes.
+    
+    Requests are sent over a pipe and answered asynchronously, dataframes being passed through shared memory. If the process dies, the pending
+    requests fail with `WorkerCrashed` and a new process is started (at most `max_restarts` times); the `generation` counter tells whether the state
+    of the worker (e.g. an orbit) was lost since a given moment.
+    """
+    
+    def __init__(self, system_spec, max_restarts=5, start_timeout=None):
+        self.system_spec = system_spec
+        self.max_restarts = max_restarts
+        self.start_timeout = start_timeout
+        self.generation = 0
+        self.restarts = 0
+        self.last_crash = None
+        self._context = multiprocessing.get_context('spawn')
+        self._process = None
+        self._connection = None
+        self._send_lock = Lock()
+        self._pending = {}
+        self._pending_lock = Lock()
+        self._ids = itertools.count(1)
+        self._stopping = False
+        self._kill_reason = None
+        # notified whenever a process is started, or given up on
+        self._started = Condition()
+    
+    def start(self):
+        """
+        Start the worker process and wait until the system is built.
+        """
+        
+        parent_connection, child_connection = self._context.Pipe()
+        self._process = self._context.Process(target=_worker_main, args=(child_connection, self.system_spec), daemon=True)
+        self._process.start()
+        child_connection.close()
+        if self.start_timeout is not None and not parent_connection.poll(self.start_timeout):
+            self._process.kill()
+            raise WorkerCrashed(f'the worker did not start within {self.start_timeout}s')
+        try:
+            _, status, payload = parent_connection.recv()
+        except EOFError:
+            self._process.join()
+            raise WorkerCrashed(f'the worker died while loading the system (exit code {self._process.exitcode})')
+        if status == 'error':
+            self._process.join()
+            raise WorkerError(payload)
+        self._connection = parent_connection
+        self.generation += 1
+        Thread(target=self._read_responses, args=(parent_connection, self.generation), daemon=True).start()
+        with self._started:
+            self._started.notify_all()
+        return self
+    
+    def _read_responses(self, connection, generation):
+        while True:
+            try:
+                request_id, status, payload = connection.recv()
+            except (EOFError, OSError):
+                break
+            with self._pending_lock:
+                future = self._pending.pop(request_id, None)
+            if future is None:
+                # nobody is waiting anymore, just release the shared memory
+                if status == 'frame':
+                    load_shared_dataframe(payload)
+                continue
+            if status == 'frame':
+                future.set_result(load_shared_dataframe(payload))
+            elif status == 'error':
+                future.set_exception(WorkerError(payload))
+            else:
+                future.set_result(payload)
+        
+        if self._stopping or generation != self.generation:
+            return
+        self._process.join()
+        killed, self._kill_reason = self._kill_reason, None
+        if killed is not None:
+            self.last_crash = f'the worker process was killed: {killed}'
+        else:
+            self.last_crash = f'the worker process died with exit code {self._process.exitcode}'
+        print(f'WARNING: {self.last_crash}, restarting it')
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(WorkerKilled(killed) if killed is not None else WorkerCrashed(self.last_crash))
+        # deliberate kills are not crashes, so they don't count towards the restarts limit
+        self._restart(count=killed is None)
+    
+    def _restart(self, count=True):
+        if count and self.restarts >= self.max_restarts:
+            print(f'ERROR: the worker crashed {self.restarts + 1} times, giving up')
+            self._give_up()
+            return
+        if count:
+            self.restarts += 1
+        try:
+            self.start()
+        except Exception as ex:
+            print(f'ERROR: cannot restart the worker: {ex}')
+            self._give_up()
+    
+    def _give_up(self):
+        with self._started:
+            self._connection = None
+            self._started.notify_all()
+    
+    def wait_restarted(self, generation, timeout=None):
+        """
+        Wait until the process of the given generation is replaced, e.g. after a crash or a kill: the old pipe is kept until then, so requests
+        sent meanwhile would just fail.
+        
+        :param generation: the generation of the dead process
+        :param timeout: optional, the maximum time to wait, in seconds
+        :return: True if a newer process is running
+        """
+        
+        with self._started:
+            self._started.wait_for(lambda: self.generation > generation or self._connection is None, timeout)
+        return self.generation > generation and self._connection is not None
+    
+    def is_alive(self):
+        return self._connection is not None and self._process is not None and self._process.is_alive()
+    
+    @property
+    def pid(self):
+        return self._process.pid if self._process is not None else None
+    
+    def kill(self, reason):
+        """
+        Kill the worker process, e.g. to stop a runaway computation; the pending requests fail with `WorkerKilled` and the process is restarted.
+        
+        :param reason: the reason of the kill, reported by the failed requests
+        """
+        
+        if self._process is None or not self._process.is_alive():
+            return
+        self._kill_reason = reason
+        self._process.kill()
+    
+    def submit(self, method, **kwargs):
+        """
+        Send a request to the worker.
+        
+        :param method: the name of the `_AriadneService` method to call
+        :param kwargs: its (picklable) arguments
+        :return: a future of the result
+        """
+        
+        future = Future()
+        if self._connection is None:
+            future.set_exception(WorkerCrashed(self.last_crash or 'the worker is not running'))
+            return future
+        request_id = next(self._ids)
+        with self._pending_lock:
+            self._pending[request_id] = future
+        try:
+            with self._send_lock:
+                self._connection.send((request_id, method, kwargs))
+        except (OSError, ValueError) as ex:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+            future.set_exception(WorkerCrashed(f'{ex}'))
+        return future
+    
+    def call(self, method, timeout=None, **kwargs):
+        """
+        Send a request to the worker and wait for its result.
+        
+        :raise WorkerCrashed: if the worker died meanwhile
+        :raise WorkerError: if the request failed inside the worker
+        """
+        
+        return self.submit(method, **kwargs).result(timeout)
+    
+    def stop(self, timeout=5):
+        self._stopping = True
+        if self._connection is not None:
+            try:
+                with self._send_lock:
+                    self._connection.send((0, 'shutdown', {}))
+            except (OSError, ValueError):
+                pass
+        if self._process is not None:
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.kill()
+        self._connection = None
+
+
+def start_worker(system_spec, **kwargs):
+    """
+    :return: a started `AriadneWorker` for the given system factory, in the `package.module:factory` format
+    """
+    
+    started = time.perf_counter()
+    worker = AriadneWorker(system_spec, **kwargs).start()
+    print(f'Ariadne worker started in {time.perf_counter() - started:.2f}s')
+    return worker
@@ -0,0 +1,73 @@
+import io
+
+ARROW_STREAM_MIMETYPE = 'application/vnd.apache.arrow.stream'
+GEOMETRY_TABLES = ('polytopes', 'vertices')
+
+
+def requested_projections(variables):
+    """
+    :param variables: the requested variables, as in `ProjectionStore.to_dataframe(*)`
+    :return: the (x, y) projection when two state variables are requested, otherwise the (t, var) projection of each variable
+    """
+    
+    state_vars = [var for var in dict.fromkeys(variables) if var != 't']
+    if len(state_vars) == 2 and 't' not in variables:
+        return [tuple(state_vars)]
+    return [('t', var) for var in state_vars]
+
+
+def select_geometry(store, projections, time_window=None):
+    """
+    Select the part of a store to export: the given projections of the polytopes overlapping the time window.
+    
+    :param store: the `ProjectionStore`
+    :param projections: the list of (x, y) projections
+    :param time_window: optional, the (first, last) time (either can be None)
+    :return: the polytopes and the vertices dataframes
+    """
+    
+    polytopes = store.polytopes
+    if time_window is not None:
+        first, last = time_window
+        overlapping = polytopes['_time'].notna()
+        if first is not None:
+            overlapping &= polytopes['_time'] >= first
+        if last is not None:
+            overlapping &= polytopes['_time_lower'] <= last
+        polytopes = polytopes[overlapping]
+    
+    names = [store.projection_name(*projection) for projection in projections]
+    vertices = store.vertices[store.vertices['_projection'].isin(names)]
+    if time_window is not None:
+        vertices = vertices[vertices['_polytope_id'].isin(polytopes['_polytope_id'])]
+    return polytopes.reset_index(drop=True), vertices.reset_index(drop=True)
+
+
+def arrow_stream(df, batch_rows=65536):
+    """
+    Serialize a dataframe in the Arrow IPC streaming format, one record batch at a time, so that it can be streamed as the response of a request.
+    Numeric columns are handed to Arrow without copies, and categorical columns become dictionary-encoded ones.
+    
+    :param df: the dataframe
+    :param batch_rows: the maximum number of rows of each record batch
+    :return: a generator of the bytes of the stream
+    :raise ImportError: if pyarrow is not installed
+    """
+    
+    import pyarrow as pa
+    
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    
+    def chunks():
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            for start in range(0, len(df), batch_rows):
+                writer.write_batch(pa.RecordBatch.from_pandas(df.iloc[start:start + batch_rows], schema=schema, preserve_index=False))
+                # everything written so far is sent, so only a batch at a time is kept in memory
+                yield sink.getvalue()
+                sink.seek(0)
+                sink.truncate()
+        # the end-of-stream marker
+        yield sink.getvalue()
+    
+    return chunks()
@@ -0,0 +1,113 @@
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+EXPORT_FORMATS = ('png', 'svg', 'html')
+
+
+def all_projections(variables):
+    """
+    :param variables: the variables of the system, possibly including the time 't'
+    :return: every (t, var) projection and every (var, var) projection of the given variables
+    """
+    
+    state_vars = sorted(var for var in variables if var != 't')
+    return [('t', var) for var in state_vars] + list(itertools.combinations(state_vars, 2))
+
+
+def _render_projection(polytopes_df, var_x, var_y, formats, path_prefix):
+    # runs in a worker process, so it only gets plain dataframes
+    from backend.plotting_backend import plot_trajectory
+    
+    results = []
+    started = time.perf_counter()
+    fig = plot_trajectory(polytopes_df, var_x, var_y)
+    render_seconds = time.perf_counter() - started
+    for export_format in formats:
+        path = f'{path_prefix}.{export_format}'
+        started = time.perf_counter()
+        error = None
+        try:
+            if export_format == 'html':
+                fig.write_html(path, include_plotlyjs='cdn')
+            else:
+                # static formats require the kaleido package
+                fig.write_image(path, format=export_format)
+        except Exception as ex:
+            error = f'{ex}'
+        results.append({
+            'projection': f'{var_x}:{var_y}',
+            'format': export_format,
+            'path': path,
+            'polytopes': int(polytopes_df['_polytope_id'].nunique()),
+            'render_seconds': render_seconds,
+            'write_seconds': time.perf_counter() - started,
+            'error': error
+        })
+    return results
+
+
+def export_projections(stores, projections, output_dir, formats=EXPORT_FORMATS, workers=None, extraction_seconds=None):
+    """
+    Write the plots of the given projections of several orbits, rendering them in a process pool, and a 'manifest.json' file listing every file
+    written (or failed) together with its timings. The projections missing from a store are reported as failed files, so that the orbits with
+    different variables don't stop the export of the others.
+    
+    :param stores: a dictionary {orbit name: `ProjectionStore`}
+    :param projections: the list of (x, y) plots to draw for each orbit, None to draw all the projections of each store
+    :param output_dir: the directory where the files are written, one subdirectory for each orbit
+    :param formats: the formats to write, among 'png', 'svg' and 'html'
+    :param workers: the number of processes, by default the number of CPUs
+    :param extraction_seconds: optional, the time spent to extract each store, as {orbit name: seconds}, reported in the manifest
+    :return: the manifest, as a dictionary
+    """
+    
+    unknown = set(formats) - set(EXPORT_FORMATS)
+    if unknown:
+        raise ValueError(f'unsupported formats {sorted(unknown)}')
+    
+    started = time.perf_counter()
+    files = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        jobs = []
+        for orbit_name, store in stores.items():
+            orbit_dir = os.path.join(output_dir, orbit_name)
+            os.makedirs(orbit_dir, exist_ok=True)
+            for var_x, var_y in store.projections() if projections is None else projections:
+                path_prefix = os.path.join(orbit_dir, f'{orbit_name}_{var_x}-{var_y}')
+                if not store.has_projection(var_x, var_y):
+                    files.extend({
+                        'orbit': orbit_name,
+                        'projection': f'{var_x}:{var_y}',
+                        'format': export_format,
+                        'path': f'{path_prefix}.{export_format}',
+                        'polytopes': 0,
+                        'render_seconds': 0.0,
+                        'write_seconds': 0.0,
+                        'error': 'projection not in the store'
+                    } for export_format in formats)
+                    continue
+                # the dataframes are assembled here from the shared store, the workers just plot them
+                polytopes_df = store.to_dataframe([var_x, var_y])
+                job = executor.submit(_render_projection, polytopes_df, var_x, var_y, list(formats), path_prefix)
+                jobs.append((orbit_name, job))
+        for orbit_name, job in jobs:
+            files.extend(dict(result, orbit=orbit_name) for result in job.result())
+    
+    manifest = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'orbits': sorted(stores),
+        'projections': sorted({f['projection'] for f in files}) if projections is None else [f'{var_x}:{var_y}' for var_x, var_y in projections],
+        'formats': list(formats),
+        'extraction_seconds': extraction_seconds or {},
+        'export_seconds': time.perf_counter() - started,
+        'errors': sum(1 for f in files if f['error'] is not None),
+        'files': files
+    }
+    with open(os.path.join(output_dir, 'manifest.json'), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    return manifest
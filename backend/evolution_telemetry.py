@@ -0,0 +1,217 @@
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager
+from threading import Lock, Thread
+
+
+# Ariadne's hybrid evolver logs a summary line for every evolution step, like
+#    #w=3    #r=120  #f=0    #e=121  #p=2  #c=1  t=[12.5:12.75] r=0.0412 c=[...] l=(controller|rising,valve|opened) e=[can_close,must_open]
+# where '#r' is the number of reach sets (enclosures) produced so far, '#w' the working sets still to be evolved, 't' the time range of the current
+# enclosure, 'r' its radius and 'e' the events leading to it; the format slightly changes between versions, so each field is parsed on its own
+_NUMBER = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+_LOG_FIELDS = {
+    'enclosures': re.compile(r'#r=\s*(\d+)'),
+    'working_sets': re.compile(r'#w=\s*(\d+)'),
+    'time': re.compile(rf'(?<![#\w])t=\[?\s*({_NUMBER})(?:\s*[:,]\s*({_NUMBER}))?'),
+    'radius': re.compile(rf'(?<![#\w])r=\s*({_NUMBER})'),
+    'location': re.compile(r'(?<![#\w])l=(\S+)'),
+    'events': re.compile(r'(?<![#\w])e=\[([^\]]*)\]'),
+}
+
+
+def parse_evolver_log_line(line):
+    """
+    Parse a single line of the Ariadne evolver log.
+    
+    :param line: the raw log line
+    :return: a dictionary with the fields found in the line (possibly empty), among 'enclosures', 'working_sets', 'time', 'radius', 'location' and
+             'transitions'
+    """
+    
+    fields = {}
+    for field, pattern in _LOG_FIELDS.items():
+        match = pattern.search(line)
+        if match is None:
+            continue
+        if field in ('enclosures', 'working_sets'):
+            fields[field] = int(match.group(1))
+        elif field == 'time':
+            # keep the upper bound of the time range, if any
+            fields[field] = float(match.group(2) if match.group(2) is not None else match.group(1))
+        elif field == 'radius':
+            fields[field] = float(match.group(1))
+        elif field == 'location':
+            fields[field] = match.group(1)
+        else:
+            fields['transitions'] = len([e for e in match.group(1).split(',') if e.strip()])
+    return fields
+
+
+class EvolutionTelemetry(object):
+    """
+    Thread-safe collector of the progress of a running evolution, fed with the lines of the Ariadne evolver log.
+    """
+    
+    def __init__(self, maximum_enclosure_radius=None):
+        self._lock = Lock()
+        self.reset(maximum_enclosure_radius)
+    
+    def reset(self, maximum_enclosure_radius=None):
+        with self._lock:
+            self.maximum_enclosure_radius = maximum_enclosure_radius
+            self.started_at = time.monotonic()
+            self.updated_at = None
+            self.enclosures = 0
+            self.working_sets = 0
+            self.time_reached = 0.0
+            self.transitions = 0
+            self.radius = None
+            self.location = None
+            # without the evolver log (see `enable_evolver_logging(*)`) nothing is known until the end of the evolution
+            self.log_available = True
+    
+    def update_from_log(self, line):
+        fields = parse_evolver_log_line(line)
+        if not fields:
+            return
+        with self._lock:
+            self.updated_at = time.monotonic()
+            self.enclosures = max(self.enclosures, fields.get('enclosures', 0))
+            self.working_sets = fields.get('working_sets', self.working_sets)
+            self.time_reached = max(self.time_reached, fields.get('time', 0.0))
+            self.transitions = max(self.transitions, fields.get('transitions', 0))
+            self.radius = fields.get('radius', self.radius)
+            self.location = fields.get('location', self.location)
+    
+    def snapshot(self):
+        """
+        :return: a consistent copy of the collected telemetry, as a dictionary
+        """
+        
+        with self._lock:
+            now = time.monotonic()
+            return {
+                'elapsed': now - self.started_at,
+                'silent_for': None if self.updated_at is None else now - self.updated_at,
+                'enclosures': self.enclosures,
+                'working_sets': self.working_sets,
+                'time_reached': self.time_reached,
+                'transitions': self.transitions,
+                'radius': self.radius,
+                'maximum_enclosure_radius': self.maximum_enclosure_radius,
+                'location': self.location,
+                'log_available': self.log_available
+            }
+    
+    def summary(self, final_time=None):
+        """
+        Human-readable summary of the collected telemetry, suitable for the dashboard run-state panel.
+        
+        :param final_time: optional, the final continuous time of the evolution, to show the progress percentage
+        :return: a multiline string
+        """
+        
+        snapshot = self.snapshot()
+        progress = f' ({100 * snapshot["time_reached"] / final_time:.0f}%)' if final_time else ''
+        lines = [
+            f'elapsed:      {snapshot["elapsed"]:.1f}s',
+            f'enclosures:   {snapshot["enclosures"]} ({snapshot["working_sets"]} waiting)',
+            f'time reached: {snapshot["time_reached"]:.3f}{progress}',
+            f'transitions:  {snapshot["transitions"]}'
+        ]
+        if snapshot['radius'] is not None:
+            if snapshot['maximum_enclosure_radius']:
+                ratio = snapshot['radius'] / snapshot['maximum_enclosure_radius']
+                lines.append(f'radius:       {snapshot["radius"]:.4g} / {snapshot["maximum_enclosure_radius"]:.4g} ({100 * ratio:.0f}%)')
+            else:
+                lines.append(f'radius:       {snapshot["radius"]:.4g}')
+        if snapshot['location'] is not None:
+            lines.append(f'location:     {snapshot["location"]}')
+        if not snapshot['log_available']:
+            lines.append('no evolver log available: the enclosures are unknown until the end, so no enclosures budget applies')
+        elif snapshot['silent_for'] is None:
+            lines.append('no evolver log received yet')
+        return '\n'.join(lines)
+
+
+def enable_evolver_logging(ari, evolver, verbosity=1):
+    """
+    Make the evolver print its per-step summary, which is the source of the telemetry. Depending on the pyariadne version the verbosity is either global
+    (through the `Logger` singleton) or per-object.
+    
+    :param ari: the `pyariadne` module
+    :param evolver: the Ariadne evolver
+    :param verbosity: the verbosity level to set
+    :return: True if the verbosity could be set, False otherwise
+    """
+    
+    logger = getattr(ari, 'Logger', None)
+    if logger is not None and hasattr(logger, 'instance'):
+        logger.instance().configuration().set_verbosity(verbosity)
+        return True
+    if hasattr(evolver, 'set_verbosity'):
+        evolver.set_verbosity(verbosity)
+        return True
+    return False
+
+
+def separate_python_output():
+    """
+    Make the Python output of the process (prints, tracebacks, warnings) go to copies of the standard file descriptors, so that whatever thread
+    writes it, it's never captured by `capture_native_output(*)` along with the output of the C++ library, but still visible.
+    """
+    
+    for name in ('stdout', 'stderr'):
+        stream = getattr(sys, name)
+        if stream is None:
+            continue
+        stream.flush()
+        setattr(sys, name, os.fdopen(os.dup(stream.fileno()), 'w', buffering=1, encoding=stream.encoding, errors=stream.errors))
+
+
+@contextmanager
+def capture_native_output(on_line, fds=(1, 2)):
+    """
+    Capture everything written on the given file descriptors, including the output of the C++ library, and feed it line by line to `on_line`.
+    The captured output is still forwarded to the original standard output.
+    
+    Since file descriptors are process-wide, this also captures the Python output of any other thread while active, unless it was moved elsewhere
+    with `separate_python_output(*)`; keep the capture as short as possible.
+    
+    :param on_line: a callable accepting a line of text
+    :param fds: the file descriptors to capture (standard output and error by default)
+    """
+    
+    sys.stdout.flush()
+    sys.stderr.flush()
+    read_fd, write_fd = os.pipe()
+    saved_fds = {fd: os.dup(fd) for fd in fds}
+    for fd in fds:
+        os.dup2(write_fd, fd)
+    os.close(write_fd)
+    forward_fd = saved_fds[fds[0]]
+    
+    def pump():
+        with os.fdopen(read_fd, 'r', errors='replace') as reader:
+            for line in reader:
+                os.write(forward_fd, line.encode())
+                try:
+                    on_line(line)
+                except Exception:
+                    pass  # telemetry must never break the evolution
+    
+    pump_thread = Thread(target=pump, daemon=True)
+    pump_thread.start()
+    try:
+        yield
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        # restoring the descriptors closes the last write end of the pipe, which ends the pump
+        for fd, saved_fd in saved_fds.items():
+            os.dup2(saved_fd, fd)
+        pump_thread.join()
+        for saved_fd in saved_fds.values():
+            os.close(saved_fd)
@@ -0,0 +1,207 @@
+import itertools
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.initial_sets import make_initial_set
+from backend.systems_loader import build_system
+
+# None leaves the Ariadne default
+DEFAULT_EVOLVER_SETTINGS = {
+    'maximum_enclosure_radius': 3.0,
+    'maximum_step_size': 0.25,
+    'enable_reconditioning': None,
+    'enable_subdivisions': None,
+    'maximum_spacial_error': None
+}
+
+DEFAULT_TUNING_GRID = {
+    'maximum_enclosure_radius': [0.5, 1.0, 3.0],
+    'maximum_step_size': [0.05, 0.1, 0.25],
+    'enable_subdivisions': [False, True]
+}
+
+# the objectives of the probes, all to be minimized
+TUNING_OBJECTIVES = ('wall_seconds', 'enclosures', 'final_width')
+# the budgets of each probe (see `DEFAULT_BUDGETS`): a probe exceeding them is killed and reported as failed
+DEFAULT_PROBE_BUDGETS = {
+    'wall_seconds': 120
+}
+
+
+def configure_evolver(evolver, settings=None):
+    """
+    Apply the given settings to the configuration of an Ariadne evolver.
+    
+    :param evolver: the Ariadne `GeneralHybridEvolver`
+    :param settings: optional, a dictionary overriding `DEFAULT_EVOLVER_SETTINGS`; None values leave the Ariadne defaults
+    :return: the complete settings applied
+    """
+    
+    settings = {**DEFAULT_EVOLVER_SETTINGS, **(settings or {})}
+    configuration = evolver.configuration()
+    if settings['maximum_enclosure_radius'] is not None:
+        configuration.set_maximum_enclosure_radius(float(settings['maximum_enclosure_radius']))
+    if settings['maximum_step_size'] is not None:
+        configuration.set_maximum_step_size(float(settings['maximum_step_size']))
+    if settings['enable_reconditioning'] is not None:
+        configuration.set_enable_reconditioning(bool(settings['enable_reconditioning']))
+    if settings['enable_subdivisions'] is not None:
+        configuration.set_enable_subdivisions(bool(settings['enable_subdivisions']))
+    if settings['maximum_spacial_error'] is not None:
+        configuration.set_maximum_spacial_error(float(settings['maximum_spacial_error']))
+    return settings
+
+
+def settings_grid(grid=None):
+    """
+    :param grid: a dictionary {setting name: list of values}, by default `DEFAULT_TUNING_GRID`
+    :return: the list of all the combinations of the settings
+    """
+    
+    grid = grid or DEFAULT_TUNING_GRID
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def probe_evolution(system_spec, locations, values, final_time, max_transitions, variables, settings, strict_bounds=None):
+    """
+    Run a (short) evolution with the given settings and measure its cost and precision. Since the arguments and the result are plain Python objects,
+    this is meant to be run in a separate process.
+    
+    :param variables: the state variables whose final width is measured
+    :param settings: the evolver settings, see `configure_evolver(*)`
+    :param strict_bounds: optional, the bounds to exclude from the initial set (see `make_initial_set(*)`)
+    :return: a dictionary with the 'settings', the 'wall_seconds' spent, the number of 'enclosures' of the orbit, the 'final_width' (the largest
+             width among the variables of the hull of the final set) and the 'error', if any
+    """
+    
+    import pyariadne as ari
+    
+    result = _failed_probe(settings, None)
+    try:
+        evolver = ari.GeneralHybridEvolver(build_system(system_spec))
+        configure_evolver(evolver, settings)
+        initial_set = make_initial_set(locations, values, strict_bounds)
+        started = time.perf_counter()
+        orbit = evolver.orbit(initial_set, ari.HybridTerminationCriterion(ari.HybridTime(ari.dec(float(final_time)), int(max_transitions))),
+                              ari.Semantics.UPPER)
+        result['wall_seconds'] = time.perf_counter() - started
+        result['enclosures'] = sum(1 for _ in orbit.reach())
+        
+        hull = {}
+        for encl in orbit.final():
+            box = encl.bounding_box()
+            for var in variables:
+                try:
+                    interval = box[ari.RealVariable(var)]
+                except (RuntimeError, IndexError, KeyError):
+                    # the variable is not defined in this location
+                    continue
+                lower, upper = float(str(interval.lower_bound())), float(str(interval.upper_bound()))
+                hull[var] = (min(lower, hull.get(var, (lower, upper))[0]), max(upper, hull.get(var, (lower, upper))[1]))
+        result['final_width'] = max((upper - lower for lower, upper in hull.values()), default=0.0)
+    except Exception as ex:
+        result['error'] = f'{ex}'
+    return result
+
+
+def _failed_probe(settings, error):
+    return {'settings': settings, 'wall_seconds': math.inf, 'enclosures': math.inf, 'final_width': math.inf, 'error': error}
+
+
+def _send_probe(connection, *args):
+    # the body of the probe processes
+    connection.send(probe_evolution(*args))
+    connection.close()
+
+
+def run_probe(system_spec, locations, values, final_time, max_transitions, variables, settings, budgets=None, strict_bounds=None):
+    """
+    Run `probe_evolution(*)` in its own process, killed as soon as it exceeds one of the budgets: a pool of processes couldn't stop a single
+    runaway probe (e.g. a fine grid with a tiny step), which would hang the whole tuning.
+    
+    :param budgets: optional, the budgets of the probe overriding `DEFAULT_BUDGETS` (the enclosures are unknown until the end, so that budget is
+                    not applied)
+    :return: the result of the probe, a failed one if it was killed or it crashed
+    """
+    
+    from backend.resource_budgets import watch_budgets
+    
+    context = multiprocessing.get_context('spawn')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_send_probe,
+                              args=(sender, system_spec, locations, values, final_time, max_transitions, variables, settings, strict_bounds),
+                              daemon=True)
+    process.start()
+    sender.close()
+    exceeded = []
+    
+    def stop(reason):
+        exceeded.append(reason)
+        process.kill()
+    
+    watch_budgets(budgets, process.pid, process.is_alive, stop)
+    try:
+        result = receiver.recv()
+    except EOFError:
+        process.join()
+        result = _failed_probe(settings, exceeded[0] if exceeded else f'the probe process died with exit code {process.exitcode}')
+    process.join()
+    return result
+
+
+def pareto_front(results):
+    """
+    :param results: the results of `probe_evolution(*)`
+    :return: the successful results which are not dominated by any other one over `TUNING_OBJECTIVES`
+    """
+    
+    valid = [result for result in results if result['error'] is None]
+    
+    def dominates(a, b):
+        return all(a[o] <= b[o] for o in TUNING_OBJECTIVES) and any(a[o] < b[o] for o in TUNING_OBJECTIVES)
+    
+    return [result for result in valid if not any(dominates(other, result) for other in valid)]
+
+
+def recommend(results):
+    """
+    Pick a single configuration out of the Pareto front: the one minimizing the product of the objectives, each relative to its best value on the
+    front, i.e. the most balanced trade-off between cost and precision.
+    
+    :param results: the results of `probe_evolution(*)`
+    :return: the recommended result, or None if every probe failed
+    """
+    
+    front = pareto_front(results)
+    if not front:
+        return None
+    best = {o: min(result[o] for result in front) for o in TUNING_OBJECTIVES}
+    
+    def score(result):
+        # zero values (e.g. a degenerate final set) are relative to a tiny value rather than to zero
+        return sum(math.log(max(result[o], 1e-12) / max(best[o], 1e-12)) for o in TUNING_OBJECTIVES)
+    
+    return min(front, key=score)
+
+
+def start_tuning(system_spec, locations, values, final_time, max_transitions, variables, grid=None, workers=None, budgets=None, strict_bounds=None):
+    """
+    Probe every combination of the grid of settings concurrently, each in its own process (see `run_probe(*)`), at most `workers` at a time.
+    
+    :param budgets: optional, the budgets of each probe, by default `DEFAULT_PROBE_BUDGETS`
+    :param strict_bounds: optional, the bounds to exclude from the initial set (see `make_initial_set(*)`)
+    :return: the executor (to be shut down by the caller) and the list of the futures of the probes
+    """
+    
+    budgets = DEFAULT_PROBE_BUDGETS if budgets is None else budgets
+    # the threads just wait for the processes of the probes
+    executor = ThreadPoolExecutor(max_workers=workers or os.cpu_count())
+    futures = [
+        executor.submit(run_probe, system_spec, locations, values, final_time, max_transitions, variables, settings, budgets, strict_bounds)
+        for settings in settings_grid(grid)
+    ]
+    return executor, futures
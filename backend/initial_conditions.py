@@ -0,0 +1,134 @@
+import base64
+import csv
+import io
+import json
+
+# the kinds of bounds of a range, as (strict lower bound, strict upper bound); a row without upper bound is a single value
+BOUNDS = {
+    '[ ]': (False, False),
+    '[ )': (False, True),
+    '( ]': (True, False),
+    '( )': (True, True)
+}
+# the bounds of a new range: both included, since strict bounds break Ariadne, so excluding them is up to the user
+DEFAULT_BOUNDS = '[ ]'
+# the rows of the initial conditions table
+CONDITION_FIELDS = ['variable', 'lower', 'upper', 'bounds']
+
+
+def condition_rows(variables, previous_rows=None):
+    """
+    Make a row of the initial conditions table for each variable, keeping the values already entered for the variables still there.
+    
+    :param variables: the sorted variable names
+    :param previous_rows: optional, the current rows of the table
+    :return: a list of {'variable', 'lower', 'upper', 'bounds'} rows
+    """
+    
+    previous = {row['variable']: row for row in previous_rows or []}
+    return [previous.get(var, {'variable': var, 'lower': None, 'upper': None, 'bounds': DEFAULT_BOUNDS}) for var in variables]
+
+
+def _values_to_rows(values):
+    # {variable: value or [lower, upper]}, as in a run specification
+    return [
+        {'variable': var, 'lower': value[0], 'upper': value[1]} if isinstance(value, (list, tuple)) else {'variable': var, 'lower': value}
+        for var, value in values.items()
+    ]
+
+
+def _number(value):
+    # the invalid numbers are kept as they are, to be reported by the validation
+    try:
+        return float(value) if isinstance(value, str) else value
+    except ValueError:
+        return value
+
+
+def parse_conditions(contents, filename):
+    """
+    Parse an uploaded file of initial conditions: a CSV file with a 'variable' column, a 'lower' (or 'value') column and optionally the 'upper'
+    and 'bounds' ones, or a JSON file with either a list of such rows or the {variable: value or [lower, upper]} dictionary of a run specification.
+    
+    :param contents: the contents of the file, as the data URL of an upload component or as plain text
+    :param filename: the name of the file, whose extension selects the format
+    :return: a list of rows, with the 'bounds' field only if found in the file
+    """
+    
+    if contents.startswith('data:'):
+        contents = base64.b64decode(contents.split(',', 1)[1]).decode('utf-8-sig')
+    if filename.lower().endswith('.json'):
+        parsed = json.loads(contents)
+        raw_rows = _values_to_rows(parsed) if isinstance(parsed, dict) else parsed
+    elif filename.lower().endswith('.csv'):
+        raw_rows = list(csv.DictReader(io.StringIO(contents)))
+    else:
+        raise ValueError(f'unknown format of {filename}, expected a .csv or a .json file')
+    
+    rows = []
+    for raw_row in raw_rows:
+        row = {field.strip().lower(): value for field, value in raw_row.items() if field is not None}
+        if 'value' in row and 'lower' not in row:
+            row['lower'] = row.pop('value')
+        if 'variable' not in row or 'lower' not in row:
+            raise ValueError('the initial conditions need a "variable" and a "lower" (or "value") field')
+        # the empty CSV cells are missing values, and a missing upper bound makes a single value; missing bounds are left as they are
+        parsed = {'upper': None, **{field: None if row[field] == '' else row[field] for field in CONDITION_FIELDS if field in row}}
+        parsed['lower'], parsed['upper'] = _number(parsed['lower']), _number(parsed['upper'])
+        if parsed.get('bounds') is None:
+            parsed.pop('bounds', None)
+        rows.append(parsed)
+    return rows
+
+
+def merge_conditions(rows, imported_rows):
+    """
+    Update the rows of the table with the imported ones, by variable.
+    
+    :return: the updated rows and the imported variables which are not in the table
+    """
+    
+    imported = {str(row['variable']).strip(): row for row in imported_rows}
+    merged = [dict(row, **{field: value for field, value in imported[row['variable']].items() if field != 'variable'})
+              if row['variable'] in imported else row for row in rows]
+    known = {row['variable'] for row in rows}
+    return merged, [var for var in imported if var not in known]
+
+
+def validate_conditions(rows):
+    """
+    Validate all the initial conditions at once, collecting every problem instead of stopping at the first one.
+    
+    :param rows: the rows of the table
+    :return: the values as {variable: value or (lower, upper)} (see `make_initial_set(*)`), the strict bounds of the ranges and the list of errors
+    """
+    
+    import pandas as pd
+    
+    if not rows:
+        return {}, {}, []
+    # the cleared cells of the table are empty strings
+    table = pd.DataFrame([{field: None if row.get(field) == '' else row.get(field) for field in CONDITION_FIELDS} for row in rows])
+    lower = pd.to_numeric(table['lower'], errors='coerce')
+    upper = pd.to_numeric(table['upper'], errors='coerce')
+    bounds = table['bounds'].fillna(DEFAULT_BOUNDS)
+    missing = table['lower'].isna()
+    is_range = table['upper'].notna()
+    
+    problems = {
+        'Specify value for variable "{}"': missing & ~is_range,
+        'Specify lower bound for variable "{}"': missing & is_range,
+        'Invalid number for variable "{}"': (lower.isna() & ~missing) | (upper.isna() & is_range),
+        'Empty range for variable "{}"': lower > upper,
+        'Unknown bounds for variable "{}"': is_range & ~bounds.isin(list(BOUNDS))
+    }
+    errors = [message.format(var) for message, mask in problems.items() for var in table['variable'][mask]]
+    if errors:
+        return {}, {}, errors
+    
+    values = {
+        var: (low, up) if ranged else low
+        for var, low, up, ranged in zip(table['variable'], lower.tolist(), upper.tolist(), is_range.tolist())
+    }
+    strict_bounds = {var: BOUNDS[kind] for var, kind, ranged in zip(table['variable'], bounds, is_range) if ranged}
+    return values, strict_bounds, errors
@@ -0,0 +1,67 @@
+import itertools
+import random
+
+
+def sample_box_points(bounds, samples, seed=0, strict_bounds=None):
+    """
+    Sample points of a box: the centre first, then the corners (when they are not too many), then random points.
+    
+    :param bounds: a dictionary {variable name: (lower bound, upper bound)}
+    :param samples: the number of points to sample
+    :param seed: the seed of the random sampling, so that the same box always gives the same points
+    :param strict_bounds: optional, a dictionary {variable name: (strict lower bound, strict upper bound)} of booleans: the corners on the excluded
+                          bounds are moved inside the box by a millionth of its width
+    :return: a list of dictionaries {variable name: value}
+    """
+    
+    def inner(var):
+        lower, upper = bounds[var]
+        strict_lower, strict_upper = (strict_bounds or {}).get(var, (False, False))
+        nudge = (upper - lower) * 1e-6
+        return lower + nudge if strict_lower else lower, upper - nudge if strict_upper else upper
+    
+    variables = sorted(bounds)
+    points = [{var: (bounds[var][0] + bounds[var][1]) / 2 for var in variables}]
+    bounds = {var: inner(var) for var in variables}
+    # degenerate (point) variables have a single corner
+    ranges = [sorted({bounds[var][0], bounds[var][1]}) for var in variables]
+    corners = itertools.product(*ranges)
+    for corner in itertools.islice(corners, samples - 1):
+        point = dict(zip(variables, corner))
+        if point not in points:
+            points.append(point)
+    rng = random.Random(seed)
+    while len(points) < samples and any(lower < upper for lower, upper in bounds.values()):
+        points.append({var: rng.uniform(*bounds[var]) for var in variables})
+    return points[:samples]
+
+
+def make_initial_set(locations, values, strict_bounds=None):
+    """
+    Build an Ariadne initial set from plain Python values, e.g. from the points returned by `sample_box_points(*)`.
+    
+    :param locations: a dictionary {automaton name: location name}
+    :param values: a dictionary {variable name: value} or {variable name: (lower bound, upper bound)}, bounds are included
+    :param strict_bounds: optional, a dictionary {variable name: (strict lower bound, strict upper bound)} of booleans, to exclude some bounds
+    :return: the Ariadne `HybridBoundedConstraintSet`
+    """
+    
+    # imported here since this module is also used where pyariadne must not be loaded yet
+    import pyariadne as ari
+    
+    initial_location = {
+        ari.StringVariable(automaton_name): ari.String(location_name)
+        for automaton_name, location_name in locations.items()
+    }
+    initial_conditions = []
+    for var_name, value in sorted(values.items()):
+        variable = ari.RealVariable(var_name)
+        if isinstance(value, (list, tuple)):
+            strict_lower, strict_upper = (strict_bounds or {}).get(var_name, (False, False))
+            lower, upper = ari.dec(float(value[0])), ari.dec(float(value[1]))
+            initial_conditions.append(
+                ((lower < variable) if strict_lower else (lower <= variable)) & ((variable < upper) if strict_upper else (variable <= upper))
+            )
+        else:
+            initial_conditions.append(variable == ari.dec(float(value)))
+    return ari.HybridBoundedConstraintSet(initial_location, initial_conditions)
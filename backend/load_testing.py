@@ -0,0 +1,399 @@
+import json
+import threading
+import time
+import urllib.request
+from random import Random
+from urllib.error import HTTPError, URLError
+
+import numpy as np
+
+# the dashboard callbacks, by the first of their outputs
+CALLBACKS = {
+    'update_initial_conditions': 'config-init-table.data',
+    'run_system_evolution': 'run-state.children',
+    'enable_trajectory_plotter': 'trajectory-plotter.className',
+    'update_time_slider': 'time-slider.max',
+    'update_trajectory_plot': 'trajectory-graph.figure',
+    'update_automaton_graph': 'automaton-plot.children'
+}
+# the texts of the run state once the evolution is over
+_FINAL_RUN_STATES = ('Done', 'Error evolving!', 'Budget exceeded, evolution stopped', 'Missing parameters', 'Error configuring!')
+
+
+class FlaskTransport(object):
+    """
+    Requests to a dashboard in this process, through the Flask test client (one per virtual user).
+    """
+    
+    def __init__(self, server):
+        self.client = server.test_client()
+    
+    def get(self, path):
+        response = self.client.get(path)
+        return response.status_code, response.get_json(silent=True)
+    
+    def post(self, path, payload):
+        response = self.client.post(path, json=payload)
+        return response.status_code, response.get_json(silent=True)
+
+
+class HttpTransport(object):
+    """
+    Requests to a running dashboard, over HTTP.
+    """
+    
+    def __init__(self, base_url, timeout=600):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+    
+    def _request(self, path, data=None):
+        request = urllib.request.Request(self.base_url + path, data=data, headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = response.read()
+                return response.status, json.loads(body) if body else None
+        except HTTPError as ex:
+            return ex.code, None
+        except URLError:
+            # the server is unreachable or dropped the connection
+            return 0, None
+    
+    def get(self, path):
+        return self._request(path)
+    
+    def post(self, path, payload):
+        return self._request(path, json.dumps(payload).encode())
+
+
+def _id_key(component_id):
+    # as the ids are stringified by Dash
+    return component_id if isinstance(component_id, str) else json.dumps(component_id, sort_keys=True, separators=(',', ':'))
+
+
+def _parse_dependency_id(dependency_id):
+    # the pattern-matching ids are JSON strings, e.g. '{"index":["ALL"],"type":"config-init-location"}'
+    return json.loads(dependency_id) if dependency_id.startswith('{') else dependency_id
+
+
+class VirtualUser(object):
+    """
+    A browser session of the dashboard, reduced to what the callbacks need: the properties of the components, updated with the responses of the
+    callbacks, from which the payloads of the next callbacks are built as the Dash renderer would. The callbacks are fired explicitly by the
+    interaction scripts, and the latency of every request is recorded.
+    """
+    
+    def __init__(self, transport, dependencies, name='user'):
+        """
+        :param transport: a `FlaskTransport` or an `HttpTransport`
+        :param dependencies: the callbacks of the dashboard, as served by '/_dash-dependencies'
+        :param name: the name of the user, in the records
+        """
+        
+        self.transport = transport
+        self.name = name
+        self.records = []
+        self._callbacks = {dependency['output'].strip('.').split('...')[0]: dependency for dependency in dependencies}
+        # {id key: (id, {property: value})}, in layout order as for the ALL wildcards
+        self._components = {}
+        self._subtrees = {}
+    
+    def open(self):
+        """
+        Load the layout, as opening the page; the initial callbacks which change the state of the server (the initial run of
+        `run_system_evolution` resets the evolution) are not fired.
+        """
+        
+        status, layout = self.transport.get('/_dash-layout')
+        if status != 200:
+            raise RuntimeError(f'cannot load the layout of the dashboard (HTTP {status})')
+        self._components, self._subtrees = {}, {}
+        self._index(layout, owner=None)
+    
+    def _index(self, component, owner):
+        if isinstance(component, list):
+            for child in component:
+                self._index(child, owner)
+            return
+        if not isinstance(component, dict) or 'props' not in component:
+            return
+        props = component['props']
+        if 'id' in props:
+            key = _id_key(props['id'])
+            self._components[key] = (props['id'], {name: value for name, value in props.items() if name != 'children'})
+            if owner is not None:
+                self._subtrees.setdefault(owner, []).append(key)
+        self._index(props.get('children'), owner if 'id' not in props else _id_key(props['id']))
+    
+    def _replace_children(self, key, children):
+        # drop the components of the old children, with their own subtrees
+        stale = list(self._subtrees.pop(key, []))
+        while stale:
+            child = stale.pop()
+            self._components.pop(child, None)
+            stale += self._subtrees.pop(child, [])
+        self._index(children, key)
+    
+    def get(self, component_id, prop, default=None):
+        return self._components.get(_id_key(component_id), (None, {}))[1].get(prop, default)
+    
+    def set(self, component_id, prop, value):
+        key = _id_key(component_id)
+        self._components.setdefault(key, (component_id, {}))[1][prop] = value
+    
+    def matching(self, pattern):
+        """
+        :param pattern: a pattern-matching id, with the wildcards as in the dependencies, e.g. {'type': 'config-init-location', 'index': ['ALL']}
+        :return: the ids of the components matching it, in layout order
+        """
+        
+        return [
+            component_id for component_id, _ in self._components.values()
+            if isinstance(component_id, dict) and component_id.keys() == pattern.keys()
+            and all(isinstance(value, list) or component_id[name] == value for name, value in pattern.items())
+        ]
+    
+    def _payload_item(self, dependency):
+        component_id = _parse_dependency_id(dependency['id'])
+        if isinstance(component_id, dict):
+            return [{'id': matched, 'property': dependency['property'], 'value': self.get(matched, dependency['property'])}
+                    for matched in self.matching(component_id)]
+        return {'id': component_id, 'property': dependency['property'], 'value': self.get(component_id, dependency['property'])}
+    
+    def fire(self, callback, changed):
+        """
+        Fire a callback with the current properties, then apply its response.
+        
+        :param callback: the name of the callback, see `CALLBACKS`
+        :param changed: the list of (id, property) pairs which triggered it
+        :return: the HTTP status and the response, as {id key: {property: value}}
+        """
+        
+        dependency = self._callbacks[CALLBACKS[callback]]
+        payload = {
+            'output': dependency['output'],
+            'outputs': None,
+            'inputs': [self._payload_item(item) for item in dependency['inputs']],
+            'state': [self._payload_item(item) for item in dependency['state']],
+            'changedPropIds': [f'{_id_key(component_id)}.{prop}' for component_id, prop in changed]
+        }
+        started = time.perf_counter()
+        status, body = self.transport.post('/_dash-update-component', payload)
+        self.records.append({'user': self.name, 'callback': callback, 'started': started, 'latency': time.perf_counter() - started, 'status': status})
+        
+        response = (body or {}).get('response', {}) if status == 200 else {}
+        for key, props in response.items():
+            for prop, value in props.items():
+                if prop == 'children':
+                    self._replace_children(key, value)
+                elif key in self._components:
+                    self._components[key][1][prop] = value
+        return status, response
+
+
+def explore_trajectories(user, rng, drags=5, **_):
+    """
+    Pick two axes of the trajectory plotter, then drag the time slider a few times.
+    """
+    
+    user.fire('enable_trajectory_plotter', [('run-state', 'children')])
+    options = [option['value'] for option in user.get('x-variable', 'options') or []]
+    if len(options) < 2:
+        return
+    var_x, var_y = rng.sample(options, 2)
+    user.set('x-variable', 'value', var_x)
+    user.set('y-variable', 'value', var_y)
+    user.set('render-mode-selector', 'value', rng.choices(['polytopes', 'boxes'], weights=[4, 1])[0])
+    user.fire('update_time_slider', [('y-variable', 'value')])
+    max_time = user.get('time-slider', 'max') or 0
+    for _ in range(drags):
+        user.set('time-slider', 'value', sorted([round(rng.uniform(0, max_time), 3), round(rng.uniform(0, max_time), 3)]))
+        user.fire('update_trajectory_plot', [('time-slider', 'value')])
+
+
+def browse_automata(user, rng, views=3, **_):
+    """
+    Look at a few automata in the Automaton Viewer.
+    """
+    
+    options = [option['value'] for option in user.get('automaton-selector', 'options') or []]
+    for _ in range(views if options else 0):
+        user.set('automaton-selector', 'value', rng.choice(options))
+        user.fire('update_automaton_graph', [('automaton-selector', 'value')])
+
+
+def run_evolution(user, rng, evolution=None, poll_period=0.5, timeout=600, **_):
+    """
+    Configure the initial set as in `evolution`, run the evolution and poll it until it's over, as the run-telemetry interval does; without a
+    configuration, nothing is done.
+    
+    :param evolution: {'final_time', 'max_transitions', 'locations': {automaton: location}, 'values': {variable: value or [lower, upper]}}
+    """
+    
+    if not evolution:
+        return
+    user.set('config-final-time', 'value', evolution['final_time'])
+    user.set('config-max-transitions', 'value', evolution['max_transitions'])
+    location_ids = user.matching({'type': 'config-init-location', 'index': ['ALL']})
+    for location_id in location_ids:
+        user.set(location_id, 'value', evolution.get('locations', {}).get(location_id['index'], user.get(location_id, 'value')))
+    user.fire('update_initial_conditions', [(location_id, 'value') for location_id in location_ids])
+    values = evolution.get('values', {})
+    rows = []
+    for row in user.get('config-init-table', 'data') or []:
+        if row['variable'] in values:
+            value = values[row['variable']]
+            is_range = isinstance(value, (list, tuple))
+            row = dict(row, lower=value[0] if is_range else value, upper=value[1] if is_range else None)
+        rows.append(row)
+    user.set('config-init-table', 'data', rows)
+    
+    user.set('run-evolution', 'n_clicks', (user.get('run-evolution', 'n_clicks') or 0) + 1)
+    _, response = user.fire('run_system_evolution', [('run-evolution', 'n_clicks')])
+    if response.get('run-state', {}).get('children') != 'Evolving...':
+        # e.g. another user is evolving
+        return
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        time.sleep(poll_period)
+        user.set('run-telemetry-interval', 'n_intervals', (user.get('run-telemetry-interval', 'n_intervals') or 0) + 1)
+        _, response = user.fire('run_system_evolution', [('run-telemetry-interval', 'n_intervals')])
+        if response.get('run-state', {}).get('children') in _FINAL_RUN_STATES:
+            return
+
+
+SCRIPTS = {
+    'trajectories': explore_trajectories,
+    'automata': browse_automata,
+    'evolution': run_evolution
+}
+DEFAULT_MIX = {'trajectories': 6, 'automata': 3, 'evolution': 1}
+
+
+def _percentiles(latencies):
+    values = np.asarray(latencies) * 1000
+    return {
+        'count': len(values),
+        'p50_ms': float(np.percentile(values, 50)),
+        'p90_ms': float(np.percentile(values, 90)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'p99_ms': float(np.percentile(values, 99)),
+        'max_ms': float(values.max())
+    }
+
+
+def summarize_records(records, wall_seconds):
+    """
+    :param records: the records of the requests of the virtual users
+    :param wall_seconds: the duration of the test
+    :return: the latency percentiles, the number of errors (HTTP status >= 400, or no response) and the throughput of each callback and overall
+    """
+    
+    summary = {}
+    groups = {}
+    for record in records:
+        groups.setdefault(record['callback'], []).append(record)
+    for name, group in sorted(groups.items()) + [('all', records)]:
+        if not group:
+            continue
+        summary[name] = {
+            **_percentiles([record['latency'] for record in group]),
+            'errors': sum(1 for record in group if record['status'] == 0 or record['status'] >= 400),
+            'throughput_rps': len(group) / wall_seconds if wall_seconds > 0 else 0.0
+        }
+    return summary
+
+
+def run_load_test(make_transport, users=4, sessions=5, mix=None, seed=0, think_time=(0.0, 0.0), evolution=None, warmup=True, poll_period=0.5):
+    """
+    Simulate concurrent users of a dashboard, each in its own thread: every user opens the page, then runs `sessions` interaction scripts chosen
+    at random with the weights of `mix` (see `SCRIPTS`), pausing for a random think time in between. The choices of every user are seeded, so
+    that two runs with the same parameters make the same requests.
+    
+    :param make_transport: a function returning a new transport, for each user
+    :param users: the number of virtual users
+    :param sessions: the number of scripts run by each user
+    :param mix: the weight of each script, by default `DEFAULT_MIX`
+    :param seed: the seed of the choices of the users
+    :param think_time: the (min, max) pause between two scripts, in seconds
+    :param evolution: the configuration of the evolutions (see `run_evolution(*)`), without which the evolution script does nothing
+    :param warmup: run an evolution before the test, so that the plots have data (only with an evolution configuration)
+    :param poll_period: the period of the polls of a running evolution, in seconds
+    :return: a report with the parameters of the test, its duration and the `summarize_records(*)` of the requests
+    """
+    
+    mix = {name: weight for name, weight in (mix or DEFAULT_MIX).items() if weight > 0}
+    unknown = set(mix) - set(SCRIPTS)
+    if unknown:
+        raise ValueError(f'unknown scripts {", ".join(sorted(unknown))}, expected some of {", ".join(SCRIPTS)}')
+    transport = make_transport()
+    status, dependencies = transport.get('/_dash-dependencies')
+    if status != 200:
+        raise RuntimeError(f'cannot load the callbacks of the dashboard (HTTP {status})')
+    
+    if warmup and evolution:
+        # not measured, it only makes the evolution available
+        warmup_user = VirtualUser(transport, dependencies, 'warmup')
+        warmup_user.open()
+        run_evolution(warmup_user, Random(seed), evolution=evolution, poll_period=poll_period)
+    
+    virtual_users = [VirtualUser(make_transport(), dependencies, f'user{i}') for i in range(users)]
+    errors = []
+    
+    def session(user, index):
+        rng = Random(f'{seed}:{index}')
+        try:
+            user.open()
+            for _ in range(sessions):
+                script = rng.choices(list(mix), weights=list(mix.values()))[0]
+                SCRIPTS[script](user, rng, evolution=evolution, poll_period=poll_period)
+                time.sleep(rng.uniform(*think_time))
+        except Exception as ex:
+            errors.append(f'{user.name}: {ex}')
+    
+    started = time.perf_counter()
+    threads = [threading.Thread(target=session, args=(user, i), daemon=True) for i, user in enumerate(virtual_users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_seconds = time.perf_counter() - started
+    
+    records = [record for user in virtual_users for record in user.records]
+    return {
+        'parameters': {'users': users, 'sessions': sessions, 'mix': mix, 'seed': seed, 'think_time': list(think_time)},
+        'wall_seconds': wall_seconds,
+        'failed_users': errors,
+        'callbacks': summarize_records(records, wall_seconds)
+    }
+
+
+def compare_reports(report, baseline, tolerance=0.2, metric='p95_ms'):
+    """
+    :param report: the report of `run_load_test(*)`
+    :param baseline: a previous report, to compare with
+    :param tolerance: the relative slowdown allowed
+    :param metric: the latency metric compared
+    :return: the list of (callback, baseline value, current value) of the callbacks slower than allowed
+    """
+    
+    regressions = []
+    for name, stats in report['callbacks'].items():
+        previous = baseline['callbacks'].get(name)
+        if previous is not None and stats[metric] > previous[metric] * (1 + tolerance):
+            regressions.append((name, previous[metric], stats[metric]))
+    return regressions
+
+
+def format_report(report):
+    """
+    :return: a human-readable table of the report of `run_load_test(*)`
+    """
+    
+    lines = [f'{"callback":<28}{"count":>7}{"errors":>7}{"p50 ms":>9}{"p90 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"max ms":>9}{"req/s":>8}']
+    for name, stats in report['callbacks'].items():
+        lines.append(f'{name:<28}{stats["count"]:>7}{stats["errors"]:>7}{stats["p50_ms"]:>9.1f}{stats["p90_ms"]:>9.1f}{stats["p95_ms"]:>9.1f}'
+                     f'{stats["p99_ms"]:>9.1f}{stats["max_ms"]:>9.1f}{stats["throughput_rps"]:>8.1f}')
+    parameters = report['parameters']
+    lines.append(f'{parameters["users"]} users x {parameters["sessions"]} sessions in {report["wall_seconds"]:.1f}s')
+    lines += [f'FAILED {error}' for error in report['failed_users']]
+    return '\n'.join(lines)
@@ -0,0 +1,166 @@
+import sys
+import tracemalloc
+from collections import OrderedDict
+
+DEFAULT_MEMORY_BUDGETS = {
+    # the maximum size of the cached projections, in MB (the last extracted ones are always kept)
+    'max_cache_mb': 256,
+    # release the orbit held by the worker once all its projections are extracted
+    'release_orbit': False
+}
+
+
+def estimate_size(obj, seen=None):
+    """
+    Estimate the memory held by an object and by everything it references: the deep memory usage of the dataframes, the buffers of the numpy
+    arrays, the containers and the attributes of the objects. Shared objects are counted once.
+    
+    :param obj: the object
+    :param seen: optional, the ids of the objects already counted, to share among several estimates
+    :return: the estimated size, in bytes
+    """
+    
+    import numpy as np
+    import pandas as pd
+    
+    seen = set() if seen is None else seen
+    if obj is None or id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, np.ndarray):
+        # views don't own their buffer
+        return obj.nbytes if obj.base is None else sys.getsizeof(obj)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(estimate_size(key, seen) + estimate_size(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, seen) for item in obj)
+    elif hasattr(obj, '__dict__') and not isinstance(obj, type):
+        size += estimate_size(vars(obj), seen)
+    return size
+
+
+def start_tracing(frames=1):
+    """
+    Start tracing the Python allocations, if not already traced; the tracing slows down the allocations, so it's meant for debugging sessions.
+    """
+    
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def tracemalloc_report(limit=10):
+    """
+    :param limit: the number of allocation sites to report
+    :return: the traced 'current_mb' and 'peak_mb' memory and the 'top' allocation sites by size (as {'location', 'size_mb', 'count'}), or None if
+             the allocations are not traced (see `start_tracing(*)`)
+    """
+    
+    if not tracemalloc.is_tracing():
+        return None
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>')
+    ])
+    return {
+        'current_mb': current / 2 ** 20,
+        'peak_mb': peak / 2 ** 20,
+        'top': [
+            {'location': f'{stat.traceback[0].filename}:{stat.traceback[0].lineno}', 'size_mb': stat.size / 2 ** 20, 'count': stat.count}
+            for stat in snapshot.statistics('lineno')[:limit]
+        ]
+    }
+
+
+class LruCache(object):
+    """
+    A cache of the least recently used items, bounded by their estimated size (see `estimate_size(*)`) rather than by their number.
+    """
+    
+    def __init__(self, max_mb=None):
+        """
+        :param max_mb: the maximum size of the items, in MB, None for unbounded
+        """
+        
+        self.max_mb = max_mb
+        # {key: (value, size in bytes)}, from the least recently used
+        self._items = OrderedDict()
+    
+    def get(self, key, default=None):
+        if key not in self._items:
+            return default
+        self._items.move_to_end(key)
+        return self._items[key][0]
+    
+    def put(self, key, value):
+        """
+        :return: the keys of the items evicted to make room for the new one
+        """
+        
+        self._items[key] = (value, estimate_size(value))
+        self._items.move_to_end(key)
+        return self.evict()
+    
+    def evict(self, max_mb=None):
+        """
+        Evict the least recently used items until the cache fits the budget; the most recent item is always kept.
+        
+        :param max_mb: the budget, by default `max_mb`
+        :return: the keys of the evicted items
+        """
+        
+        max_mb = self.max_mb if max_mb is None else max_mb
+        evicted = []
+        while max_mb is not None and len(self._items) > 1 and self.size_mb() > max_mb:
+            key, _ = self._items.popitem(last=False)
+            evicted.append(key)
+        return evicted
+    
+    def clear(self):
+        self._items.clear()
+    
+    def size_mb(self):
+        return sum(size for _, size in self._items.values()) / 2 ** 20
+    
+    def __len__(self):
+        return len(self._items)
+    
+    def sizes(self):
+        """
+        :return: the size in MB of each item, from the least recently used
+        """
+        
+        return [(key, size / 2 ** 20) for key, (_, size) in self._items.items()]
+
+
+def format_memory_report(report):
+    """
+    :return: a human-readable version of the report of `AppLogic.memory_report(*)`
+    """
+    
+    def rss(process):
+        return f'{process["rss_mb"]:.0f} MB' if process.get('rss_mb') is not None else 'unknown'
+    
+    lines = [f'dashboard process: {rss(report["process"])} RSS']
+    lines += [f'  {artifact["name"]:<24}{artifact["mb"]:>10.2f} MB' for artifact in report['artifacts']]
+    cache = report['cache']
+    budget = f' (budget {cache["max_mb"]:g} MB)' if cache['max_mb'] is not None else ''
+    lines.append(f'  projection cache: {cache["entries"]} entries, {cache["mb"]:.2f} MB{budget}')
+    worker = report.get('worker')
+    if worker is not None:
+        lines.append(f'worker process: {rss(worker)} RSS, orbit {report["orbit"]}, {worker["preview_orbits"]} simulated trajectories')
+        lines += [f'  {name:<24}{mb:>10.2f} MB' for name, mb in worker.get('artifacts', {}).items()]
+    traced = report.get('tracemalloc')
+    if traced is not None:
+        lines.append(f'traced allocations: {traced["current_mb"]:.1f} MB (peak {traced["peak_mb"]:.1f} MB)')
+        lines += [f'  {site["size_mb"]:>8.2f} MB {site["count"]:>8} {site["location"]}' for site in traced['top']]
+    if report.get('evictions'):
+        lines.append('evictions:')
+        lines += [f'  {eviction}' for eviction in report['evictions']]
+    return '\n'.join(lines)
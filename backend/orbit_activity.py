@@ -0,0 +1,192 @@
+import math
+
+import pandas as pd
+
+
+def parse_location(location):
+    """
+    :param location: the string of an Ariadne (composite) discrete location, e.g. '(controller|rising,valve|opened)'
+    :return: the location of each automaton, as {automaton name: location name}; automata with a single location don't appear
+    """
+    
+    location = location.strip()
+    if location.startswith('(') and location.endswith(')'):
+        location = location[1:-1]
+    return dict(part.split('|', 1) for part in location.split(',') if '|' in part)
+
+
+def _merge_intervals(lower, upper):
+    # the union of the intervals, as a list of disjoint [lower, upper] pairs
+    merged = []
+    for lo, hi in sorted(zip(lower, upper)):
+        if merged and lo <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], hi)
+        else:
+            merged.append([lo, hi])
+    return merged
+
+
+def _length(intervals):
+    return float(sum(hi - lo for lo, hi in intervals))
+
+
+def extract_enclosure_table(orbit):
+    """
+    Collect the location, time range and previous events of every enclosure of an orbit, in a single pass over its reach and its final set.
+    
+    :param orbit: the Ariadne orbit
+    :return: a dataframe with the '_loc', '_time_lower', '_time', '_events' and '_final' (whether the enclosure is in the final set) columns
+    """
+    
+    rows = {'_loc': [], '_time_lower': [], '_time': [], '_events': [], '_final': []}
+    for enclosures, final in ((orbit.reach(), False), (orbit.final(), True)):
+        for encl in enclosures:
+            time_range = encl.time_range()
+            rows['_loc'].append(str(encl.location()))
+            rows['_time_lower'].append(float(str(time_range.lower_bound())))
+            rows['_time'].append(float(str(time_range.upper_bound())))
+            rows['_events'].append(','.join(str(event) for event in encl.previous_events()))
+            rows['_final'].append(final)
+    return pd.DataFrame(rows)
+
+
+def aggregate_activity(enclosures):
+    """
+    Aggregate what an orbit did in each location: the number of enclosures, the time spent (the length of the union of their time ranges) and how
+    many of them are final, plus the discrete transitions taken. Since the previous events of an enclosure are the whole history of its branch, a
+    transition is counted once per branch, from the location of the enclosures of its history without the last event.
+    
+    :param enclosures: a dataframe with the '_loc', '_time_lower', '_time' and '_events' columns, such as the one of `extract_enclosure_table(*)`,
+                       the polytopes of a `ProjectionStore` or the bounding boxes; the '_final' column is optional
+    :return: a dictionary with the 'locations' ({location: {'visits', 'time_spent', 'final', 'intervals'}}) and the 'transitions' (a list of
+             {'source', 'event', 'target', 'count'}) of the orbit, where the locations are the strings of the Ariadne composite locations
+    """
+    
+    final = enclosures['_final'] if '_final' in enclosures else pd.Series(False, index=enclosures.index)
+    reach = enclosures[~final.astype(bool)]
+    locations = {}
+    for location, group in reach.groupby('_loc', sort=True):
+        intervals = _merge_intervals(group['_time_lower'].to_numpy(), group['_time'].to_numpy())
+        locations[location] = {'visits': len(group), 'time_spent': _length(intervals), 'final': 0, 'intervals': intervals}
+    for location, count in enclosures.loc[final.astype(bool), '_loc'].value_counts().items():
+        locations.setdefault(location, {'visits': 0, 'time_spent': 0.0, 'final': 0, 'intervals': []})['final'] = int(count)
+    
+    # the location reached by each branch, i.e. by each distinct history of events
+    branches = reach.drop_duplicates('_events').set_index('_events')['_loc'].to_dict()
+    transitions = {}
+    for history, target in branches.items():
+        if not history:
+            continue
+        prefix, _, event = history.rpartition(',')
+        key = (branches.get(prefix), event, target)
+        transitions[key] = transitions.get(key, 0) + 1
+    return {
+        'locations': locations,
+        'transitions': [
+            {'source': source, 'event': event, 'target': target, 'count': count}
+            for (source, event, target), count in sorted(transitions.items(), key=lambda item: (-item[1], item[0][1]))
+        ]
+    }
+
+
+def component_activity(activity, automaton_name):
+    """
+    Project the activity of an orbit on a single automaton of the composition.
+    
+    :param activity: the result of `aggregate_activity(*)`
+    :param automaton_name: the name of the automaton
+    :return: the node statistics ({location name: {'visits', 'time_spent', 'final'}}) and the edge counts ({(source, event, target): count}) of the
+             automaton, where the source is None when unknown
+    """
+    
+    def project(location):
+        if location is None:
+            return None
+        # a location of an automaton with a single location is not named
+        return parse_location(location).get(automaton_name, '--')
+    
+    nodes = {}
+    for location, stats in activity['locations'].items():
+        node = nodes.setdefault(project(location), {'visits': 0, 'final': 0, 'intervals': []})
+        node['visits'] += stats['visits']
+        node['final'] += stats['final']
+        node['intervals'] += stats['intervals']
+    for node in nodes.values():
+        intervals = node.pop('intervals')
+        node['time_spent'] = _length(_merge_intervals([lo for lo, _ in intervals], [hi for _, hi in intervals]))
+    
+    edges = {}
+    for transition in activity['transitions']:
+        # if the automaton doesn't take part in the event, this is a self-loop missing from its graph, which is never drawn
+        key = (project(transition['source']), transition['event'], project(transition['target']))
+        edges[key] = edges.get(key, 0) + transition['count']
+    return nodes, edges
+
+
+def product_activity(activity, automaton_names):
+    """
+    Express the activity of an orbit on the nodes of the product graph (see `ProductGraph.node_id(*)`).
+    
+    :param activity: the result of `aggregate_activity(*)`
+    :param automaton_names: the names of all the automata of the composition
+    :return: the node statistics and the edge counts, as in `component_activity(*)`
+    """
+    
+    def node_id(location):
+        if location is None:
+            return None
+        locations = parse_location(location)
+        return ','.join(f'{name}|{locations.get(name, "--")}' for name in sorted(automaton_names))
+    
+    nodes = {node_id(location): {key: stats[key] for key in ('visits', 'time_spent', 'final')} for location, stats in activity['locations'].items()}
+    edges = {}
+    for transition in activity['transitions']:
+        key = (node_id(transition['source']), transition['event'], node_id(transition['target']))
+        edges[key] = edges.get(key, 0) + transition['count']
+    return nodes, edges
+
+
+def activity_stylesheet(nodes, edges, labels=None):
+    """
+    Build the Cytoscape style rules drawing the activity of an orbit on an automaton graph: the visited locations are colored by their number of
+    enclosures and labelled with it and with the time spent, the edges are as thick as the number of times they were taken; the rest is faded.
+    
+    :param nodes: the node statistics, as returned by `component_activity(*)`
+    :param edges: the edge counts, as returned by `component_activity(*)`
+    :param labels: optional, the labels of the nodes as {node id: label}, by default their id
+    :return: the list of style rules, to be appended to the stylesheet of the graph
+    """
+    
+    max_visits = max((stats['visits'] for stats in nodes.values()), default=0)
+    max_count = max(edges.values(), default=0)
+    rules = [
+        {'selector': 'node', 'style': {'opacity': 0.35}},
+        {'selector': 'edge', 'style': {'opacity': 0.25, 'line-style': 'dashed'}}
+    ]
+    for node, stats in nodes.items():
+        # log scale, since the visits span orders of magnitude
+        intensity = math.log1p(stats['visits']) / math.log1p(max_visits) if max_visits else 0.0
+        final = f', {stats["final"]} final' if stats['final'] else ''
+        rules.append({
+            'selector': f'node[id = "{node}"]',
+            'style': {
+                'opacity': 1,
+                'background-color': f'rgb({int(230 - 200 * intensity)}, {int(240 - 150 * intensity)}, 255)',
+                'label': f'{(labels or {}).get(node, node)}\n{stats["visits"]} encl., {stats["time_spent"]:.3g}s{final}',
+                'text-wrap': 'wrap'
+            }
+        })
+    for (source, event, target), count in edges.items():
+        source_selector = f'[source = "{source}"]' if source is not None else ''
+        rules.append({
+            'selector': f'edge{source_selector}[target = "{target}"][label = "{event}"]',
+            'style': {
+                'opacity': 1,
+                'line-style': 'solid',
+                'width': 1 + 5 * count / max_count,
+                'line-color': '#d62728',
+                'target-arrow-color': '#d62728',
+                'label': f'{event} ×{count}'
+            }
+        })
+    return rules
@@ -0,0 +1,208 @@
+import heapq
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from backend.batch_export import all_projections
+from backend.evolver_tuning import configure_evolver
+from backend.initial_sets import make_initial_set
+from backend.projection_store import ProjectionStore, extract_bounding_boxes, extract_projection_store
+from backend.resource_budgets import DEFAULT_BUDGETS, BudgetExceeded, exceeded_budget, watch_budgets
+from backend.systems_loader import build_system
+
+
+def subdivide_values(values, pieces):
+    """
+    Split the box of the initial values into (at most) the given number of sub-boxes, always bisecting the widest range of the widest box; the
+    sub-boxes share their boundaries, so together they cover the original box.
+    
+    :param values: a dictionary {variable name: value} or {variable name: (lower bound, upper bound)}
+    :param pieces: the number of sub-boxes
+    :return: a list of dictionaries of values, in the same format
+    """
+    
+    def widest(box):
+        ranges = [(upper - lower, var) for var, (lower, upper) in box.items()]
+        return max(ranges, default=(0, None))
+    
+    box = {var: tuple(float(bound) for bound in value) for var, value in values.items() if isinstance(value, (list, tuple))}
+    # (-width, creation order, box), so that the widest box is bisected first
+    heap = [(-widest(box)[0], 0, box)]
+    created = 1
+    while len(heap) < pieces and heap[0][0] < 0:
+        _, _, box = heapq.heappop(heap)
+        _, var = widest(box)
+        lower, upper = box[var]
+        middle = (lower + upper) / 2
+        for half in ((lower, middle), (middle, upper)):
+            sub_box = dict(box, **{var: half})
+            heapq.heappush(heap, (-widest(sub_box)[0], created, sub_box))
+            created += 1
+    
+    return [{**values, **sub_box} for _, _, sub_box in sorted(heap, key=lambda item: item[1])]
+
+
+def sub_box_strict_bounds(sub_box, values, strict_bounds):
+    """
+    Only the bounds a sub-box shares with the original box keep their strictness: the bounds between two sub-boxes are included, so that together the
+    sub-boxes cover exactly the original set.
+    
+    :param sub_box: the values of the sub-box, as returned by `subdivide_values(*)`
+    :param values: the original values
+    :param strict_bounds: a dictionary {variable name: (strict lower bound, strict upper bound)} of the original box, or None
+    :return: the strict bounds of the sub-box, in the same format
+    """
+    
+    return {
+        var: (strict_lower and float(sub_box[var][0]) == float(values[var][0]), strict_upper and float(sub_box[var][1]) == float(values[var][1]))
+        for var, (strict_lower, strict_upper) in (strict_bounds or {}).items()
+        if isinstance(sub_box.get(var), (list, tuple))
+    }
+
+
+def evolve_projections(system_spec, locations, values, final_time, max_transitions, projections, variables, evolver_settings=None,
+                       strict_bounds=None):
+    """
+    Evolve a system and extract its projections and bounding boxes. Since the arguments and the result are plain Python objects, this is meant to be
+    run in a separate process.
+    
+    :param system_spec: the system factory, in the `package.module:factory` format
+    :param locations: the initial locations, as {automaton name: location name}
+    :param values: the initial values, as {variable name: value} or {variable name: (lower bound, upper bound)}
+    :param final_time: the final continuous time
+    :param max_transitions: the maximum number of transitions
+    :param projections: the list of (x, y) projections to extract
+    :param variables: the variables of the bounding boxes
+    :param evolver_settings: optional, the evolver configuration (see `configure_evolver()`)
+    :param strict_bounds: optional, the bounds to exclude from the initial set (see `make_initial_set(*)`)
+    :return: the `ProjectionStore` and the bounding boxes dataframe of the orbit
+    """
+    
+    import pyariadne as ari
+    
+    evolver = ari.GeneralHybridEvolver(build_system(system_spec))
+    configure_evolver(evolver, evolver_settings)
+    initial_set = make_initial_set(locations, values, strict_bounds)
+    final_time = ari.HybridTime(ari.dec(float(final_time)), int(max_transitions))
+    orbit = evolver.orbit(initial_set, ari.HybridTerminationCriterion(final_time), ari.Semantics.UPPER)
+    orbit_reach = orbit.reach()
+    return extract_projection_store(orbit_reach, projections), extract_bounding_boxes(orbit_reach, variables)
+
+
+def _send_sub_box(connection, *args):
+    # the body of the sub-box processes
+    try:
+        connection.send(('value', evolve_projections(*args)))
+    except Exception as ex:
+        connection.send(('error', f'{ex}\n{traceback.format_exc()}'))
+    connection.close()
+
+
+def evolve_subdivided(system_spec, locations, values, final_time, max_transitions, variables, pieces, evolver_settings=None, workers=None,
+                      on_progress=None, budgets=None, strict_bounds=None):
+    """
+    Evolve a system from a wide initial set by subdividing it (see `subdivide_values(*)`) and evolving each sub-box in its own process, then merge
+    the results. Every polytope is tagged with the sub-box it comes from, in the '_provenance' column.
+    
+    The budgets apply to the run as a whole: the wall time counts from the start of the first sub-box, the memory budget applies to each process
+    and the enclosures budget to the sub-boxes evolved so far (their enclosures are only known once they are done). As soon as one is exceeded,
+    every running process is killed and no further sub-box is started.
+    
+    :param variables: the variables of the system, all the (t, var) and (var, var) projections of them are extracted
+    :param pieces: the number of sub-boxes
+    :param workers: the number of processes, by default one for each sub-box (up to the number of CPUs)
+    :param on_progress: optional, called with the number of evolved sub-boxes and their total whenever a sub-box is done
+    :param budgets: optional, a dictionary overriding `DEFAULT_BUDGETS`
+    :param strict_bounds: optional, the bounds to exclude from the initial set, only applied to the outer bounds of the sub-boxes (see
+                          `sub_box_strict_bounds(*)`)
+    :return: the merged `ProjectionStore` and the merged bounding boxes dataframe
+    :raise BudgetExceeded: if a budget was exceeded, along with the merged results of the sub-boxes evolved until then (if any)
+    """
+    
+    budgets = {**DEFAULT_BUDGETS, **(budgets or {})}
+    sub_values = subdivide_values(values, pieces)
+    projections = all_projections(variables)
+    state_vars = [var for var in variables if var != 't']
+    workers = workers or min(len(sub_values), os.cpu_count() or 1)
+    context = multiprocessing.get_context('spawn')
+    started = time.monotonic()
+    lock = Lock()
+    running = {}
+    results = [None] * len(sub_values)
+    # {'budget' or 'error': the reason of the first exceeded budget or failed sub-box}
+    stopped = {}
+    enclosures = [0]
+    
+    def stop(kind, reason):
+        with lock:
+            stopped.setdefault(kind, reason)
+            processes = list(running.values())
+        for process in processes:
+            process.kill()
+    
+    def evolve_sub_box(index, sub_box):
+        receiver, sender = context.Pipe(duplex=False)
+        # started while holding the lock, so that `stop()` either kills it or prevents it
+        with lock:
+            if stopped:
+                return
+            process = context.Process(
+                target=_send_sub_box,
+                args=(sender, system_spec, locations, sub_box, final_time, max_transitions, projections, state_vars, evolver_settings,
+                      sub_box_strict_bounds(sub_box, values, strict_bounds)),
+                daemon=True
+            )
+            process.start()
+            running[index] = process
+        sender.close()
+        # the sub-boxes waiting for a free process spend the wall time budget as well
+        watch_budgets(budgets, process.pid, process.is_alive, lambda reason: stop('budget', reason), lambda: enclosures[0], started=started)
+        try:
+            status, payload = receiver.recv()
+        except EOFError:
+            process.join()
+            status, payload = 'died', f'the process of sub-box #{index + 1} died with exit code {process.exitcode}'
+        process.join()
+        with lock:
+            running.pop(index)
+        if status == 'value':
+            with lock:
+                results[index] = payload
+                enclosures[0] += len(payload[1])
+                done = sum(result is not None for result in results)
+            reason = exceeded_budget(budgets, enclosures=enclosures[0])
+            if reason is not None:
+                stop('budget', reason)
+            if on_progress is not None:
+                on_progress(done, len(sub_values))
+        elif 'budget' not in stopped:
+            # a failed sub-box fails the whole run, as there would be a hole in the orbit
+            stop('error', payload if status == 'died' else f'sub-box #{index + 1}: {payload}')
+    
+    # the threads just wait for the processes of the sub-boxes
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in [executor.submit(evolve_sub_box, i, sub_box) for i, sub_box in enumerate(sub_values)]:
+            future.result()
+    
+    if 'error' in stopped and 'budget' not in stopped:
+        raise RuntimeError(stopped['error'])
+    done = [i for i, result in enumerate(results) if result is not None]
+    tags = [_provenance_tag(i, sub_values[i], values) for i in done]
+    merged = (ProjectionStore.merge([results[i][0] for i in done], tags), ProjectionStore.merge_tables([results[i][1] for i in done], tags)) \
+        if done else None
+    if 'budget' in stopped:
+        raise BudgetExceeded(f'{stopped["budget"]}, {len(done)}/{len(sub_values)} sub-boxes evolved', merged)
+    return merged
+
+
+def _provenance_tag(index, sub_box, values):
+    # only the subdivided variables are interesting
+    ranges = [
+        f'{var}=[{sub_box[var][0]:g}:{sub_box[var][1]:g}]'
+        for var in sorted(sub_box)
+        if isinstance(sub_box[var], tuple) and sub_box[var] != tuple(float(bound) for bound in values[var])
+    ]
+    return f'#{index + 1} ' + ', '.join(ranges) if ranges else f'#{index + 1}'
@@ -1,12 +1,18 @@
+import math
 import re
-import sys
-from typing import List
+from typing import List, TYPE_CHECKING
 
 import dash_cytoscape as cyto
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objs as go
-import pyariadne as ari
+
+from backend.projection_store import ProjectionStore, extract_projection_store
+
+if TYPE_CHECKING:
+    # pyariadne is only needed to extract data from the orbits, plotting works without it (e.g. in worker processes)
+    import pyariadne as ari
 
 
 def plot_trajectory(polytopes_df, var_x, var_y, var_z=None, use_mesh=False):
@@ -65,6 +71,294 @@ def plot_trajectory(polytopes_df, var_x, var_y, var_z=None, use_mesh=False):
     return fig
 
 
+# paths of the edges of the unit boxes, NaN separates the disconnected segments
+_BOX_2D_PATH = np.array([[0, 0], [1, 0], [1, 1], [0, 1], [0, 0], [np.nan, np.nan]])
+_BOX_3D_PATH = np.array([
+    [0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0], [0, 0, 0], [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1], [0, 0, 1], [np.nan] * 3,
+    [1, 0, 0], [1, 0, 1], [np.nan] * 3,
+    [1, 1, 0], [1, 1, 1], [np.nan] * 3,
+    [0, 1, 0], [0, 1, 1], [np.nan] * 3
+])
+
+
+def plot_bounding_boxes(boxes_df, var_x, var_y, var_z=None, use_error_bars=False):
+    """
+    Plot the bounding boxes of the enclosures over the provided axes, as box outlines (filled in 2D, wireframes in 3D) or as error bars around the
+    centre of each box. All the boxes of a location are drawn by a single trace, built at once from the lower/upper bounds.
+    
+    :param boxes_df: a dataframe obtained via the `extract_bounding_boxes()` method
+    :param var_x: the x axis
+    :param var_y: the y axis
+    :param var_z: optional, the z axis
+    :param use_error_bars: draw error bars instead of the outlines of the boxes
+    :return: a Plotly figure
+    """
+    
+    axes = [var_x, var_y] + ([var_z] if var_z is not None else [])
+    lower_columns, upper_columns = [f'{var}_lower' for var in axes], [f'{var}_upper' for var in axes]
+    boxes_df = boxes_df.dropna(subset=lower_columns + upper_columns)
+    colors = px.colors.qualitative.Plotly
+    
+    traces = []
+    for i, (location, location_boxes) in enumerate(boxes_df.groupby('_loc', sort=False)):
+        lower = location_boxes[lower_columns].to_numpy(dtype=float)
+        upper = location_boxes[upper_columns].to_numpy(dtype=float)
+        color = colors[i % len(colors)]
+        if use_error_bars:
+            centre, half_width = (lower + upper) / 2, (upper - lower) / 2
+            error_bars = [{'type': 'data', 'array': half_width[:, axis], 'color': color} for axis in range(len(axes))]
+            if var_z is None:
+                traces.append(go.Scatter(x=centre[:, 0], y=centre[:, 1], error_x=error_bars[0], error_y=error_bars[1],
+                                         mode='markers', marker={'color': color, 'size': 3}, name=location))
+            else:
+                traces.append(go.Scatter3d(x=centre[:, 0], y=centre[:, 1], z=centre[:, 2], error_x=error_bars[0], error_y=error_bars[1],
+                                           error_z=error_bars[2], mode='markers', marker={'color': color, 'size': 2}, name=location))
+        else:
+            unit_path = _BOX_2D_PATH if var_z is None else _BOX_3D_PATH
+            # scale and translate the unit path for every box at once, then chain the paths (NaN separated)
+            path = (lower[:, None, :] + unit_path[None, :, :] * (upper - lower)[:, None, :]).reshape(-1, len(axes))
+            if var_z is None:
+                traces.append(go.Scatter(x=path[:, 0], y=path[:, 1], mode='lines', fill='toself', line={'color': color, 'width': 1},
+                                         name=location))
+            else:
+                traces.append(go.Scatter3d(x=path[:, 0], y=path[:, 1], z=path[:, 2], mode='lines', line={'color': color, 'width': 2},
+                                           name=location))
+    
+    fig = go.Figure(data=traces)
+    if var_z is None:
+        fig.update_layout(xaxis_title_text=var_x, yaxis_title_text=var_y)
+    else:
+        fig.update_layout(scene={'xaxis': {'title': {'text': var_x}}, 'yaxis': {'title': {'text': var_y}}, 'zaxis': {'title': {'text': var_z}}})
+    fig.update_layout(
+        legend_title_text='Location',
+        transition_duration=500
+    )
+    return fig
+
+
+def plot_envelopes(envelopes_df, var):
+    """
+    Plot the envelopes of a variable over time as one filled band for each location, each segment of the envelope being a closed path (None
+    separated) going forward along the upper envelope and back along the lower one.
+    
+    :param envelopes_df: a dataframe obtained via the `compute_envelopes()` method
+    :param var: the variable
+    :return: a Plotly figure
+    """
+    
+    colors = px.colors.qualitative.Plotly
+    traces = []
+    for i, (location, location_envelopes) in enumerate(envelopes_df.groupby('_loc', sort=False)):
+        x, y = [], []
+        for _, segment in location_envelopes.groupby('_segment', sort=True):
+            t = segment['t'].to_numpy(dtype=float)
+            x.extend(np.concatenate([t, t[::-1], t[:1]]).tolist() + [None])
+            y.extend(np.concatenate([segment[f'{var}_upper'], segment[f'{var}_lower'].to_numpy()[::-1], segment[f'{var}_upper'].to_numpy()[:1]])
+                     .tolist() + [None])
+        color = colors[i % len(colors)]
+        traces.append(go.Scatter(x=x, y=y, mode='lines', fill='toself', line={'color': color, 'width': 1}, name=location))
+    
+    fig = go.Figure(data=traces)
+    fig.update_layout(
+        xaxis_title_text='t',
+        yaxis_title_text=var,
+        legend_title_text='Location',
+        transition_duration=500
+    )
+    return fig
+
+
+def _frame_paths(polytopes_df, axes, edges):
+    # the rows of each polytope go to the first frame whose time reaches theirs, so a frame only holds the polytopes (or the pieces of the
+    # simulated curves) which are new to it; a piece of curve starts from the last point of the previous one, to remain connected
+    df = polytopes_df.reset_index(drop=True)
+    times = df['_time'].to_numpy(dtype=float)
+    df['_frame'] = np.minimum(np.searchsorted(edges, times, side='left'), len(edges) - 1)
+    df['_order'] = np.arange(len(df), dtype=float)
+    same_polytope = df['_polytope_id'].to_numpy()[1:] == df['_polytope_id'].to_numpy()[:-1]
+    frame = df['_frame'].to_numpy()
+    bridges = np.flatnonzero(same_polytope & (frame[1:] != frame[:-1]))
+    if len(bridges):
+        bridge_rows = df.iloc[bridges].copy()
+        bridge_rows['_frame'] = frame[bridges + 1]
+        bridge_rows['_order'] += 0.5
+        df = pd.concat([df, bridge_rows], ignore_index=True)
+    df = df.sort_values(['_frame', '_loc', '_polytope_id', '_order'], kind='stable')
+    
+    for (frame, location), group in df.groupby(['_frame', '_loc'], sort=False):
+        ids = group['_polytope_id'].to_numpy()
+        # NaN separates the polytopes, so that each (frame, location) pair is drawn by a single trace
+        breaks = np.flatnonzero(ids[1:] != ids[:-1]) + 1
+        yield frame, location, [np.insert(group[var].to_numpy(dtype=float), breaks, np.nan) for var in axes]
+
+
+def animation_frame_edges(polytopes_df, axes, max_frames=60):
+    """
+    :param polytopes_df: a dataframe obtained via the `orbit_to_dataframe()` method
+    :param axes: the plotted variables
+    :param max_frames: the maximum number of frames
+    :return: the times of the frames of `plot_trajectory_animation(*)`, each one showing the rows up to its time, or None if there's nothing to plot
+    """
+    
+    times = polytopes_df.dropna(subset=list(axes) + ['_time'])['_time'].to_numpy(dtype=float)
+    if len(times) == 0:
+        return None
+    return np.unique(np.linspace(times.min(), times.max(), max(1, min(max_frames, len(np.unique(times))))))
+
+
+def plot_trajectory_animation(polytopes_df, var_x, var_y, var_z=None, max_frames=60, edges=None):
+    """
+    Plot the provided dataframe as a Plotly animation of the evolution, which can be played or scrubbed in the browser without going back to the
+    server. The time span is split into at most `max_frames` buckets, and the frames are delta-encoded: the geometry of each polytope is sent once,
+    in the trace of the (bucket, location) pair where it appears, and a frame only toggles the visibility of the traces.
+    
+    :param polytopes_df: a dataframe obtained via the `orbit_to_dataframe()` method
+    :param var_x: the x axis
+    :param var_y: the y axis
+    :param var_z: optional, the z axis
+    :param max_frames: the maximum number of frames
+    :param edges: optional, the times of the frames, by default from `animation_frame_edges(*)`, e.g. to keep the frames of the polytopes before
+                  pruning them
+    :return: the dictionary of a Plotly figure, showing the whole evolution (i.e. the last frame) at first
+    """
+    
+    axes = [var_x, var_y] + ([var_z] if var_z is not None else [])
+    polytopes_df = polytopes_df.dropna(subset=axes + ['_time'])
+    if polytopes_df.empty:
+        return plot_trajectory(polytopes_df, var_x, var_y, var_z).to_plotly_json()
+    
+    is_punctual = polytopes_df['_polytope_id'].value_counts(sort=False).min() < 2
+    edges = animation_frame_edges(polytopes_df, axes, max_frames) if edges is None else edges
+    colors = px.colors.qualitative.Plotly
+    location_colors = {location: colors[i % len(colors)] for i, location in enumerate(polytopes_df['_loc'].unique())}
+    
+    traces, trace_frames, in_legend = [], [], set()
+    for frame, location, path in _frame_paths(polytopes_df, axes, edges):
+        color = location_colors[location]
+        style = {
+            'mode': 'markers' if is_punctual else 'lines',
+            'name': location,
+            'legendgroup': location,
+            # a single legend entry for all the traces of a location
+            'showlegend': location not in in_legend,
+            'marker': {'color': color, 'size': 3},
+            'line': {'color': color, 'width': 1}
+        }
+        in_legend.add(location)
+        if var_z is None:
+            traces.append(go.Scatter(x=path[0], y=path[1], **style))
+        else:
+            traces.append(go.Scatter3d(x=path[0], y=path[1], z=path[2], **style))
+        trace_frames.append(frame)
+    trace_frames = np.array(trace_frames)
+    
+    # the frames don't redraw the axes, so they are fixed to the whole evolution
+    ranges = [[float(np.nanmin(polytopes_df[var])), float(np.nanmax(polytopes_df[var]))] for var in axes]
+    playback = {'frame': {'duration': 100, 'redraw': True}, 'transition': {'duration': 0}, 'mode': 'immediate', 'fromcurrent': True}
+    fig = go.Figure(data=traces)
+    if var_z is None:
+        fig.update_layout(xaxis={'title': {'text': var_x}, 'range': ranges[0]}, yaxis={'title': {'text': var_y}, 'range': ranges[1]})
+    else:
+        fig.update_layout(scene={
+            axis: {'title': {'text': var}, 'range': var_range}
+            for axis, var, var_range in zip(('xaxis', 'yaxis', 'zaxis'), axes, ranges)
+        })
+    fig.update_layout(
+        legend_title_text='Location',
+        updatemenus=[{
+            'type': 'buttons',
+            'direction': 'left',
+            'x': 0, 'y': 0, 'xanchor': 'right', 'yanchor': 'top',
+            'pad': {'r': 10, 't': 60},
+            'buttons': [
+                {'label': '\u25b6', 'method': 'animate', 'args': [None, playback]},
+                {'label': '\u23f8', 'method': 'animate', 'args': [[None], {**playback, 'frame': {'duration': 0, 'redraw': False}}]}
+            ]
+        }],
+        sliders=[{
+            'active': len(edges) - 1,
+            'x': 0, 'y': 0, 'len': 1, 'xanchor': 'left', 'yanchor': 'top',
+            'pad': {'t': 50},
+            'currentvalue': {'prefix': 't = '},
+            'steps': [
+                {'label': f'{edge:.3g}', 'method': 'animate', 'args': [[str(i)], {**playback, 'frame': {'duration': 0, 'redraw': True}}]}
+                for i, edge in enumerate(edges)
+            ]
+        }]
+    )
+    figure = fig.to_plotly_json()
+    # plain dictionaries, since validating the thousands of entries of the frames would take seconds
+    figure['frames'] = [
+        {'name': str(i), 'data': [{'visible': bool(visible)} for visible in trace_frames <= i]}
+        for i in range(len(edges))
+    ]
+    return figure
+
+
+def _closed_paths(polytope_ids, x, y):
+    # the vertices of each polygon, followed by its first vertex and by a NaN separating it from the next one
+    starts = np.flatnonzero(np.r_[True, polytope_ids[1:] != polytope_ids[:-1]])
+    ends = np.r_[starts[1:], len(polytope_ids)]
+    positions = np.repeat(ends, 2)
+    separator = np.full(len(starts), np.nan)
+    return (np.insert(x, positions, np.column_stack([x[starts], separator]).ravel()),
+            np.insert(y, positions, np.column_stack([y[starts], separator]).ravel()))
+
+
+def plot_scatter_matrix(store, variables, time_window=None):
+    """
+    Plot the (x, y) projections of every pair of variables of a `ProjectionStore` as small multiples, in the lower triangle of a matrix whose cells
+    share the axes of their row and column. The polytopes of every cell are filtered by the same time window, and the locations are linked across
+    the cells (hiding a location from the legend hides it everywhere).
+    
+    :param store: the `ProjectionStore`, with the (x, y) projection of every pair of the variables, in the order of `variables`
+    :param variables: the variables, at least two of them
+    :param time_window: optional, the (first, last) time of the polytopes to plot
+    :return: a Plotly figure
+    """
+    
+    from plotly.subplots import make_subplots
+    
+    polytopes = store.polytopes
+    if time_window is not None:
+        polytopes = polytopes[(time_window[0] <= polytopes['_time']) & (polytopes['_time'] <= time_window[1])]
+    locations = polytopes.set_index('_polytope_id')['_loc']
+    colors = px.colors.qualitative.Plotly
+    location_colors = {location: colors[i % len(colors)] for i, location in enumerate(store.polytopes['_loc'].unique())}
+    
+    size = len(variables) - 1
+    fig = make_subplots(
+        rows=size, cols=size, shared_xaxes=True, shared_yaxes=True, horizontal_spacing=0.02, vertical_spacing=0.02,
+        specs=[[{} if column <= row else None for column in range(size)] for row in range(size)]
+    )
+    in_legend = set()
+    for row in range(size):
+        for column in range(row + 1):
+            var_x, var_y = variables[column], variables[row + 1]
+            vertices = store.projection(var_x, var_y)
+            vertices = vertices[vertices['_polytope_id'].isin(locations.index)]
+            vertex_locations = locations.reindex(vertices['_polytope_id']).to_numpy()
+            for location in pd.unique(vertex_locations):
+                selected = vertices[vertex_locations == location]
+                x, y = _closed_paths(selected['_polytope_id'].to_numpy(), selected['_x'].to_numpy(dtype=float), selected['_y'].to_numpy(dtype=float))
+                fig.add_trace(
+                    go.Scatter(x=x, y=y, mode='lines', line={'color': location_colors[location], 'width': 1}, name=location, legendgroup=location,
+                               showlegend=location not in in_legend),
+                    row=row + 1, col=column + 1
+                )
+                in_legend.add(location)
+            if row == size - 1:
+                fig.update_xaxes(title_text=var_x, row=row + 1, col=column + 1)
+            if column == 0:
+                fig.update_yaxes(title_text=var_y, row=row + 1, col=column + 1)
+    
+    fig.update_layout(
+        legend_title_text='Location',
+        height=max(450, 220 * size)
+    )
+    return fig
+
+
 def get_all_variables(system):
     """
     Obtain all the variables (dynamic and auxiliary) of the system.
@@ -92,6 +386,52 @@ def _get_vars(orbit_reach):
     return [orbit_reach[0].state_auxiliary_space().variable(i) for i in range(orbit_reach[0].state_auxiliary_space().dimension())]
 
 
+def is_simulation_orbit(orbit):
+    """
+    Tell whether the orbit was produced by a `HybridSimulator` (a sequence of point trajectories, one for each visited location) rather than by an
+    evolver (a list of enclosures).
+    
+    :param orbit: an Ariadne orbit (or its reach), or a list of them
+    :return: True for simulation orbits
+    """
+    
+    orbits = orbit if isinstance(orbit, (list, tuple)) else [orbit]
+    return len(orbits) > 0 and all(hasattr(o, 'curves') for o in orbits)
+
+
+# orbit.curves() -> HybridInterpolatedCurve -> InterpolatedCurve -> (time, ApproximatePoint)
+#                        |
+#                        \_ location and space of the points (the state and auxiliary variables of the location)
+def _simulation_to_dataframe(orbits, var_list, require_time):
+    def member(obj, name):
+        # depending on the bindings, the fields of the curve are exposed as properties or as getters
+        attribute = getattr(obj, name)
+        return attribute() if callable(attribute) else attribute
+    
+    trajectories = []
+    for orbit in orbits:
+        for hybrid_curve in orbit.curves():
+            location = str(member(hybrid_curve, 'location'))
+            space = member(hybrid_curve, 'space')
+            space_variables = {str(space.variable(i)): i for i in range(space.dimension())}
+            for time, point in member(hybrid_curve, 'curve'):
+                sample = {
+                    '_polytope_id': len(trajectories) + 1,
+                    '_loc': location,
+                    '_time': float(str(time))
+                }
+                if require_time:
+                    sample['t'] = sample['_time']
+                # variables which are not defined in this location are left empty
+                sample.update({
+                    var: float(str(point[space_variables[var]])) if var in space_variables else float('nan')
+                    for var in var_list
+                })
+                trajectories.append(sample)
+    
+    return pd.DataFrame(trajectories)
+
+
 # encl.continuous_set().state_time_auxiliary_set().affine_over_approximation().boundary(var_x, var_y)
 # HybridEnclosure -> LabelledEnclosure -> ValidatedConstrainedImageSet -> ValidatedAffineConstrainedImageSet -> List<Point2d>
 #    |                      |                             |                                |                          |
@@ -106,10 +446,18 @@ def _get_vars(orbit_reach):
 #                                                                                             1) differentiable variables (in alphabetical order),
 #                                                                                             2) time,
 #                                                                                             3) auxiliary variables (in alphabetical order)
-def orbit_to_dataframe(orbit_reach: ari.HybridEnclosureListSet, var_list: List[str], collapse=False):
+def orbit_to_dataframe(orbit_reach: 'ari.HybridEnclosureListSet', var_list: List[str], collapse=False):
     """
     Transforms an Ariadne orbit reach to a Pandas dataframe, allowing immediate Plotly Express plotting.
     
+    Simulation orbits (obtained with `HybridSimulator.orbit()`, or a list of them) are accepted as well: in that case every point of a trajectory is a
+    row of the dataframe and every trajectory is treated as a polyline, i.e. a single '_polytope_id', while the `collapse` parameter is ignored.
+    
+    The extraction goes through a `ProjectionStore`, so '_polytope_id' is the (1-based) index of the enclosure in `orbit_reach`, the same in every
+    projection and in the bounding boxes of the enclosures (see `extract_bounding_boxes()`). It used to number the extracted polytopes instead: the
+    ids now have gaps where an enclosure is skipped for having less than 2 vertices. When several dataframes of the same orbit are needed, extract the
+    store once with `extract_projection_store()` and assemble each dataframe with `to_dataframe()` instead.
+    
     Each dataframe contains the '_polytope_id', '_loc' and '_time' columns, and a column for every variable in `var_list`. The list of variables is provided
     to extract only the required values. When `var_list = []` or `var_list = ['t']` no extra columns is added and and empty dataframe, still with all the
     columns, is returned.
@@ -124,88 +472,38 @@ def orbit_to_dataframe(orbit_reach: ari.HybridEnclosureListSet, var_list: List[s
      - ignore the truncation and just save the polytopes "as they are", which means we will have less appealing plots
      - collapse the polytopes to their barycenter, producing a less representative but more appealing plot
     
-    :param orbit_reach: the Ariadne `orbit.reach()` result
+    :param orbit_reach: the Ariadne `orbit.reach()` result, or a simulation orbit
     :param var_list: the list of variables we want to extract
     :param collapse: collapse higher dimensional polytopes to their barycenter (a single point)
     :return: a dataframe representing the flattened version of the provided `orbit_reach`
     """
     
-    def extract_points(points_2d):
-        x, y = [p.x for p in points_2d], [p.y for p in points_2d]
-        if collapse:
-            return sum(x) / len(points_2d), sum(y) / len(points_2d)
-        else:
-            return x + [x[0]], y + [y[0]]
-    
     # manually extract time variable because each axes is constructed against it
-    var_list = var_list.copy()
-    require_time = 't' in var_list
+    state_vars = var_list.copy()
+    require_time = 't' in state_vars
     if require_time:
-        var_list.remove('t')
+        state_vars.remove('t')
     
     # return empty
-    if len(var_list) == 0:
-        df = pd.DataFrame()
-        df['_polytope_id'] = df.index + 1
-        df['_loc'] = pd.Series()
-        df['_time'] = pd.Series()
-        if require_time:
-            df['t'] = pd.Series()
-        return df
-    
-    polytopes = []
+    if len(state_vars) == 0:
+        return ProjectionStore.empty().to_dataframe(var_list)
+    
+    if is_simulation_orbit(orbit_reach):
+        orbits = orbit_reach if isinstance(orbit_reach, (list, tuple)) else [orbit_reach]
+        return _simulation_to_dataframe(orbits, state_vars, require_time)
+    
     # projections are 2D, so we need a list of them which will later be joint together
-    is_variable_variable = len(var_list) == 2 and not require_time
-    if is_variable_variable:
+    if len(state_vars) == 2 and not require_time:
         # just extract the specific axis
-        axes = [ari.Variables2d(ari.RealVariable(var_list[0]), ari.RealVariable(var_list[1]))]
+        projections = [(state_vars[0], state_vars[1])]
     else:
         # extract the time-variable axes and perform a collage
-        axes = [ari.Variables2d(ari.TimeVariable(), ari.RealVariable(var_list[i]))
-                for i in range(len(var_list))]
-    
-    # extract the vertices of the polytopes
-    for instant, encl in enumerate(orbit_reach):
-        # since state/auxiliary variables can change during the evolution, we project them in the required order based on the axes we want
-        prj = [ari.projection(encl.state_time_auxiliary_space(), a) for a in axes]
-        # we extract the polytope points accordingly to the axes we want
-        polytope_points_2d = [encl.continuous_set().state_time_auxiliary_set().affine_over_approximation().boundary(p.i, p.j) for p in prj]
-        # since the polytope's projections may be different on each axis, we just consider the minimum vertices we got
-        # this truncation is idempotent in time-variable and variable-variable cases, but could
-        min_prj = min([len(axes_points_2d) for axes_points_2d in polytope_points_2d], default=0)
-        
-        # avoid punctual polytopes
-        if min_prj >= 2:
-            # get actual coordinates of the vertices of the polytope
-            polytope = {
-                '_loc': str(encl.location()),
-                '_time': float(str(encl.time_range().upper_bound())),
-            }
-            if is_variable_variable:
-                points = extract_points(polytope_points_2d[0][:min_prj])
-                polytope[var_list[0]] = points[0]  # first variable
-                polytope[var_list[1]] = points[1]  # second variable
-            else:
-                if require_time:
-                    # add time value (same for each axis, so the first one is enough)
-                    polytope['t'] = extract_points(polytope_points_2d[0][:min_prj])[0]  # time is always x, thus [0]
-                # add each variable
-                polytope.update({
-                    var_list[var_i]: extract_points(axes_points_2d[:min_prj])[1]  # variables are always y, thus [1]
-                    for var_i, axes_points_2d in enumerate(polytope_points_2d)
-                })
-            polytopes.append(polytope)
-        else:
-            print(f'WARNING: instant {instant} polytope has less than 2 vertices', file=sys.stderr)
-    
-    df = pd.DataFrame(polytopes)
-    df['_polytope_id'] = df.index + 1
-    var_list = list(set(var_list + (['t'] if require_time else [])))  # remove duplicates
-    df = df.explode(var_list)
-    return df
+        projections = [('t', var) for var in state_vars]
+    store = extract_projection_store(orbit_reach, projections)
+    return store.to_dataframe(var_list, collapse)
 
 
-def analyze_automaton(automaton: ari.HybridAutomaton, name=None):
+def analyze_automaton(automaton: 'ari.HybridAutomaton', name=None):
     """
     Transform an Ariadne `HybridAutomaton` to a dictionary including all the important information for visualization.
     
@@ -297,41 +595,80 @@ def build_cytoscape_graph(automaton_analysis):
     return nodes + edges
 
 
+def layout_cytoscape_graph(elements, radius=None):
+    """
+    Compute the positions of the nodes, placing them on a circle as the Cytoscape 'circle' layout would. The positions are stored in the elements
+    themselves, so that they can be persisted together with the graph and the layout doesn't need to be recomputed by the client.
+    
+    :param elements: the Cytoscape elements obtained by the `build_cytoscape_graph(*)` method
+    :param radius: optional, the radius of the circle, by default proportional to the number of nodes
+    :return: the same elements, where the nodes have a 'position' entry
+    """
+    
+    nodes = [element for element in elements if 'source' not in element['data']]
+    if radius is None:
+        radius = max(100, 40 * len(nodes))
+    for i, node in enumerate(nodes):
+        angle = 2 * math.pi * i / max(len(nodes), 1)
+        node['position'] = {'x': round(radius * math.cos(angle), 2), 'y': round(radius * math.sin(angle), 2)}
+    return elements
+
+
+AUTOMATON_STYLESHEET = [
+    {
+        'selector': 'node',
+        'style': {
+            'label': 'data(label)',
+            'width': '100%',
+            'height': '100%',
+            'text-transform': 'uppercase',
+            'text-valign': 'center',
+            'text-halign': 'center'
+        }
+    },
+    {
+        'selector': 'edge',
+        'style': {
+            'label': 'data(label)',
+            'curve-style': 'bezier',
+            'control-point-step-size': 75,
+            'loop-direction': 90,
+            'loop-sweep': -45,
+            'target-arrow-shape': 'triangle',
+            'text-rotation': 'autorotate',
+            # TODO improve this to be perpendicular to the edge, not just a vertical shift
+            #  https://github.com/cytoscape/cytoscape.js/issues/965
+            'text-margin-y': -10
+        }
+    },
+    # the nodes of the product graph which can still be expanded, and its start location
+    {
+        'selector': '.frontier',
+        'style': {
+            'border-width': 2,
+            'border-style': 'dashed',
+            'border-color': '#888888'
+        }
+    },
+    {
+        'selector': '.start',
+        'style': {
+            'border-width': 3,
+            'border-color': '#000000'
+        }
+    }
+]
+
+
 def plot_automaton(elements):
+    has_positions = all('position' in element for element in elements if 'source' not in element['data'])
     return \
         cyto.Cytoscape(
             id='automaton-cytoscape',
             layout={
-                'name': 'circle'
+                'name': 'preset' if has_positions else 'circle'
             },
             elements=elements,
-            stylesheet=[
-                {
-                    'selector': 'node',
-                    'style': {
-                        'label': 'data(label)',
-                        'width': '100%',
-                        'height': '100%',
-                        'text-transform': 'uppercase',
-                        'text-valign': 'center',
-                        'text-halign': 'center'
-                    }
-                },
-                {
-                    'selector': 'edge',
-                    'style': {
-                        'label': 'data(label)',
-                        'curve-style': 'bezier',
-                        'control-point-step-size': 75,
-                        'loop-direction': 90,
-                        'loop-sweep': -45,
-                        'target-arrow-shape': 'triangle',
-                        'text-rotation': 'autorotate',
-                        # TODO improve this to be perpendicular to the edge, not just a vertical shift
-                        #  https://github.com/cytoscape/cytoscape.js/issues/965
-                        'text-margin-y': -10
-                    }
-                }
-            ],
+            stylesheet=AUTOMATON_STYLESHEET,
             responsive=True
         )
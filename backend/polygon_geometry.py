@@ -0,0 +1,311 @@
+import numpy as np
+import pandas as pd
+
+
+def _cross(a, b):
+    return a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]
+
+
+def _open_ccw_polygon(x, y):
+    # drop the closing vertex and the repeated vertices, then orient counterclockwise
+    points = np.column_stack([np.asarray(x, dtype=float), np.asarray(y, dtype=float)])
+    if len(points) > 1 and np.allclose(points[0], points[-1]):
+        points = points[:-1]
+    keep = np.any(points != np.roll(points, 1, axis=0), axis=1) if len(points) > 1 else np.ones(len(points), dtype=bool)
+    points = points[keep]
+    if len(points) >= 3 and _cross(points, np.roll(points, -1, axis=0)).sum() < 0:
+        points = points[::-1]
+    return points
+
+
+def distance_to_convex_polygon(points, polygon):
+    """
+    Distance of each point from a convex polygon (zero inside).
+    
+    :param points: an array of shape (n, 2)
+    :param polygon: the vertices of the polygon, an array of shape (m, 2), counterclockwise and not closed
+    :return: an array of n distances
+    """
+    
+    start, end = polygon, np.roll(polygon, -1, axis=0)
+    edges = end - start
+    relative = points[:, None, :] - start[None, :, :]
+    # inside when on the left of every edge
+    inside = np.all(_cross(edges[None, :, :], relative) >= 0, axis=1)
+    # otherwise the distance is the one from the closest edge
+    squared_lengths = np.maximum((edges ** 2).sum(axis=1), np.finfo(float).tiny)
+    projection = np.clip((relative * edges[None, :, :]).sum(axis=2) / squared_lengths[None, :], 0, 1)
+    closest = start[None, :, :] + projection[:, :, None] * edges[None, :, :]
+    distances = np.sqrt(((points[:, None, :] - closest) ** 2).sum(axis=2)).min(axis=1)
+    return np.where(inside, 0.0, distances)
+
+
+def simplify_convex_polygon(x, y, tolerance):
+    """
+    Outer simplification of a convex polygon: the simplified polygon contains the original one and is at most `tolerance` away from it (Hausdorff
+    distance), so the over-approximation stays sound.
+    
+    A convex polygon is the intersection of the half-planes of its edges: an edge is removed by extending its two neighbouring edges until they meet,
+    which can only enlarge the polygon. At each round the error of removing every edge is computed at once, then a set of non-adjacent removals within
+    the tolerance is applied, until no edge can be removed.
+    
+    :param x: the x coordinates of the vertices, in boundary order (the polygon may be closed or not)
+    :param y: the y coordinates of the vertices
+    :param tolerance: the maximum distance of the simplified polygon from the original one
+    :return: the x and y coordinates of the simplified polygon, counterclockwise and not closed
+    """
+    
+    original = _open_ccw_polygon(x, y)
+    points = original
+    if len(points) < 4:
+        return points[:, 0], points[:, 1]
+    
+    # exactly collinear vertices can be dropped for free
+    incoming, outgoing = points - np.roll(points, 1, axis=0), np.roll(points, -1, axis=0) - points
+    scale = np.abs(points).max() + 1.0
+    collinear = (np.abs(_cross(incoming, outgoing)) <= 1e-14 * scale ** 2) & ((incoming * outgoing).sum(axis=1) > 0)
+    points = points[~collinear]
+    
+    while len(points) > 3:
+        n = len(points)
+        # edge i goes from points[i] to points[i + 1]
+        directions = np.roll(points, -1, axis=0) - points
+        previous_directions, next_directions = np.roll(directions, 1, axis=0), np.roll(directions, -1, axis=0)
+        turn = _cross(previous_directions, next_directions)
+        # the lines of the previous and next edges meet beyond edge i only if they turn by less than half a circle
+        valid = turn > 1e-14 * scale ** 2
+        step = np.divide(_cross(np.roll(points, -1, axis=0) - points, next_directions), turn, out=np.full(n, -1.0), where=valid)
+        valid &= step >= 0
+        apexes = points + step[:, None] * previous_directions
+        errors = np.full(n, np.inf)
+        errors[valid] = distance_to_convex_polygon(apexes[valid], original)
+        candidates = np.flatnonzero(errors <= tolerance)
+        if len(candidates) == 0:
+            break
+        
+        # removing edge i moves the endpoints of edges i - 1 and i + 1, hence removals must not be adjacent
+        blocked = np.zeros(n, dtype=bool)
+        removed = []
+        for i in candidates[np.argsort(errors[candidates], kind='stable')]:
+            if not blocked[i] and n - len(removed) > 3:
+                removed.append(i)
+                blocked[[(i - 1) % n, i, (i + 1) % n]] = True
+        replaced = points.copy()
+        drop = np.zeros(n, dtype=bool)
+        for i in removed:
+            # the apex replaces the start of edge i, while its end disappears
+            replaced[i] = apexes[i]
+            drop[(i + 1) % n] = True
+        points = replaced[~drop]
+    
+    return points[:, 0], points[:, 1]
+
+
+def simplify_polytopes(polytopes_df, var_x, var_y, tolerance, screen_scale=None):
+    """
+    Outer simplification of every polytope of a dataframe obtained via the `orbit_to_dataframe()` method (2D, not collapsed).
+    
+    The tolerance is in data units, unless `screen_scale` is given: in that case it's in screen units (e.g. pixels) and `screen_scale` is the pair of
+    data units per screen unit along x and y, so that the distances are measured on the plot as seen by the user.
+    
+    :param polytopes_df: the dataframe of the polytopes
+    :param var_x: the x axis
+    :param var_y: the y axis
+    :param tolerance: the maximum distance of each simplified polytope from the original one
+    :param screen_scale: optional, the (x, y) data units per screen unit
+    :return: the dataframe of the simplified polytopes (closed, as the original ones) and a dictionary reporting the 'polytopes', the
+             'vertices_before', the 'vertices_after' and the 'reduction' achieved
+    """
+    
+    scale_x, scale_y = screen_scale if screen_scale is not None else (1.0, 1.0)
+    constant_columns = [column for column in polytopes_df.columns if column not in (var_x, var_y)]
+    simplified = []
+    vertices_before, vertices_after = 0, 0
+    for _, polytope in polytopes_df.groupby('_polytope_id', sort=False):
+        x, y = polytope[var_x].to_numpy(dtype=float) / scale_x, polytope[var_y].to_numpy(dtype=float) / scale_y
+        new_x, new_y = simplify_convex_polygon(x, y, tolerance)
+        vertices_before += len(_open_ccw_polygon(x, y))
+        vertices_after += len(new_x)
+        rows = pd.DataFrame({var_x: np.append(new_x, new_x[:1]) * scale_x, var_y: np.append(new_y, new_y[:1]) * scale_y})
+        for column in constant_columns:
+            rows[column] = polytope[column].iloc[0]
+        simplified.append(rows)
+    
+    df = pd.concat(simplified, ignore_index=True)[list(polytopes_df.columns)] if simplified else polytopes_df
+    stats = {
+        'polytopes': len(simplified),
+        'vertices_before': vertices_before,
+        'vertices_after': vertices_after,
+        'reduction': 1 - vertices_after / vertices_before if vertices_before else 0.0
+    }
+    return df, stats
+
+
+def _polygon_area(points):
+    return _cross(points, np.roll(points, -1, axis=0)).sum() / 2
+
+
+def _containment_tolerance(polygon):
+    # a distance relative to the extent of the polygon, not to its distance from the origin, plus the rounding of its coordinates
+    return 1e-9 * np.ptp(polygon, axis=0).max() + 16 * np.finfo(float).eps * np.abs(polygon).max()
+
+
+def _contains_points(polygon, points, tolerance):
+    # all the points are on the left of every edge of the (counterclockwise) polygon, or within the tolerance (a distance) of its line
+    start, end = polygon, np.roll(polygon, -1, axis=0)
+    edges = end - start
+    lengths = np.hypot(edges[:, 0], edges[:, 1])
+    return bool(np.all(_cross(edges[None, :, :], points[:, None, :] - start[None, :, :]) >= -tolerance * lengths[None, :]))
+
+
+def prune_subsumed_polytopes(polytopes_df, var_x, var_y, time_window=None, chunk_size=2048, time_edges=None):
+    """
+    Drop the 2D polytopes of a dataframe obtained via the `orbit_to_dataframe()` method which are contained in another polytope of the same location,
+    so that the plot covers the same area with fewer polytopes; only the outlines inside the remaining polytopes are lost.
+    
+    Candidate containers are found by comparing the bounding boxes of all the polytopes at once, then the containment is checked exactly on the
+    (convex) polytopes. Polytopes are visited from the largest one, so that among identical polytopes the first one is kept.
+    
+    :param polytopes_df: the dataframe of the polytopes
+    :param var_x: the x axis
+    :param var_y: the y axis
+    :param time_window: optional, only compare polytopes whose '_time' falls in the same window of this width, otherwise compare all of them (which
+                        is safe as long as the dataframe is plotted as a whole)
+    :param chunk_size: the number of polytopes whose bounding boxes are compared at once, to bound the memory
+    :param time_edges: optional, the edges of the time windows instead of their width, each polytope belonging to the first window whose edge
+                       reaches its '_time' (as the frames of `plot_trajectory_animation(*)`)
+    :return: the dataframe of the remaining polytopes and a dictionary reporting the 'polytopes_before', the 'polytopes_after', the 'candidates'
+             passing the bounding box test and the 'reduction' achieved
+    """
+    
+    if polytopes_df.empty:
+        return polytopes_df, {'polytopes_before': 0, 'polytopes_after': 0, 'candidates': 0, 'reduction': 0.0}
+    
+    polygons = {
+        polytope_id: _open_ccw_polygon(polytope[var_x].to_numpy(dtype=float), polytope[var_y].to_numpy(dtype=float))
+        for polytope_id, polytope in polytopes_df.groupby('_polytope_id', sort=False)
+    }
+    info = polytopes_df.drop_duplicates('_polytope_id').set_index('_polytope_id').loc[list(polygons)]
+    groups = info['_loc'].astype(str)
+    if time_edges is not None:
+        windows = np.minimum(np.searchsorted(time_edges, info['_time'].to_numpy(dtype=float), side='left'), len(time_edges) - 1)
+        groups = groups + '@' + windows.astype(str)
+    elif time_window:
+        groups = groups + '@' + np.floor(info['_time'].to_numpy(dtype=float) / time_window).astype(np.int64).astype(str)
+    
+    dropped = set()
+    candidates = 0
+    for _, group_ids in groups.groupby(groups, sort=False):
+        ids = list(group_ids.index)
+        if len(ids) < 2:
+            continue
+        points = [polygons[polytope_id] for polytope_id in ids]
+        boxes = np.array([[p[:, 0].min(), p[:, 0].max(), p[:, 1].min(), p[:, 1].max()] for p in points])
+        # larger polytopes first, ties broken by the original order
+        order = np.lexsort((np.arange(len(ids)), -np.array([_polygon_area(p) if len(p) >= 3 else 0.0 for p in points])))
+        boxes = boxes[order]
+        # the same tolerance as the exact test, from the box of each container
+        extents = np.maximum(boxes[:, 1] - boxes[:, 0], boxes[:, 3] - boxes[:, 2])
+        tolerances = 1e-9 * extents + 16 * np.finfo(float).eps * np.abs(boxes).max(axis=1)
+        for chunk_start in range(0, len(order), chunk_size):
+            chunk = boxes[chunk_start:chunk_start + chunk_size]
+            # contained[i, j]: the box of the i-th polytope of the chunk is inside the box of the j-th polytope
+            tol = tolerances[None, :]
+            contained = (boxes[None, :, 0] <= chunk[:, None, 0] + tol) & (chunk[:, None, 1] <= boxes[None, :, 1] + tol) & \
+                        (boxes[None, :, 2] <= chunk[:, None, 2] + tol) & (chunk[:, None, 3] <= boxes[None, :, 3] + tol)
+            # only the polytopes visited before can contain the current one
+            contained &= np.arange(len(order))[None, :] < np.arange(chunk_start, chunk_start + len(chunk))[:, None]
+            for i, row in enumerate(contained):
+                containers = np.flatnonzero(row)
+                candidates += len(containers)
+                inner = points[order[chunk_start + i]]
+                # the containment is transitive, so even a dropped polytope is a valid container
+                if any(len(points[order[j]]) >= 3 and _contains_points(points[order[j]], inner, _containment_tolerance(points[order[j]]))
+                       for j in containers):
+                    dropped.add(ids[order[chunk_start + i]])
+    
+    df = polytopes_df[~polytopes_df['_polytope_id'].isin(dropped)]
+    stats = {
+        'polytopes_before': len(polygons),
+        'polytopes_after': len(polygons) - len(dropped),
+        'candidates': candidates,
+        'reduction': len(dropped) / len(polygons)
+    }
+    return df, stats
+
+
+def compute_envelopes(polytopes_df, var, max_points=500):
+    """
+    Compute the lower and upper envelope of a variable over time, for each location, from a (t, var) dataframe obtained via the
+    `orbit_to_dataframe()` method (not collapsed).
+    
+    All the locations share the same time grid: the union of the times of the vertices, reduced to `max_points` evenly spaced times when larger.
+    Within each interval of the grid the extreme values of the polytopes are computed exactly, from their vertices inside the interval and from their
+    edges at the endpoints of the interval, all at once; each grid time then takes the extreme value of its two intervals, so that the envelopes
+    linearly interpolated between grid times still contain all the polytopes. Times not covered by a location split its envelope into segments.
+    
+    :param polytopes_df: the dataframe of the polytopes, with the 't' and `var` columns
+    :param var: the variable
+    :param max_points: the maximum number of times of the grid
+    :return: a dataframe with one row per location, segment and grid time, with the '_loc', '_segment', 't', '<var>_lower' and '<var>_upper' columns
+    """
+    
+    columns = ['_loc', '_segment', 't', f'{var}_lower', f'{var}_upper']
+    polytopes_df = polytopes_df.dropna(subset=['t', var])
+    if polytopes_df.empty:
+        return pd.DataFrame(columns=columns)
+    
+    grid = np.unique(polytopes_df['t'].to_numpy(dtype=float))
+    if len(grid) > max_points:
+        grid = np.linspace(grid[0], grid[-1], max_points)
+    if len(grid) == 1:
+        # a single instant, widened so that there's an interval
+        grid = np.array([grid[0], np.nextafter(grid[0], np.inf)])
+    intervals = len(grid) - 1
+    
+    envelopes = []
+    for location, location_df in polytopes_df.groupby('_loc', sort=False):
+        t, y = location_df['t'].to_numpy(dtype=float), location_df[var].to_numpy(dtype=float)
+        ids = location_df['_polytope_id'].to_numpy()
+        lower, upper = np.full(intervals, np.inf), np.full(intervals, -np.inf)
+        
+        # the vertices, each in its own interval
+        k = np.clip(np.searchsorted(grid, t, side='right') - 1, 0, intervals - 1)
+        np.minimum.at(lower, k, y)
+        np.maximum.at(upper, k, y)
+        
+        # the edges (the rows of each polytope are a closed boundary) at the grid times they cross
+        same = ids[:-1] == ids[1:]
+        t0, t1, y0, y1 = t[:-1][same], t[1:][same], y[:-1][same], y[1:][same]
+        swap = t0 > t1
+        t0, t1, y0, y1 = np.where(swap, t1, t0), np.where(swap, t0, t1), np.where(swap, y1, y0), np.where(swap, y0, y1)
+        first, last = np.searchsorted(grid, t0, side='left'), np.searchsorted(grid, t1, side='right')
+        counts = np.maximum(last - first, 0)
+        edge = np.repeat(np.arange(len(t0)), counts)
+        j = np.repeat(first - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        span = t1[edge] - t0[edge]
+        values = np.where(span > 0, y0[edge] + (y1[edge] - y0[edge]) * (grid[j] - t0[edge]) / np.where(span > 0, span, 1), np.minimum(y0[edge], y1[edge]))
+        # a grid time bounds both the interval before and the one after
+        for interval in (j - 1, j):
+            inside = (interval >= 0) & (interval < intervals)
+            np.minimum.at(lower, interval[inside], values[inside])
+            np.maximum.at(upper, interval[inside], values[inside])
+        
+        # each grid time takes the extremes of its two intervals, uncovered intervals are neutral
+        node_lower = np.minimum(np.append(lower, np.inf), np.insert(lower, 0, np.inf))
+        node_upper = np.maximum(np.append(upper, -np.inf), np.insert(upper, 0, -np.inf))
+        covered = np.isfinite(lower)
+        # runs of covered intervals, each giving a segment from its first to its last grid time
+        changes = np.diff(np.concatenate([[0], covered.astype(np.int8), [0]]))
+        starts, ends = np.flatnonzero(changes == 1), np.flatnonzero(changes == -1)
+        for segment, (start, end) in enumerate(zip(starts, ends)):
+            nodes = np.arange(start, end + 1)
+            envelopes.append(pd.DataFrame({
+                '_loc': location,
+                '_segment': segment,
+                't': grid[nodes],
+                f'{var}_lower': node_lower[nodes],
+                f'{var}_upper': node_upper[nodes]
+            }))
+    
+    return pd.concat(envelopes, ignore_index=True) if envelopes else pd.DataFrame(columns=columns)
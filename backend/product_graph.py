@@ -0,0 +1,161 @@
+from collections import deque
+
+# the event kinds which don't lead to a transition
+_NON_TRANSITION_KINDS = {'INVARIANT'}
+
+
+class ProductGraph(object):
+    """
+    The graph of the composite locations of a `CompositeHybridAutomaton`, explored lazily from a start location: the product of the components is
+    never built, the successors of a composite location are computed (once) only when the location is expanded.
+    
+    A composite location is a tuple of (automaton name, location name) pairs, sorted by automaton name. An event fires in a composite location if the
+    component owning it (i.e. the one giving it a kind, such as URGENT or PERMISSIVE) can take it there; every component with a transition on the
+    event moves along with it, while the others stay where they are.
+    
+    At most `max_nodes` composite locations are visible at once: beyond that, the expansions only add the edges among visible nodes.
+    """
+    
+    def __init__(self, automatons_analysis, start, max_nodes=50):
+        """
+        :param automatons_analysis: the analysis of the components, as {automaton name: `analyze_automaton(*)` result}
+        :param start: the start location, as {automaton name: location name}; the missing automata start from their first location
+        :param max_nodes: the maximum number of visible nodes
+        """
+        
+        self.automatons_analysis = automatons_analysis
+        self.max_nodes = max_nodes
+        self.start = self.composite_location({
+            automaton_name: start.get(automaton_name) or sorted(automaton_info['locations'])[0]
+            for automaton_name, automaton_info in automatons_analysis.items()
+        })
+        self._successors = {}
+        # {composite location: (column, row)}, assigned when the node becomes visible so that the layout doesn't change while expanding
+        self._visible = {self.start: (0, 0)}
+        self._column_sizes = {0: 1}
+        # in expansion order, so that the elements are stable
+        self._expanded = {}
+        self.truncated = False
+    
+    @staticmethod
+    def composite_location(locations):
+        return tuple(sorted(locations.items()))
+    
+    @staticmethod
+    def node_id(location):
+        return ','.join(f'{automaton_name}|{location_name}' for automaton_name, location_name in location)
+    
+    def label(self, location):
+        # components with a single location don't tell anything
+        names = [location_name for automaton_name, location_name in location if len(self.automatons_analysis[automaton_name]['locations']) > 1]
+        return '|'.join(names) if names else '--'
+    
+    def successors(self, location):
+        """
+        :param location: a composite location
+        :return: the list of (event name, target composite location) transitions leaving it, memoized
+        """
+        
+        if location in self._successors:
+            return self._successors[location]
+        
+        targets = {
+            automaton_name: self.automatons_analysis[automaton_name]['locations'][location_name]['targets']
+            for automaton_name, location_name in location
+        }
+        owned = sorted({
+            event_name
+            for automaton_targets in targets.values()
+            for event_name, event_info in automaton_targets.items()
+            if event_info['event_kind'] is not None and event_info['event_kind'] not in _NON_TRANSITION_KINDS
+        })
+        successors = []
+        for event_name in owned:
+            target = {
+                automaton_name: targets[automaton_name][event_name]['target'] if event_name in targets[automaton_name] else location_name
+                for automaton_name, location_name in location
+            }
+            successors.append((event_name, self.composite_location(target)))
+        self._successors[location] = successors
+        return successors
+    
+    def expand(self, location):
+        """
+        Show the successors of a visible composite location, as long as the visible nodes are less than `max_nodes`.
+        
+        :param location: the composite location
+        :return: the number of new visible nodes
+        """
+        
+        if location not in self._visible:
+            return 0
+        self._expanded[location] = True
+        column = self._visible[location][0] + 1
+        added = 0
+        for _, target in self.successors(location):
+            if target in self._visible:
+                continue
+            if len(self._visible) >= self.max_nodes:
+                self.truncated = True
+                break
+            self._visible[target] = (column, self._column_sizes.get(column, 0))
+            self._column_sizes[column] = self._column_sizes.get(column, 0) + 1
+            added += 1
+        return added
+    
+    def expand_id(self, node_id):
+        """
+        :param node_id: the id of a visible node, see `node_id(*)`
+        :return: the number of new visible nodes
+        """
+        
+        for location in self._visible:
+            if self.node_id(location) == node_id:
+                return self.expand(location)
+        return 0
+    
+    def expand_breadth_first(self, depth):
+        """
+        Expand the graph from the start location up to the given depth (or until the visible nodes reach `max_nodes`).
+        """
+        
+        queue = deque([(self.start, 0)])
+        seen = {self.start}
+        while queue and len(self._visible) < self.max_nodes:
+            location, distance = queue.popleft()
+            if distance >= depth:
+                continue
+            self.expand(location)
+            for _, target in self.successors(location):
+                if target in self._visible and target not in seen:
+                    seen.add(target)
+                    queue.append((target, distance + 1))
+    
+    def elements(self, spacing=(180, 90)):
+        """
+        :param spacing: the horizontal and vertical distance between the nodes
+        :return: the Cytoscape elements of the visible graph, with preset positions; the nodes which can still be expanded have the 'frontier' class
+        """
+        
+        nodes = [
+            {
+                'data': {'id': self.node_id(location), 'label': self.label(location)},
+                'position': {'x': column * spacing[0], 'y': row * spacing[1]},
+                'classes': 'start' if location == self.start else ('expanded' if location in self._expanded else 'frontier')
+            }
+            for location, (column, row) in self._visible.items()
+        ]
+        edges = [
+            {'data': {'source': self.node_id(location), 'target': self.node_id(target), 'label': event_name}}
+            for location in self._expanded
+            for event_name, target in self.successors(location)
+            if target in self._visible
+        ]
+        return nodes + edges
+    
+    def summary(self):
+        frontier = len(self._visible) - len(self._expanded)
+        text = f'{len(self._visible)} composite locations shown, {frontier} not expanded yet (tap to expand)'
+        if self.truncated:
+            text += f'; limit of {self.max_nodes} locations reached'
+        return text
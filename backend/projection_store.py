@@ -0,0 +1,298 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+class ProjectionStore(object):
+    """
+    The 2D projections of the enclosures of an orbit, extracted once and reusable for any plot without pyariadne.
+    
+    The store is made of two tables:
+     - `polytopes`, one row per enclosure, with the '_polytope_id', '_loc', '_time_lower', '_time' (the upper bound of the time range, as in the
+       dataframes of `orbit_to_dataframe()`) and '_events' (the comma-separated events which led to the enclosure) columns
+     - `vertices`, one row per vertex of a projected polytope, with the '_polytope_id', '_projection' (the projection plane, as 'x:y'), '_x' and '_y'
+       columns; the vertices of each projected polytope are in boundary order
+    """
+    
+    polytopes = None
+    vertices = None
+    
+    def __init__(self, polytopes, vertices):
+        self.polytopes = polytopes
+        self.vertices = vertices
+    
+    @staticmethod
+    def empty():
+        return ProjectionStore(
+            pd.DataFrame(columns=['_polytope_id', '_loc', '_time_lower', '_time', '_events']),
+            pd.DataFrame(columns=['_polytope_id', '_projection', '_x', '_y'])
+        )
+    
+    @staticmethod
+    def projection_name(var_x, var_y):
+        return f'{var_x}:{var_y}'
+    
+    def projections(self):
+        """
+        :return: the list of (x, y) projection planes available in the store
+        """
+        
+        return [tuple(name.split(':')) for name in self.vertices['_projection'].unique()]
+    
+    def variables(self):
+        return sorted({var for projection in self.projections() for var in projection})
+    
+    def has_projection(self, var_x, var_y):
+        return (self.vertices['_projection'] == self.projection_name(var_x, var_y)).any()
+    
+    def projection(self, var_x, var_y):
+        """
+        :return: the vertices of the polytopes projected on the (x, y) plane
+        """
+        
+        return self.vertices[self.vertices['_projection'] == self.projection_name(var_x, var_y)]
+    
+    def _projection_points(self, var_x, var_y):
+        # {polytope id: (x coordinates, y coordinates)}
+        vertices = self.projection(var_x, var_y)
+        return {
+            polytope_id: (polytope_vertices['_x'].to_numpy(), polytope_vertices['_y'].to_numpy())
+            for polytope_id, polytope_vertices in vertices.groupby('_polytope_id', sort=False)
+        }
+    
+    def to_dataframe(self, var_list, collapse=False):
+        """
+        Assemble the dataframe of the polytopes over the given variables, exactly as `orbit_to_dataframe()` would from the orbit (see there for the
+        meaning of the `collapse` parameter). The required projections must be in the store: the (x, y) one when `var_list == [x, y]`, otherwise the
+        (t, var) one for each variable. The '_polytope_id' is the one of the `polytopes` table, so the ids of the skipped polytopes (less than 2
+        vertices) are missing from the dataframe.
+        
+        :param var_list: the list of variables we want to extract
+        :param collapse: collapse higher dimensional polytopes to their barycenter (a single point)
+        :return: a dataframe representing the flattened version of the orbit
+        """
+        
+        def extract_points(points_2d):
+            x, y = list(points_2d[0]), list(points_2d[1])
+            if collapse:
+                return sum(x) / len(x), sum(y) / len(y)
+            else:
+                return x + [x[0]], y + [y[0]]
+        
+        # manually extract time variable because each axes is constructed against it
+        var_list = var_list.copy()
+        require_time = 't' in var_list
+        if require_time:
+            var_list.remove('t')
+        
+        # return empty
+        if len(var_list) == 0:
+            df = pd.DataFrame()
+            df['_polytope_id'] = df.index + 1
+            df['_loc'] = pd.Series()
+            df['_time'] = pd.Series()
+            if require_time:
+                df['t'] = pd.Series()
+            return df
+        
+        is_variable_variable = len(var_list) == 2 and not require_time
+        axes = [(var_list[0], var_list[1])] if is_variable_variable else [('t', var) for var in var_list]
+        missing = [self.projection_name(*a) for a in axes if not self.has_projection(*a)]
+        if missing:
+            raise KeyError(f'projections {missing} are not in the store')
+        axes_points = [self._projection_points(*a) for a in axes]
+        
+        polytopes = []
+        empty = (np.empty(0), np.empty(0))
+        for instant, (polytope_id, location, time) in enumerate(self.polytopes[['_polytope_id', '_loc', '_time']].itertuples(index=False)):
+            polytope_points_2d = [points.get(polytope_id, empty) for points in axes_points]
+            # since the polytope's projections may be different on each axis, we just consider the minimum vertices we got
+            min_prj = min([len(points_2d[0]) for points_2d in polytope_points_2d], default=0)
+            
+            # avoid punctual polytopes
+            if min_prj >= 2:
+                polytope = {
+                    '_polytope_id': polytope_id,
+                    '_loc': location,
+                    '_time': time
+                }
+                if is_variable_variable:
+                    points = extract_points([coordinates[:min_prj] for coordinates in polytope_points_2d[0]])
+                    polytope[var_list[0]] = points[0]  # first variable
+                    polytope[var_list[1]] = points[1]  # second variable
+                else:
+                    if require_time:
+                        # add time value (same for each axis, so the first one is enough)
+                        polytope['t'] = extract_points([coordinates[:min_prj] for coordinates in polytope_points_2d[0]])[0]
+                    # add each variable
+                    polytope.update({
+                        var_list[var_i]: extract_points([coordinates[:min_prj] for coordinates in points_2d])[1]
+                        for var_i, points_2d in enumerate(polytope_points_2d)
+                    })
+                polytopes.append(polytope)
+            else:
+                print(f'WARNING: instant {instant} polytope has less than 2 vertices', file=sys.stderr)
+        
+        df = pd.DataFrame(polytopes, columns=['_polytope_id', '_loc', '_time'] if not polytopes else None)
+        var_list = list(set(var_list + (['t'] if require_time else [])))  # remove duplicates
+        if polytopes:
+            df = df.explode(var_list)
+            df[var_list] = df[var_list].astype(float)
+        return df
+    
+    def envelopes(self, var, max_points=500):
+        """
+        :return: the envelopes of a variable over time, computed from the (t, var) projection (see `compute_envelopes()`)
+        """
+        
+        from backend.polygon_geometry import compute_envelopes
+        
+        return compute_envelopes(self.to_dataframe(['t', var]), var, max_points)
+    
+    @staticmethod
+    def merge_tables(tables, tags):
+        """
+        Concatenate tables indexed by '_polytope_id' (e.g. the polytopes of several stores or their bounding boxes), shifting the ids so that they stay
+        unique and tagging each row with the '_provenance' of its table.
+        """
+        
+        merged = []
+        offset = 0
+        for table, tag in zip(tables, tags):
+            table = table.copy()
+            table['_polytope_id'] = table['_polytope_id'] + offset
+            table['_provenance'] = tag
+            merged.append(table)
+            offset = max(offset, int(table['_polytope_id'].max())) if not table.empty else offset
+        return pd.concat(merged, ignore_index=True) if merged else pd.DataFrame(columns=['_polytope_id', '_provenance'])
+    
+    @staticmethod
+    def merge(stores, tags):
+        """
+        Merge the stores of several orbits (e.g. the ones evolved from parts of the same initial set) into a single store, whose polytopes are tagged
+        with the '_provenance' of their store.
+        
+        :param stores: the list of stores
+        :param tags: the provenance of each store
+        :return: the merged `ProjectionStore`
+        """
+        
+        polytopes = ProjectionStore.merge_tables([store.polytopes for store in stores], tags)
+        offsets = polytopes.groupby('_provenance', sort=False)['_polytope_id'].min()
+        vertices = []
+        for store, tag in zip(stores, tags):
+            store_vertices = store.vertices.copy()
+            if not store.polytopes.empty:
+                store_vertices['_polytope_id'] = store_vertices['_polytope_id'] + (offsets[tag] - store.polytopes['_polytope_id'].min())
+            vertices.append(store_vertices)
+        vertices = pd.concat(vertices, ignore_index=True) if vertices else ProjectionStore.empty().vertices
+        # the categories of the projections may differ among the stores
+        vertices['_projection'] = vertices['_projection'].astype(str).astype('category')
+        return ProjectionStore(polytopes, vertices)
+    
+    def save(self, path):
+        pd.to_pickle({'polytopes': self.polytopes, 'vertices': self.vertices}, path)
+    
+    @staticmethod
+    def load(path):
+        tables = pd.read_pickle(path)
+        return ProjectionStore(tables['polytopes'], tables['vertices'])
+
+
+def extract_projection_store(orbit_reach, projections):
+    """
+    Extract all the given 2D projections of the enclosures of an orbit reach in a single pass: the affine over-approximation of each enclosure, which
+    is the expensive part, is computed once and shared by all the projections.
+    
+    :param orbit_reach: the Ariadne `orbit.reach()` result
+    :param projections: a list of (x, y) pairs of variable names, where 't' is the time
+    :return: the `ProjectionStore` of the orbit
+    """
+    
+    # imported here since the store itself doesn't need pyariadne
+    import pyariadne as ari
+    
+    def variable(name):
+        return ari.TimeVariable() if name == 't' else ari.RealVariable(name)
+    
+    axes = [(ProjectionStore.projection_name(var_x, var_y), ari.Variables2d(variable(var_x), variable(var_y))) for var_x, var_y in projections]
+    polytopes = []
+    vertices = {'_polytope_id': [], '_projection': [], '_x': [], '_y': []}
+    for instant, encl in enumerate(orbit_reach):
+        polytope_id = instant + 1
+        time_range = encl.time_range()
+        polytopes.append({
+            '_polytope_id': polytope_id,
+            '_loc': str(encl.location()),
+            '_time_lower': float(str(time_range.lower_bound())),
+            '_time': float(str(time_range.upper_bound())),
+            '_events': ','.join(str(event) for event in encl.previous_events())
+        })
+        approximation = encl.continuous_set().state_time_auxiliary_set().affine_over_approximation()
+        # since state/auxiliary variables can change during the evolution, we project them in the required order based on the axes we want
+        space = encl.state_time_auxiliary_space()
+        for name, a in axes:
+            prj = ari.projection(space, a)
+            points_2d = approximation.boundary(prj.i, prj.j)
+            vertices['_polytope_id'].extend([polytope_id] * len(points_2d))
+            vertices['_projection'].extend([name] * len(points_2d))
+            vertices['_x'].extend(p.x for p in points_2d)
+            vertices['_y'].extend(p.y for p in points_2d)
+    
+    polytopes = pd.DataFrame(polytopes, columns=['_polytope_id', '_loc', '_time_lower', '_time', '_events'])
+    vertices = pd.DataFrame({
+        '_polytope_id': np.asarray(vertices['_polytope_id'], dtype=np.int64),
+        '_projection': pd.Categorical(vertices['_projection']),
+        '_x': np.asarray(vertices['_x'], dtype=float),
+        '_y': np.asarray(vertices['_y'], dtype=float)
+    })
+    return ProjectionStore(polytopes, vertices)
+
+
+def extract_bounding_boxes(orbit_reach, var_list):
+    """
+    Extract the bounding box of every enclosure of an orbit reach: a single box query per enclosure, much cheaper than the 2D projections and defined
+    for any number of variables at once.
+    
+    The result has one row per enclosure, with the '_polytope_id' (the 1-based index of the enclosure, as in the `ProjectionStore`), '_loc',
+    '_time_lower', '_time' and '_events' columns, plus the '<var>_lower' and '<var>_upper' columns for every variable in `var_list` ('t' is the time
+    range of the enclosure); variables which are not defined in the location of the enclosure are NaN.
+    
+    :param orbit_reach: the Ariadne `orbit.reach()` result
+    :param var_list: the list of variables we want to extract
+    :return: the dataframe of the bounding boxes
+    """
+    
+    import pyariadne as ari
+    
+    state_vars = [var for var in dict.fromkeys(var_list) if var != 't']
+    variables = [ari.RealVariable(var) for var in state_vars]
+    columns = {column: [] for column in ['_polytope_id', '_loc', '_time_lower', '_time', '_events']}
+    bounds = {var: ([], []) for var in state_vars}
+    for instant, encl in enumerate(orbit_reach):
+        time_range = encl.time_range()
+        columns['_polytope_id'].append(instant + 1)
+        columns['_loc'].append(str(encl.location()))
+        columns['_time_lower'].append(float(str(time_range.lower_bound())))
+        columns['_time'].append(float(str(time_range.upper_bound())))
+        columns['_events'].append(','.join(str(event) for event in encl.previous_events()))
+        box = encl.bounding_box()
+        for var, variable in zip(state_vars, variables):
+            try:
+                interval = box[variable]
+                bounds[var][0].append(float(str(interval.lower_bound())))
+                bounds[var][1].append(float(str(interval.upper_bound())))
+            except (RuntimeError, IndexError, KeyError):
+                # the variable is not defined in this location
+                bounds[var][0].append(np.nan)
+                bounds[var][1].append(np.nan)
+    
+    boxes = pd.DataFrame(columns)
+    if 't' in var_list:
+        boxes['t_lower'] = boxes['_time_lower']
+        boxes['t_upper'] = boxes['_time']
+    for var, (lower, upper) in bounds.items():
+        boxes[f'{var}_lower'] = np.asarray(lower, dtype=float)
+        boxes[f'{var}_upper'] = np.asarray(upper, dtype=float)
+    return boxes
@@ -0,0 +1,162 @@
+import json
+import re
+
+import numpy as np
+import pandas as pd
+
+from backend.projection_store import extract_bounding_boxes
+
+PROPERTY_KINDS = ('bounds', 'unsafe', 'exists', 'never')
+PROPERTY_SETS = ('reach', 'final')
+
+
+def extract_orbit_boxes(orbit, var_list):
+    """
+    Extract the bounding boxes of both the reach and the final set of an orbit (see `extract_bounding_boxes(*)`), in a single table with a '_final'
+    column; the enclosures of the final set are numbered after the ones of the reach.
+    
+    :param orbit: the Ariadne orbit
+    :param var_list: the list of variables we want to extract
+    :return: the dataframe of the bounding boxes
+    """
+    
+    reach = extract_bounding_boxes(orbit.reach(), var_list)
+    reach['_final'] = False
+    final = extract_bounding_boxes(orbit.final(), var_list)
+    final['_polytope_id'] += len(reach)
+    final['_final'] = True
+    return pd.concat([reach, final], ignore_index=True)
+
+
+def _location_mask(locations, selected):
+    # the composite locations look like '(controller|rising,valve|opened)', a location is selected as 'valve|opened'
+    selected = [selected] if isinstance(selected, str) else selected
+    pattern = '|'.join(rf'(?:^|[(,]){re.escape(location)}(?:[,)]|$)' for location in selected)
+    return locations.str.contains(pattern, regex=True).to_numpy()
+
+
+def _event_mask(events, event):
+    return events.str.contains(rf'(?:^|,){re.escape(event)}(?:,|$)', regex=True).to_numpy()
+
+
+def _range(bounds):
+    lower, upper = bounds
+    return -np.inf if lower is None else float(lower), np.inf if upper is None else float(upper)
+
+
+def _bounds_columns(boxes, var):
+    if var == 't' and 't_lower' not in boxes:
+        return boxes['_time_lower'].to_numpy(dtype=float), boxes['_time'].to_numpy(dtype=float)
+    if f'{var}_lower' not in boxes:
+        raise ValueError(f'variable {var} is not in the bounding boxes')
+    return boxes[f'{var}_lower'].to_numpy(dtype=float), boxes[f'{var}_upper'].to_numpy(dtype=float)
+
+
+def check_properties(boxes, properties):
+    """
+    Check a list of declarative properties against the bounding boxes of the enclosures of an orbit, with vectorized operations on the whole table.
+    
+    Each property is a dictionary with:
+     - 'name': optional, a description of the property
+     - 'kind': one of
+       - 'bounds': every enclosure stays within the '<var>: [lower, upper]' ranges of 'box' (None for unbounded)
+       - 'unsafe': no enclosure intersects 'box'
+       - 'exists': at least one enclosure is selected
+       - 'never': no enclosure is selected
+     - 'over': optional, 'reach' (default) or 'final', the set of enclosures to check
+     - 'location', 'transitions', 'event': optional, select the enclosures in the given location ('automaton|location', or a list of them), with the
+       given number of transitions, or following the given event
+    
+    Variables which are not defined in the location of an enclosure never violate a 'bounds' or 'unsafe' property.
+    
+    :param boxes: the bounding boxes, as extracted by `extract_orbit_boxes(*)` or `extract_bounding_boxes(*)` (which has no final set)
+    :param properties: the list of properties
+    :return: a list with a result for each property: a dictionary with the 'name', whether it's 'satisfied', the 'polytope_ids' of the violating
+             enclosures (or of the witnesses, for 'exists'), the number of enclosures 'checked' and an 'error', if the property can't be checked
+    """
+    
+    is_final = boxes['_final'].to_numpy(dtype=bool) if '_final' in boxes else np.zeros(len(boxes), dtype=bool)
+    events = boxes['_events'].fillna('')
+    # computed once for all the properties
+    transitions = np.where(events.to_numpy() == '', 0, events.str.count(',').to_numpy() + 1)
+    polytope_ids = boxes['_polytope_id'].to_numpy()
+    
+    results = []
+    for i, spec in enumerate(properties):
+        result = {'name': spec.get('name', f'property #{i + 1}'), 'satisfied': None, 'polytope_ids': [], 'checked': 0, 'error': None}
+        results.append(result)
+        try:
+            kind, over = spec['kind'], spec.get('over', 'reach')
+            if kind not in PROPERTY_KINDS:
+                raise ValueError(f'unknown kind {kind}, expected one of {", ".join(PROPERTY_KINDS)}')
+            if over not in PROPERTY_SETS:
+                raise ValueError(f'unknown set {over}, expected one of {", ".join(PROPERTY_SETS)}')
+            if over == 'final' and not is_final.any():
+                raise ValueError('the final set is not available')
+            
+            selected = is_final if over == 'final' else ~is_final
+            if 'location' in spec:
+                selected = selected & _location_mask(boxes['_loc'], spec['location'])
+            if 'transitions' in spec:
+                selected = selected & (transitions == int(spec['transitions']))
+            if 'event' in spec:
+                selected = selected & _event_mask(events, spec['event'])
+            result['checked'] = int(selected.sum())
+            
+            if kind == 'exists':
+                offending = selected
+                result['satisfied'] = bool(offending.any())
+            else:
+                if kind == 'never':
+                    offending = selected
+                elif kind == 'bounds':
+                    outside = np.zeros(len(boxes), dtype=bool)
+                    for var, bounds in spec['box'].items():
+                        lower, upper = _bounds_columns(boxes, var)
+                        minimum, maximum = _range(bounds)
+                        # NaN comparisons are false, so undefined variables are fine
+                        outside |= (lower < minimum) | (upper > maximum)
+                    offending = selected & outside
+                else:
+                    inside = np.ones(len(boxes), dtype=bool)
+                    for var, bounds in spec['box'].items():
+                        lower, upper = _bounds_columns(boxes, var)
+                        minimum, maximum = _range(bounds)
+                        inside &= (upper >= minimum) & (lower <= maximum)
+                    offending = selected & inside
+                result['satisfied'] = not offending.any()
+            result['polytope_ids'] = polytope_ids[offending].tolist()
+        except (KeyError, ValueError, TypeError) as ex:
+            result['error'] = f'{ex}'
+    return results
+
+
+def load_properties(path):
+    """
+    :param path: a JSON file with the list of properties (see `check_properties(*)`)
+    :return: the list of properties
+    """
+    
+    with open(path) as properties_file:
+        return json.load(properties_file)
+
+
+def format_results(results, max_ids=10):
+    """
+    :return: a human-readable report of the results of `check_properties(*)`, one line per property
+    """
+    
+    lines = []
+    for result in results:
+        if result['error'] is not None:
+            lines.append(f'ERROR     {result["name"]}: {result["error"]}')
+            continue
+        ids = result['polytope_ids']
+        shown = ', '.join(str(polytope_id) for polytope_id in ids[:max_ids]) + (', ...' if len(ids) > max_ids else '')
+        if result['satisfied']:
+            details = f' (witnesses: {shown})' if ids else ''
+            lines.append(f'SATISFIED {result["name"]}{details}')
+        else:
+            details = f' ({len(ids)} of {result["checked"]} enclosures: {shown})' if ids else f' (none of {result["checked"]} enclosures)'
+            lines.append(f'VIOLATED  {result["name"]}{details}')
+    return '\n'.join(lines)
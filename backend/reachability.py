@@ -0,0 +1,205 @@
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objs as go
+
+from backend.evolver_tuning import configure_evolver
+from backend.initial_sets import make_initial_set
+from backend.systems_loader import build_system
+
+REACH_KINDS = ('upper_reach', 'outer_chain_reach')
+
+
+def paving_to_dataframe(paving):
+    """
+    Flatten an Ariadne hybrid grid paving (as obtained by the reachability analyser) to a dataframe of cells.
+    
+    Each row is a grid cell, with the '_loc' column and the '<var>_lower' and '<var>_upper' columns for every variable of the paving; variables which
+    are not defined in the location of the cell are NaN.
+    
+    :param paving: the Ariadne `HybridGridTreePaving`
+    :return: a dataframe of the cells of the paving
+    """
+    
+    cells = []
+    for location in paving.locations():
+        space = paving.space(location)
+        variables = [str(space.variable(i)) for i in range(space.dimension())]
+        for cell in paving[location]:
+            box = cell.box()
+            row = {'_loc': str(location)}
+            for i, var in enumerate(variables):
+                row[f'{var}_lower'] = float(str(box[i].lower_bound()))
+                row[f'{var}_upper'] = float(str(box[i].upper_bound()))
+            cells.append(row)
+    return pd.DataFrame(cells, columns=['_loc'] if not cells else None)
+
+
+def compute_reach_cells(system_spec, locations, values, final_time, max_transitions, kind, evolver_settings=None, analyser_settings=None,
+                        strict_bounds=None):
+    """
+    Run the reachability analysis of a system and return its cells. Since the arguments and the result are plain Python objects, this is meant to be
+    run in a separate process.
+    
+    :param system_spec: the system factory, in the `package.module:factory` format
+    :param locations: the initial locations, as {automaton name: location name}
+    :param values: the initial values, as {variable name: value} or {variable name: (lower bound, upper bound)}
+    :param final_time: the final continuous time
+    :param max_transitions: the maximum number of transitions
+    :param kind: either 'upper_reach' (finite time) or 'outer_chain_reach' (infinite time)
+    :param evolver_settings: optional, the evolver configuration (see `configure_evolver()`)
+    :param analyser_settings: optional, the analyser configuration as {'maximum_grid_fineness': ..., 'lock_to_grid_time': ...}
+    :param strict_bounds: optional, the bounds to exclude from the initial set (see `make_initial_set(*)`)
+    :return: the dataframe of the cells, as per `paving_to_dataframe(*)`
+    """
+    
+    import pyariadne as ari
+    
+    analyser_settings = {'maximum_grid_fineness': 6, 'lock_to_grid_time': 5, **(analyser_settings or {})}
+    
+    system = build_system(system_spec)
+    evolver = ari.GeneralHybridEvolver(system)
+    configure_evolver(evolver, evolver_settings)
+    analyser = ari.HybridReachabilityAnalyser(evolver)
+    analyser.configuration().set_maximum_grid_fineness(analyser_settings['maximum_grid_fineness'])
+    analyser.configuration().set_lock_to_grid_time(analyser_settings['lock_to_grid_time'])
+    
+    initial_set = make_initial_set(locations, values, strict_bounds)
+    if kind == 'upper_reach':
+        paving = analyser.upper_reach(initial_set, ari.HybridTime(ari.dec(float(final_time)), int(max_transitions)))
+    elif kind == 'outer_chain_reach':
+        paving = analyser.outer_chain_reach(initial_set)
+    else:
+        raise ValueError(f'unknown reachability kind "{kind}"')
+    return paving_to_dataframe(paving)
+
+
+def start_reachability(system_spec, locations, values, final_time, max_transitions, evolver_settings=None, analyser_settings=None, strict_bounds=None):
+    """
+    Compute the upper reach and the outer chain reach concurrently, each in its own process.
+    
+    :return: the executor (to be shut down by the caller) and a dictionary {kind: future of the cells dataframe}
+    """
+    
+    executor = ProcessPoolExecutor(max_workers=len(REACH_KINDS), mp_context=multiprocessing.get_context('spawn'))
+    futures = {
+        kind: executor.submit(compute_reach_cells, system_spec, locations, values, final_time, max_transitions, kind, evolver_settings, analyser_settings,
+                              strict_bounds)
+        for kind in REACH_KINDS
+    }
+    return executor, futures
+
+
+def cells_to_raster(cells_df, var_x, var_y, max_pixels=1_000_000):
+    """
+    Rasterize the projection of the cells over two variables. The cells are first converted to a compact array of indices on the finest grid found
+    (cells of coarser levels span more than one index), then painted on an image where each pixel holds the index of the location covering it.
+    
+    When the finest grid would produce more than `max_pixels` pixels, the grid is coarsened by an integer factor, always over-approximating the cells.
+    
+    :param cells_df: a dataframe obtained via `paving_to_dataframe(*)`
+    :param var_x: the x axis
+    :param var_y: the y axis
+    :param max_pixels: the maximum size of the image
+    :return: None if no cell is defined over the variables, otherwise a dictionary with the image 'z' (location index, NaN when uncovered), the
+             'locations' names, the grid 'x0', 'y0', 'dx', 'dy' and the 'cell_index' array (location index, first and last x index, first and last y
+             index of each cell)
+    """
+    
+    columns = [f'{var_x}_lower', f'{var_x}_upper', f'{var_y}_lower', f'{var_y}_upper']
+    if cells_df.empty or any(column not in cells_df for column in columns):
+        return None
+    cells_df = cells_df.dropna(subset=columns)
+    if cells_df.empty:
+        return None
+    
+    x_lower, x_upper, y_lower, y_upper = (cells_df[column].to_numpy(dtype=float) for column in columns)
+    location_codes, locations = pd.factorize(cells_df['_loc'], sort=True)
+    x0, y0 = x_lower.min(), y_lower.min()
+    dx, dy = (x_upper - x_lower).min(), (y_upper - y_lower).min()
+    nx, ny = int(round((x_upper.max() - x0) / dx)), int(round((y_upper.max() - y0) / dy))
+    factor = max(1, math.ceil(math.sqrt(nx * ny / max_pixels)))
+    dx, dy = dx * factor, dy * factor
+    nx, ny = math.ceil(nx / factor), math.ceil(ny / factor)
+    
+    # grid cells are aligned, so the rounding only absorbs the floating point noise (and the coarsening, outwards)
+    eps = 1e-9
+    cell_index = np.stack([
+        location_codes,
+        np.floor((x_lower - x0) / dx + eps),
+        np.ceil((x_upper - x0) / dx - eps),
+        np.floor((y_lower - y0) / dy + eps),
+        np.ceil((y_upper - y0) / dy - eps)
+    ], axis=1).astype(np.int32)
+    
+    z = np.full((ny, nx), np.nan)
+    for location_code in range(len(locations)):
+        i0, i1, j0, j1 = cell_index[cell_index[:, 0] == location_code, 1:].T
+        # paint all the cells at once with a 2D difference array, then integrate it to get the coverage
+        coverage = np.zeros((ny + 1, nx + 1), dtype=np.int32)
+        np.add.at(coverage, (j0, i0), 1)
+        np.add.at(coverage, (j0, i1), -1)
+        np.add.at(coverage, (j1, i0), -1)
+        np.add.at(coverage, (j1, i1), 1)
+        covered = coverage.cumsum(axis=0).cumsum(axis=1)[:ny, :nx] > 0
+        z[covered & np.isnan(z)] = location_code
+    
+    return {
+        'z': z,
+        'locations': list(locations),
+        'x0': x0,
+        'y0': y0,
+        'dx': dx,
+        'dy': dy,
+        'cell_index': cell_index
+    }
+
+
+def plot_reach_raster(raster, var_x, var_y):
+    """
+    Plot a rasterized reach set as a heatmap image, one color for each location.
+    
+    :param raster: a raster obtained via `cells_to_raster(*)`
+    :param var_x: the x axis
+    :param var_y: the y axis
+    :return: a Plotly figure
+    """
+    
+    locations = raster['locations']
+    colors = px.colors.qualitative.Plotly
+    # discrete colorscale, one band for each location
+    colorscale = [
+        [bound / len(locations), colors[i % len(colors)]]
+        for i in range(len(locations))
+        for bound in (i, i + 1)
+    ]
+    fig = go.Figure(
+        data=[
+            go.Heatmap(
+                z=raster['z'],
+                x0=raster['x0'] + raster['dx'] / 2,
+                dx=raster['dx'],
+                y0=raster['y0'] + raster['dy'] / 2,
+                dy=raster['dy'],
+                zmin=-0.5,
+                zmax=len(locations) - 0.5,
+                colorscale=colorscale,
+                colorbar={
+                    'title': {'text': 'Location'},
+                    'tickvals': list(range(len(locations))),
+                    'ticktext': locations
+                },
+                hoverongaps=False,
+                hovertemplate=f'{var_x}: %{{x}}<br>{var_y}: %{{y}}<extra></extra>'
+            )
+        ],
+        layout={
+            'xaxis': {'title': {'text': var_x}},
+            'yaxis': {'title': {'text': var_y}}
+        }
+    )
+    return fig
@@ -0,0 +1,98 @@
+import os
+import time
+from threading import Thread
+
+# None means unlimited
+DEFAULT_BUDGETS = {
+    'wall_seconds': None,
+    'max_rss_mb': None,
+    'max_enclosures': None
+}
+
+
+class BudgetExceeded(RuntimeError):
+    """
+    A computation was stopped for exceeding one of its budgets; `partial` holds whatever it completed before, if anything.
+    """
+    
+    def __init__(self, reason, partial=None):
+        super().__init__(reason)
+        self.partial = partial
+
+
+def process_rss_mb(pid):
+    """
+    :param pid: the process id
+    :return: the resident memory of the process in MB, or None if it can't be measured
+    """
+    
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss / 2 ** 20
+    except ImportError:
+        pass
+    except Exception:
+        return None
+    # Linux only, without psutil
+    try:
+        with open(f'/proc/{pid}/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def exceeded_budget(budgets, elapsed=None, rss_mb=None, enclosures=None):
+    """
+    :param budgets: a dictionary overriding `DEFAULT_BUDGETS`
+    :param elapsed: the seconds spent so far
+    :param rss_mb: the current resident memory, in MB
+    :param enclosures: the enclosures computed so far
+    :return: the description of the first budget exceeded, or None
+    """
+    
+    budgets = {**DEFAULT_BUDGETS, **(budgets or {})}
+    if budgets['wall_seconds'] is not None and elapsed is not None and elapsed > budgets['wall_seconds']:
+        return f'wall time budget exceeded ({elapsed:.1f}s > {budgets["wall_seconds"]:g}s)'
+    if budgets['max_rss_mb'] is not None and rss_mb is not None and rss_mb > budgets['max_rss_mb']:
+        return f'memory budget exceeded ({rss_mb:.0f}MB > {budgets["max_rss_mb"]:g}MB)'
+    if budgets['max_enclosures'] is not None and enclosures is not None and enclosures > budgets['max_enclosures']:
+        return f'enclosures budget exceeded ({enclosures} > {budgets["max_enclosures"]:g})'
+    return None
+
+
+def watch_budgets(budgets, pid, is_running, on_exceeded, get_enclosures=None, period=0.5, started=None):
+    """
+    Check the budgets of a running computation in a background thread, until it ends or a budget is exceeded.
+    
+    :param budgets: a dictionary overriding `DEFAULT_BUDGETS`
+    :param pid: the process running the computation, whose memory is measured
+    :param is_running: returns whether the computation is still running
+    :param on_exceeded: called once with the description of the exceeded budget, it's expected to stop the computation
+    :param get_enclosures: optional, returns the enclosures computed so far (or None if unknown)
+    :param period: the seconds between two checks
+    :param started: optional, the `time.monotonic()` at which the computation started, by default now
+    :return: the watching thread, or None if there's no budget to watch
+    """
+    
+    budgets = {**DEFAULT_BUDGETS, **(budgets or {})}
+    if all(budget is None for budget in budgets.values()):
+        return None
+    
+    started = time.monotonic() if started is None else started
+    
+    def watch():
+        while is_running():
+            reason = exceeded_budget(
+                budgets,
+                elapsed=time.monotonic() - started,
+                rss_mb=process_rss_mb(pid) if budgets['max_rss_mb'] is not None else None,
+                enclosures=get_enclosures() if budgets['max_enclosures'] is not None and get_enclosures is not None else None
+            )
+            if reason is not None:
+                on_exceeded(reason)
+                return
+            time.sleep(period)
+    
+    watcher = Thread(target=watch, daemon=True)
+    watcher.start()
+    return watcher
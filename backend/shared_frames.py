@@ -0,0 +1,76 @@
+from multiprocessing import resource_tracker, shared_memory
+
+
+# numpy and pandas are imported in the functions, since the dashboard imports the worker (and this module) before deferring them
+def _share_array(array):
+    import numpy as np
+    
+    array = np.ascontiguousarray(array)
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    name = block.name
+    block.close()
+    # the receiver owns the block from now on and unlinks it, so the tracker of this process must not unlink it too when exiting
+    resource_tracker.unregister(block._name, 'shared_memory')
+    return {'name': name, 'dtype': array.dtype.str, 'shape': array.shape}
+
+
+def _load_array(descriptor):
+    import numpy as np
+    
+    block = shared_memory.SharedMemory(name=descriptor['name'])
+    try:
+        return np.ndarray(descriptor['shape'], dtype=np.dtype(descriptor['dtype']), buffer=block.buf).copy()
+    finally:
+        block.close()
+        block.unlink()
+
+
+def share_dataframe(df):
+    """
+    Move the columns of a dataframe to shared memory blocks, one per column, so that only their small descriptor needs to be sent to another process;
+    non-numeric columns are shared as integer codes, and only their distinct values are sent along with the descriptor.
+    
+    The blocks must be claimed exactly once with `load_shared_dataframe(*)`, which releases them.
+    
+    :param df: a dataframe
+    :return: the picklable descriptor of the dataframe
+    """
+    
+    import numpy as np
+    import pandas as pd
+    
+    columns = []
+    for name in df.columns:
+        column = df[name]
+        if column.dtype.kind in 'biuf':
+            columns.append({'name': name, 'values': _share_array(column.to_numpy())})
+        else:
+            # the missing values get the -1 code by default, whatever the pandas version
+            codes, categories = pd.factorize(column.astype(object))
+            columns.append({'name': name, 'codes': _share_array(codes.astype(np.int32)), 'categories': list(categories),
+                            'categorical': isinstance(column.dtype, pd.CategoricalDtype)})
+    return {'columns': columns, 'length': len(df)}
+
+
+def load_shared_dataframe(descriptor):
+    """
+    Rebuild a dataframe shared by `share_dataframe(*)`, releasing its shared memory blocks.
+    
+    :param descriptor: the descriptor of the dataframe
+    :return: the dataframe, with a fresh index
+    """
+    
+    import numpy as np
+    import pandas as pd
+    
+    data = {}
+    for column in descriptor['columns']:
+        if 'values' in column:
+            data[column['name']] = _load_array(column['values'])
+        else:
+            codes = _load_array(column['codes'])
+            values = pd.Categorical.from_codes(codes, categories=column['categories']) if column['categorical'] else \
+                np.array(column['categories'] + [None], dtype=object)[codes]
+            data[column['name']] = values
+    return pd.DataFrame(data, index=pd.RangeIndex(descriptor['length']), columns=[column['name'] for column in descriptor['columns']])
@@ -0,0 +1,138 @@
+import math
+
+import numpy as np
+
+from backend.polygon_geometry import _cross, _open_ccw_polygon
+
+
+class GridIndex(object):
+    """
+    Uniform grid over the bounding boxes of the 2D polytopes of a projection, to find the polytopes covering a point or a region without scanning all
+    of them: each cell lists the polytopes whose bounding box overlaps it, then the candidates are checked exactly.
+    
+    The grid has about one cell per polytope, which keeps both the cells short and the memory linear for the typical orbit, made of many small
+    polytopes.
+    """
+    
+    def __init__(self, polytopes_df, var_x, var_y, max_cells_per_axis=256):
+        """
+        :param polytopes_df: a dataframe obtained via the `orbit_to_dataframe()` method (not collapsed)
+        :param var_x: the x axis
+        :param var_y: the y axis
+        :param max_cells_per_axis: the maximum resolution of the grid
+        """
+        
+        df = polytopes_df[['_polytope_id', var_x, var_y]].dropna()
+        df = df.iloc[np.argsort(df['_polytope_id'].to_numpy(), kind='stable')]
+        ids = df['_polytope_id'].to_numpy()
+        self.var_x, self.var_y = var_x, var_y
+        self.polytope_ids, starts = np.unique(ids, return_index=True)
+        self._starts = np.append(starts, len(ids))
+        self._x = df[var_x].to_numpy(dtype=float)
+        self._y = df[var_y].to_numpy(dtype=float)
+        
+        n = len(self.polytope_ids)
+        if n == 0:
+            self.bounds = np.empty((0, 4))
+            self._cells = (1, 1)
+            self._origin, self._cell_size = (0.0, 0.0), (1.0, 1.0)
+            self._cell_starts, self._cell_polytopes = np.zeros(2, dtype=np.int64), np.empty(0, dtype=np.int64)
+            return
+        
+        # bounding boxes as (x min, y min, x max, y max), one row per polytope
+        self.bounds = np.column_stack([
+            np.minimum.reduceat(self._x, starts), np.minimum.reduceat(self._y, starts),
+            np.maximum.reduceat(self._x, starts), np.maximum.reduceat(self._y, starts)
+        ])
+        cells_per_axis = min(max_cells_per_axis, max(1, math.ceil(math.sqrt(n))))
+        self._cells = (cells_per_axis, cells_per_axis)
+        self._origin = (self.bounds[:, 0].min(), self.bounds[:, 1].min())
+        extent = (self.bounds[:, 2].max() - self._origin[0], self.bounds[:, 3].max() - self._origin[1])
+        self._cell_size = tuple(span / cells if span > 0 else 1.0 for span, cells in zip(extent, self._cells))
+        
+        # every (cell, polytope) pair, sorted by cell
+        x0, y0 = self._cell_of(self.bounds[:, 0], self.bounds[:, 1])
+        x1, y1 = self._cell_of(self.bounds[:, 2], self.bounds[:, 3])
+        widths, heights = x1 - x0 + 1, y1 - y0 + 1
+        counts = widths * heights
+        polytopes = np.repeat(np.arange(n), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        cells = (y0[polytopes] + offsets // widths[polytopes]) * self._cells[0] + x0[polytopes] + offsets % widths[polytopes]
+        order = np.argsort(cells, kind='stable')
+        self._cell_polytopes = polytopes[order]
+        self._cell_starts = np.searchsorted(cells[order], np.arange(self._cells[0] * self._cells[1] + 1))
+    
+    def _cell_of(self, x, y):
+        column = np.clip(np.floor((np.asarray(x) - self._origin[0]) / self._cell_size[0]).astype(np.int64), 0, self._cells[0] - 1)
+        row = np.clip(np.floor((np.asarray(y) - self._origin[1]) / self._cell_size[1]).astype(np.int64), 0, self._cells[1] - 1)
+        return column, row
+    
+    def _candidates(self, x_min, y_min, x_max, y_max):
+        # the polytopes listed in the cells overlapping the region, whose bounding box overlaps it too
+        if len(self.polytope_ids) == 0:
+            return np.empty(0, dtype=np.int64)
+        (x0, x1), (y0, y1) = self._cell_of([x_min, x_max], [y_min, y_max])
+        cells = (np.arange(y0, y1 + 1)[:, None] * self._cells[0] + np.arange(x0, x1 + 1)[None, :]).ravel()
+        candidates = np.unique(np.concatenate([self._cell_polytopes[self._cell_starts[c]:self._cell_starts[c + 1]] for c in cells]))
+        bounds = self.bounds[candidates]
+        overlapping = (bounds[:, 0] <= x_max) & (bounds[:, 2] >= x_min) & (bounds[:, 1] <= y_max) & (bounds[:, 3] >= y_min)
+        return candidates[overlapping]
+    
+    def _points(self, polytope):
+        start, end = self._starts[polytope], self._starts[polytope + 1]
+        return self._x[start:end], self._y[start:end]
+    
+    def query_point(self, x, y, radius=(0.0, 0.0)):
+        """
+        :param x: the x coordinate
+        :param y: the y coordinate
+        :param radius: the tolerance along each axis, e.g. a few pixels of the plot in data units
+        :return: the ids of the polytopes containing the point, or passing within the tolerance from it (such as the simulated curves)
+        """
+        
+        rx, ry = (value if value > 0 else 1e-12 for value in radius)
+        found = []
+        for polytope in self._candidates(x - rx, y - ry, x + rx, y + ry):
+            xs, ys = self._points(polytope)
+            # in units of the tolerance, so that the point is within the tolerance when at distance <= 1
+            points = np.column_stack([(xs - x) / rx, (ys - y) / ry])
+            if _min_distance_to_origin(points) <= 1:
+                found.append(self.polytope_ids[polytope])
+        return found
+    
+    def query_box(self, x_min, y_min, x_max, y_max):
+        """
+        :return: the ids of the polytopes intersecting the given rectangle
+        """
+        
+        found = []
+        corners = np.array([[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]])
+        for polytope in self._candidates(x_min, y_min, x_max, y_max):
+            xs, ys = self._points(polytope)
+            polygon = _open_ccw_polygon(xs, ys)
+            # the bounding boxes overlap, so the sets are disjoint only if an edge of the (convex) polygon separates them; the polylines (such as
+            # the simulated curves) are kept on the bounding box test only
+            if len(polygon) >= 3 and xs[0] == xs[-1] and ys[0] == ys[-1]:
+                edges = np.roll(polygon, -1, axis=0) - polygon
+                separated = np.any(np.all(_cross(edges[:, None, :], corners[None, :, :] - polygon[:, None, :]) < 0, axis=1))
+                if separated:
+                    continue
+            found.append(self.polytope_ids[polytope])
+        return found
+
+
+def _min_distance_to_origin(points):
+    # the distance of the origin from a closed polygon (zero inside it, if convex) or from a polyline of the given vertices
+    if len(points) == 1:
+        return float(np.hypot(*points[0]))
+    # only the closed ones have an inside
+    if np.allclose(points[0], points[-1]):
+        polygon = _open_ccw_polygon(points[:, 0], points[:, 1])
+        if len(polygon) >= 3 and np.all(_cross(np.roll(polygon, -1, axis=0) - polygon, -polygon) >= 0):
+            return 0.0
+    start, end = points[:-1], points[1:]
+    segment = end - start
+    lengths = np.einsum('ij,ij->i', segment, segment)
+    t = np.clip(np.einsum('ij,ij->i', -start, segment) / np.where(lengths > 0, lengths, 1), 0, 1)
+    closest = start + t[:, None] * segment
+    return float(np.hypot(closest[:, 0], closest[:, 1]).min())
@@ -0,0 +1,46 @@
+import importlib
+
+
+def parse_system_spec(system_spec):
+    """
+    :param system_spec: a system factory, in the `package.module:factory` format (e.g. 'systems.tutorial_system:get_system')
+    :return: the imported module and the name of the factory
+    """
+    
+    module_name, _, factory_name = system_spec.partition(':')
+    if not module_name or not factory_name:
+        raise ValueError(f'invalid system "{system_spec}", expected the module:factory format')
+    module = importlib.import_module(module_name)
+    if not callable(getattr(module, factory_name, None)):
+        raise ValueError(f'module "{module_name}" has no "{factory_name}" factory')
+    return module, factory_name
+
+
+def build_system(system_spec):
+    """
+    Build the hybrid system from its factory; this is how worker processes rebuild the system, since pyariadne objects can't be pickled.
+    
+    :param system_spec: a system factory, in the `package.module:factory` format
+    :return: the Ariadne system
+    """
+    
+    module, factory_name = parse_system_spec(system_spec)
+    return getattr(module, factory_name)()
+
+
+def evolve_system_module(module_name):
+    """
+    Evolve a system module as configured by the module itself, as the command line tools do.
+    
+    :param module_name: the module, which must follow the layout of systems/tutorial_system.py (`get_system`, `get_initial_set`, `get_final_time`,
+                        `create_evolver` and `compute_evolution`)
+    :return: the orbit and the names of the variables of the system
+    """
+    
+    from backend.plotting_backend import get_all_variables
+    
+    module = importlib.import_module(module_name)
+    system = module.get_system()
+    evolver = module.create_evolver(system)
+    orbit = module.compute_evolution(evolver, module.get_initial_set(), module.get_final_time())
+    return orbit, get_all_variables(system)
@@ -0,0 +1,46 @@
+import argparse
+import os
+import time
+
+from backend.batch_export import EXPORT_FORMATS, all_projections, export_projections
+from backend.projection_store import ProjectionStore, extract_projection_store
+from backend.systems_loader import evolve_system_module
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Ariadne headless batch exporter')
+    parser.add_argument('--module', dest='modules', action='append', default=[],
+                        help='system module to evolve (providing get_system, get_initial_set, get_final_time, create_evolver and compute_evolution)')
+    parser.add_argument('--store', dest='stores', action='append', default=[], help='projection store previously saved with --save-stores')
+    parser.add_argument('-p', dest='projections', nargs='+', default=None,
+                        help='projections to export as x:y pairs (default: every (t, var) and (var, var) projection)')
+    parser.add_argument('-f', dest='formats', nargs='+', default=list(EXPORT_FORMATS), choices=EXPORT_FORMATS, help='output formats')
+    parser.add_argument('-o', dest='output_dir', type=str, default='plots/batch', help='output directory')
+    parser.add_argument('-j', dest='workers', type=int, default=None, help='number of rendering processes (default: number of CPUs)')
+    parser.add_argument('--save-stores', dest='save_stores', action='store_true', help='save the extracted projection stores in the output directory')
+    
+    args = parser.parse_args()
+    if not args.modules and not args.stores:
+        parser.error('specify at least one --module or --store')
+    requested = [tuple(p.split(':')) for p in args.projections] if args.projections else None
+    
+    stores, extraction_seconds = {}, {}
+    for store_path in args.stores:
+        name = os.path.splitext(os.path.basename(store_path))[0]
+        stores[name] = ProjectionStore.load(store_path)
+    for module_name in args.modules:
+        name = module_name.split('.')[-1]
+        print(f'Evolving {module_name}...')
+        orbit, variables = evolve_system_module(module_name)
+        # every projection is extracted in a single pass over the orbit
+        started = time.perf_counter()
+        stores[name] = extract_projection_store(orbit.reach(), requested or all_projections(variables))
+        extraction_seconds[name] = time.perf_counter() - started
+        if args.save_stores:
+            os.makedirs(args.output_dir, exist_ok=True)
+            stores[name].save(os.path.join(args.output_dir, f'{name}.pkl'))
+    
+    # by default, each orbit is exported with its own projections, since the orbits may have different variables
+    print(f'Exporting {len(requested) if requested else "all the"} projections of {len(stores)} orbits...')
+    manifest = export_projections(stores, requested, args.output_dir, args.formats, args.workers, extraction_seconds)
+    print(f'Done in {manifest["export_seconds"]:.2f}s, {manifest["errors"]} errors, manifest written in {args.output_dir}')
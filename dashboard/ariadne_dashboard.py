@@ -2,21 +2,47 @@
 
 __version__ = '1.0'
 __all__ = [
-    'launch'
+    'launch',
+    'load_system',
+    'DEFAULT_SYSTEM'
 ]
 
+import os
 import re
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from enum import Enum, auto
+from threading import Thread
 
 import dash
 import dash_core_components as core
 import dash_html_components as html
-import plotly.express as px
-import pyariadne as ari
-from dash.dependencies import Output, Input, State, MATCH, ALL
+import dash_table
+from dash.dependencies import Output, Input, State, ALL
 
-from backend.plotting_backend import plot_trajectory, orbit_to_dataframe, plot_automaton, analyze_automaton, build_cytoscape_graph, get_all_variables
-from systems import tutorial_system
+from backend.analysis_cache import load_analysis, save_analysis
+from backend.ariadne_worker import WorkerCrashed, WorkerError, WorkerKilled, start_worker
+from backend.evolver_tuning import DEFAULT_EVOLVER_SETTINGS, TUNING_OBJECTIVES, pareto_front, recommend
+from backend.initial_conditions import BOUNDS
+from backend.initial_sets import sample_box_points
+from backend.memory_accounting import DEFAULT_MEMORY_BUDGETS
+from backend.resource_budgets import DEFAULT_BUDGETS, BudgetExceeded, watch_budgets
+
+# pandas and plotly are heavy to import and the system analysis can take a while, so both are deferred: the server answers immediately with a loading
+# page, while the system is loaded in background; the backend modules are therefore imported only where they are needed
+# pyariadne is never imported by the web process: every pyariadne object lives in a supervised worker process, whose crashes don't take the dashboard
+# down (see `AriadneWorker`)
+DEFAULT_SYSTEM = 'systems.tutorial_system:get_system'
+# an example for the property checker
+DEFAULT_PROPERTIES = '''[
+  {"name": "a final set without transitions exists", "kind": "exists", "over": "final", "transitions": 0},
+  {"name": "time stays non-negative", "kind": "bounds", "box": {"t": [0, null]}}
+]'''
+# the value of the automaton selector showing the product of all the automata
+PRODUCT_GRAPH = '__product__'
+FIRST_RESPONSE_TARGET = 1.0  # seconds, from the dashboard import to the first HTTP response
+
+_import_time = time.perf_counter()
 
 
 class EvolutionState(Enum):
@@ -25,33 +51,122 @@ class EvolutionState(Enum):
     ERROR = auto(),
     LOADING = auto(),
     LOADED = auto(),
+    EVOLVING = auto(),
     SAVING = auto(),
     READY = auto(),
-    DONE = auto()
+    DONE = auto(),
+    BUDGET_EXCEEDED = auto()
 
 
 class AppLogic(object):
-    hybrid_system = None
+    worker = None
     all_variables_names = []
-    _orbit = None
+    # the generation of the worker holding the orbit, which is lost if the worker crashes
+    _orbit_generation = None
     
     automatons_analysis = {}
     automatons_graphs = {}
+    # the product of the automata is explored lazily, from the initial locations
+    product_graph = None
+    product_graph_max_nodes = 50
+    product_graph_depth = 1
+    # the locations visited and the transitions taken by the orbit, and the evolution they come from
+    _activity = None
+    _activity_source = None
+    
+    # the bounding boxes of the reach and final sets over all the variables, for the property checks and the inspector
+    _orbit_boxes = None
+    _orbit_boxes_source = None
+    # the index of the last extracted 2D polytopes, to find the ones under the mouse
+    spatial_index = None
+    inspect_radius_px = 5
+    # the store of the scatter matrix, with every projection of its variables
+    matrix_store = None
+    matrix_variables = []
     
     configurable_automatons = []
     configurable_variables = []
     
     current_variables = []
     state = EvolutionState.NONE
+    error = ''
     polytopes = None
+    boxes = None
+    envelopes = None
+    
+    evolver_settings = DEFAULT_EVOLVER_SETTINGS
+    final_time = None
+    # the server-wide budgets, which can be overridden for each run
+    default_budgets = DEFAULT_BUDGETS
+    budgets = DEFAULT_BUDGETS
+    # what is known of an evolution stopped for exceeding a budget
+    partial_summary = ''
+    _evolution_thread = None
+    _evolution_reported = True
+    
+    # wide initial sets can be split in sub-boxes evolved in parallel processes, whose results are merged in a projection store
+    _evolution_store = None
+    _evolution_boxes = None
+    _subdivision_progress = None
+    
+    # the simulation of a few points of the initial set is orders of magnitude faster than the evolution, so it's shown while waiting
+    preview_samples = 5
+    preview_step_size = 0.01
+    # how long to wait for the worker restarted after a kill, to simulate the preview again
+    worker_restart_timeout = 60
+    _preview_generation = None
+    _preview_reported = True
+    
+    # the plain Python description of the last configured run, which can be rebuilt in other processes given the system factory
+    system_spec = None
+    run_spec = None
+    
+    reach_cells = {}
+    reach_error = ''
+    _reach_executor = None
+    _reach_futures = None
     
-    def __init__(self, system):
-        self.hybrid_system = system
-        self.all_variables_names = get_all_variables(system)
+    # the tuning probes are short evolutions, up to this fraction of the configured final time, each within the budgets
+    tuning_time_fraction = 0.25
+    tuning_budgets = None
+    _tuning_spec = None
+    tuning_results = None
+    tuning_recommendation = None
+    tuning_error = ''
+    _tuning_executor = None
+    _tuning_futures = None
+    
+    # the nominal size of the trajectory plot, used to convert the simplification tolerance from pixels to data units
+    plot_size_px = (700, 450)
+    _first_preview_id = None
+    # the playback of the evolution is split into at most this many frames, all sent along with the plot
+    animation_max_frames = 60
+    
+    # the recently extracted projections are kept up to the memory budgets, and the orbit can be released by the worker once extracted
+    memory_budgets = DEFAULT_MEMORY_BUDGETS
+    _projection_cache = None
+    _orbit_released = False
+    # the last evictions, for the memory report
+    evictions = []
+    max_evictions_shown = 10
+    
+    def __init__(self, analysis, system_spec=None, worker=None, budgets=None, memory_budgets=None):
+        from backend.memory_accounting import LruCache
+        
+        self.worker = worker
+        self.system_spec = system_spec
+        self.cache_key = analysis.get('key')
+        self.evolver_settings = dict(DEFAULT_EVOLVER_SETTINGS)
+        self.default_budgets = {**DEFAULT_BUDGETS, **(budgets or {})}
+        self.budgets = dict(self.default_budgets)
+        self.memory_budgets = {**DEFAULT_MEMORY_BUDGETS, **(memory_budgets or {})}
+        self._projection_cache = LruCache(self.memory_budgets['max_cache_mb'])
+        self.evictions = []
         
-        # extract info and create graphs of the automatons
-        self._batch_analyze_automaton()
-        self._batch_build_graph()
+        # the analysis is made (or loaded from the cache) by the worker
+        self.all_variables_names = analysis['variables']
+        self.automatons_analysis = analysis['analysis']
+        self.automatons_graphs = analysis['graphs']
         
         # if we just have one location, then we can't choose the initial one later on
         self.configurable_automatons = sorted([
@@ -71,107 +186,632 @@ class AppLogic(object):
             for automaton_name, automaton_info in self.automatons_analysis.items()
         }
     
-    def _batch_build_graph(self):
-        self.automatons_graphs = {
-            automaton_name: build_cytoscape_graph(automaton_info)
-            for automaton_name, automaton_info in self.automatons_analysis.items()
-        }
+    def reset_product_graph(self, start):
+        """
+        Start exploring the product of the automata again from the given location, showing its successors up to `product_graph_depth`.
+        
+        :param start: the start location, as {automaton name: location name}
+        :return: the `ProductGraph`
+        """
+        
+        from backend.product_graph import ProductGraph
+        
+        self.product_graph = ProductGraph(self.automatons_analysis, start, self.product_graph_max_nodes)
+        self.product_graph.expand_breadth_first(self.product_graph_depth)
+        return self.product_graph
+    
+    def orbit_activity(self):
+        """
+        :return: what the orbit of the evolution did in each location and which transitions it took (see `aggregate_activity(*)`), or None if
+                 there's no evolution
+        """
+        
+        from backend.orbit_activity import aggregate_activity
+        
+        source = (self._orbit_generation, id(self._evolution_store))
+        if not self.has_evolution():
+            return None
+        if self._activity_source != source:
+            # the parallel sub-boxes have no final set, only their polytopes
+            self._activity = aggregate_activity(self._evolution_store.polytopes) if self._evolution_store is not None else \
+                self.worker.call('orbit_activity')
+            self._activity_source = source
+        return self._activity
+    
+    def check_properties(self, properties):
+        """
+        Check declarative properties against the bounding boxes of the enclosures of the evolution (see `check_properties(*)`); the final set is
+        not available for the parallel sub-boxes.
+        
+        :return: the results of the checks
+        """
+        
+        from backend.property_checker import check_properties
+        
+        return check_properties(self.orbit_boxes(), properties)
+    
+    def orbit_boxes(self):
+        """
+        :return: the bounding boxes of the enclosures of the evolution over all the variables, including the final set when available (see
+                 `extract_orbit_boxes(*)`), extracted once per evolution
+        """
+        
+        source = (self._orbit_generation, id(self._evolution_store))
+        if self._orbit_boxes_source != source:
+            self._orbit_boxes = self._evolution_boxes if self._evolution_store is not None else \
+                self.worker.call('orbit_boxes', var_list=self.all_variables_names)
+            self._orbit_boxes_source = source
+        return self._orbit_boxes
+    
+    def inspect(self, x_range, y_range, time_range=None):
+        """
+        Find the enclosures under a point or a rectangle of the last extracted 2D projection, with the spatial index.
+        
+        :param x_range: the (min, max) x of the rectangle, or (x, x) for a point
+        :param y_range: the (min, max) y of the rectangle, or (y, y) for a point
+        :param time_range: optional, only consider the enclosures whose '_time' is in this range, as in the plot
+        :return: the rows of the found enclosures, with their location, time range, events and bounds over all the variables (only the location and
+                 the time for the simulated curves)
+        """
+        
+        import pandas as pd
+        
+        if self.spatial_index is None:
+            return None
+        if x_range[0] == x_range[1] and y_range[0] == y_range[1]:
+            # a click: a few pixels of tolerance, which is also needed to pick the simulated curves
+            spans = [self.polytopes[var].max() - self.polytopes[var].min() for var in (self.spatial_index.var_x, self.spatial_index.var_y)]
+            radius = tuple(self.inspect_radius_px * span / size if span > 0 else 1e-9 for span, size in zip(spans, self.plot_size_px))
+            polytope_ids = self.spatial_index.query_point(x_range[0], y_range[0], radius)
+        else:
+            polytope_ids = self.spatial_index.query_box(x_range[0], y_range[0], x_range[1], y_range[1])
+        
+        found = self.polytopes[self.polytopes['_polytope_id'].isin(polytope_ids)].drop_duplicates('_polytope_id')[['_polytope_id', '_loc', '_time']]
+        if time_range is not None:
+            found = found[(time_range[0] <= found['_time']) & (found['_time'] <= time_range[1])]
+        is_simulated = found['_polytope_id'] >= self._first_preview_id if self._first_preview_id is not None else pd.Series(False, index=found.index)
+        enclosures = found[~is_simulated]
+        if self.has_evolution() and not enclosures.empty:
+            boxes = self.orbit_boxes()
+            if '_final' in boxes:
+                boxes = boxes[~boxes['_final']]
+            enclosures = boxes[boxes['_polytope_id'].isin(enclosures['_polytope_id'])]
+        return pd.concat([enclosures, found[is_simulated]], ignore_index=True).sort_values('_polytope_id', ignore_index=True)
+    
+    def _holds(self, generation):
+        # whether the worker still holds what it computed in the given generation
+        return generation is not None and self.worker is not None and generation == self.worker.generation
+    
+    def run_evolution(self):
+        evolution = self.worker.submit('evolve', **self.run_spec, evolver_settings=self.evolver_settings)
+        generation = self.worker.generation
+        watch_budgets(self.budgets, self.worker.pid, lambda: not evolution.done(), self._stop_evolution, self._evolved_enclosures)
+        evolution.result()
+        self._orbit_generation = generation
+    
+    def _evolved_enclosures(self):
+        try:
+            snapshot = self.worker.call('telemetry_snapshot', timeout=1)
+        except (WorkerCrashed, WorkerError, FutureTimeoutError):
+            return None
+        # without the evolver log, the enclosures are unknown until the end
+        return snapshot['enclosures'] if snapshot is not None and snapshot['silent_for'] is not None else None
+    
+    def _stop_evolution(self, reason):
+        # the orbit is lost with the worker, only its telemetry is kept
+        self.partial_summary = self.telemetry_summary()
+        print(f'stopping the evolution, {reason}...', end='')
+        self.worker.kill(reason)
+    
+    def run_subdivided_evolution(self, subdivisions):
+        from backend.parallel_evolution import evolve_subdivided
+        
+        def on_progress(done, total):
+            self._subdivision_progress = (done, total)
+        
+        self._subdivision_progress = (0, subdivisions)
+        self._evolution_store, self._evolution_boxes = evolve_subdivided(
+            self.system_spec, **self.run_spec, variables=self.all_variables_names, pieces=subdivisions,
+            evolver_settings=self.evolver_settings,
+            on_progress=on_progress,
+            budgets=self.budgets
+        )
+    
+    def run_preview(self, preview_points):
+        self.worker.call('simulate', locations=self.run_spec['locations'], points=preview_points, final_time=self.run_spec['final_time'],
+                         max_transitions=self.run_spec['max_transitions'], step_size=self.preview_step_size)
+        self._preview_generation = self.worker.generation
+    
+    def start_evolution(self, preview_points=None, subdivisions=1, budgets=None):
+        """
+        Run the evolution configured by the `run_spec` in a background thread, so that the dashboard can keep polling the telemetry meanwhile. If
+        `preview_points` of the initial set are provided, they are simulated before starting the evolution, so that a preview of the trajectories is
+        available almost immediately. With more than one subdivision, the initial set is split and evolved in parallel processes instead.
+        
+        The evolution in the worker is killed as soon as it exceeds one of the `budgets` (by default the server-wide ones, see `DEFAULT_BUDGETS`):
+        the state becomes `BUDGET_EXCEEDED`, and only the preview and the telemetry collected so far are kept. The processes of the sub-boxes are
+        killed in the same way, keeping the sub-boxes already evolved (see `evolve_subdivided(*)`).
+        """
+        
+        subdivide = subdivisions > 1 and self.system_spec is not None
+        
+        def evolve():
+            if preview_points:
+                try:
+                    print('Simulating...', end='')
+                    self.run_preview(preview_points)
+                    print('done')
+                except Exception as ex:
+                    # the preview is just a nice-to-have, the evolution goes on anyway
+                    print(f'failed ({ex})')
+            try:
+                print('Evolving...', end='')
+                if subdivide:
+                    self.run_subdivided_evolution(subdivisions)
+                else:
+                    self.run_evolution()
+                    if self.memory_budgets['release_orbit']:
+                        try:
+                            self.release_orbit()
+                        except Exception as ex:
+                            # the orbit is still there, just not released
+                            print(f'cannot release the orbit ({ex})...', end='')
+                self.state = EvolutionState.DONE
+                print('done')
+            except WorkerKilled as ex:
+                print('stopped')
+                self.error = f'{ex}'
+                # the preview was lost along with the worker, so it's simulated again on the new one as the partial result, once it's running
+                if preview_points and self._preview_generation is not None:
+                    try:
+                        if not self.worker.wait_restarted(self._preview_generation, self.worker_restart_timeout):
+                            raise WorkerCrashed(self.worker.last_crash or 'the worker was not restarted')
+                        self.run_preview(preview_points)
+                    except Exception as ex:
+                        print(f'Cannot simulate the preview again ({ex})')
+                self.state = EvolutionState.BUDGET_EXCEEDED
+            except BudgetExceeded as ex:
+                print('stopped')
+                self.error = f'{ex}'
+                # the sub-boxes evolved within the budgets are the partial result
+                if ex.partial is not None:
+                    self._evolution_store, self._evolution_boxes = ex.partial
+                self.state = EvolutionState.BUDGET_EXCEEDED
+            except Exception as ex:
+                # PyAriadne errors (the details are printed by the worker) or a crash of the worker
+                print(f'failed ({ex})')
+                self.error = f'{ex}'.splitlines()[0]
+                self.state = EvolutionState.ERROR
+        
+        self.final_time = self.run_spec['final_time']
+        self.load_tuning()
+        self.budgets = {**self.default_budgets, **(budgets or {})}
+        self.partial_summary = ''
+        self.error = ''
+        self.state = EvolutionState.EVOLVING
+        self._orbit_generation = None
+        self._evolution_store, self._evolution_boxes, self._subdivision_progress = None, None, None
+        self._orbit_released = False
+        self._projection_cache.clear()
+        self.matrix_store = None
+        self._preview_generation = None
+        self._evolution_reported = False
+        self._preview_reported = False
+        self._evolution_thread = Thread(target=evolve, daemon=True)
+        self._evolution_thread.start()
+    
+    def poll_evolution(self):
+        """
+        :return: the final state of the evolution the first time it's polled after the evolution ended, None otherwise
+        """
+        
+        if self._evolution_reported or self.state == EvolutionState.EVOLVING:
+            return None
+        self._evolution_reported = True
+        return self.state
+    
+    def poll_preview(self):
+        """
+        :return: True the first time it's polled after the preview became available, False otherwise
+        """
+        
+        if self._preview_reported or not self._holds(self._preview_generation):
+            return False
+        self._preview_reported = True
+        return True
+    
+    def has_evolution(self):
+        return self._holds(self._orbit_generation) or self._evolution_store is not None
+    
+    def has_trajectories(self):
+        return self.has_evolution() or self._holds(self._preview_generation)
+    
+    def telemetry_summary(self):
+        if self._subdivision_progress is not None:
+            # the evolver logs of the worker processes are not captured
+            done, total = self._subdivision_progress
+            return f'{done}/{total} sub-boxes evolved'
+        if self.state == EvolutionState.BUDGET_EXCEEDED:
+            return self.partial_summary
+        if self.worker is None or self.state not in (EvolutionState.EVOLVING, EvolutionState.DONE):
+            return ''
+        try:
+            # answered by the worker even while it's evolving
+            return self.worker.call('telemetry_summary', timeout=1, final_time=self.final_time)
+        except (WorkerCrashed, WorkerError, FutureTimeoutError):
+            return ''
+    
+    def start_reachability(self):
+        from backend.reachability import start_reachability
+        
+        self.reach_cells = {}
+        self.reach_error = ''
+        self._reach_executor, self._reach_futures = start_reachability(
+            self.system_spec, **self.run_spec,
+            evolver_settings=self.evolver_settings
+        )
+    
+    def is_reachability_running(self):
+        return self._reach_futures is not None and not all(future.done() for future in self._reach_futures.values())
+    
+    def poll_reachability(self):
+        """
+        :return: True the first time it's polled after the reachability analysis ended, False otherwise
+        """
+        
+        if self._reach_futures is None or self.is_reachability_running():
+            return False
+        for kind, future in self._reach_futures.items():
+            try:
+                self.reach_cells[kind] = future.result()
+            except Exception as ex:
+                self.reach_error += f'{kind}: {ex}\n'
+        self._reach_executor.shutdown(wait=False)
+        self._reach_executor, self._reach_futures = None, None
+        return True
     
-    def _batch_analyze_automaton(self):
-        for automaton in self.hybrid_system:
-            automaton_info = analyze_automaton(automaton)
-            self.automatons_analysis[automaton_info['name']] = automaton_info
-    
-    def run_evolution(self, initial_set, final_time):
-        # set the evolver configuration
-        # TODO add a way to set these parameters
-        # evolver.configuration().set_enable_reconditioning(self: ari.GeneralHybridEvolverConfiguration, arg0: bool) -> None
-        # evolver.configuration().set_enable_subdivisions(self: ari.GeneralHybridEvolverConfiguration, arg0: bool) -> None
-        # evolver.configuration().set_maximum_spacial_error(self: ari.GeneralHybridEvolverConfiguration, arg0: ari.ApproximateDouble) -> None
-        evolver = ari.GeneralHybridEvolver(self.hybrid_system)
-        evolver.configuration().set_maximum_enclosure_radius(3.0)
-        evolver.configuration().set_maximum_step_size(0.25)
-        self._orbit = evolver.orbit(initial_set, ari.HybridTerminationCriterion(final_time), ari.Semantics.UPPER)
-    
-    def extract_projections(self, var_list=None):
+    def _tuning_key(self, run_spec):
+        import hashlib
+        import json
+        
+        # the best settings depend on the initial set and on the horizon as much as on the system
+        digest = hashlib.sha256(json.dumps(run_spec, sort_keys=True).encode()).hexdigest()[:16]
+        return f'{self.cache_key}-tuning-{digest}'
+    
+    def load_tuning(self):
+        """
+        Load the last tuning of the system for the current `run_spec`, if any.
+        
+        :return: True if there was one
+        """
+        
+        if self.cache_key is None or self.run_spec is None or self.is_tuning_running():
+            return False
+        tuning = load_analysis(self._tuning_key(self.run_spec))
+        self.tuning_results = tuning['results'] if tuning is not None else None
+        self.tuning_recommendation = recommend(self.tuning_results) if tuning is not None else None
+        return tuning is not None
+    
+    def start_tuning(self):
+        from backend.evolver_tuning import start_tuning
+        
+        self.tuning_results = None
+        self.tuning_recommendation = None
+        self.tuning_error = ''
+        self._tuning_spec = dict(self.run_spec)
+        run_spec = dict(self.run_spec, final_time=self.run_spec['final_time'] * self.tuning_time_fraction)
+        variables = [var for var in self.all_variables_names if var != 't']
+        self._tuning_executor, self._tuning_futures = start_tuning(self.system_spec, **run_spec, variables=variables, budgets=self.tuning_budgets)
+    
+    def is_tuning_running(self):
+        return self._tuning_futures is not None and not all(future.done() for future in self._tuning_futures)
+    
+    def poll_tuning(self):
+        """
+        :return: True the first time it's polled after the tuning ended, False otherwise
+        """
+        
+        if self._tuning_futures is None or self.is_tuning_running():
+            return False
+        results = []
+        for future in self._tuning_futures:
+            try:
+                results.append(future.result())
+            except Exception as ex:
+                # the worker process died, e.g. killed by a pyariadne crash
+                self.tuning_error += f'{ex}\n'
+        self._tuning_executor.shutdown(wait=False)
+        self._tuning_executor, self._tuning_futures = None, None
+        self.tuning_results = results
+        self.tuning_recommendation = recommend(results)
+        if self.cache_key is not None:
+            save_analysis(self._tuning_key(self._tuning_spec), {'results': results})
+        return True
+    
+    def apply_tuning(self):
+        """
+        Use the recommended settings for the next evolutions.
+        
+        :return: True if there was a recommendation to apply
+        """
+        
+        if self.tuning_recommendation is None:
+            return False
+        self.evolver_settings = {**DEFAULT_EVOLVER_SETTINGS, **self.tuning_recommendation['settings']}
+        return True
+    
+    def extract_bounding_boxes(self, var_list=None):
         if not var_list:
             var_list = self.all_variables_names
-        orbit_reach = self._orbit.reach()
-        self.polytopes = orbit_to_dataframe(orbit_reach=orbit_reach, var_list=var_list, collapse=(len(var_list) >= 3))
+        if self._evolution_boxes is not None:
+            columns = ['_polytope_id', '_loc', '_time_lower', '_time', '_events', '_provenance']
+            columns += [f'{var}_{bound}' for var in dict.fromkeys(var_list) if var != 't' for bound in ('lower', 'upper')]
+            self.boxes = self._evolution_boxes[columns].copy()
+            if 't' in var_list:
+                self.boxes['t_lower'] = self.boxes['_time_lower']
+                self.boxes['t_upper'] = self.boxes['_time']
+        else:
+            self.boxes = self.worker.call('bounding_boxes', var_list=var_list)
+        return self.boxes
+    
+    def extract_projections(self, var_list=None, overlay_preview=False):
+        import pandas as pd
+        from backend.spatial_index import GridIndex
+        
+        if not var_list:
+            var_list = self.all_variables_names
+        # going back to recently plotted variables needs no further pass over the orbit
+        key = (tuple(var_list), overlay_preview, self._orbit_generation, id(self._evolution_store), self._preview_generation,
+               self.worker.generation if self.worker is not None else None)
+        cached = self._projection_cache.get(key)
+        if cached is not None:
+            self.polytopes, self._first_preview_id = cached
+        else:
+            dataframes = []
+            self._first_preview_id = None
+            if self._evolution_store is not None:
+                dataframes.append(self._evolution_store.to_dataframe(var_list, collapse=(len(var_list) >= 3)))
+            elif self._holds(self._orbit_generation):
+                dataframes.append(self.worker.call('projections', var_list=var_list, collapse=(len(var_list) >= 3)))
+            # the simulation is replaced by the evolution as soon as it's ready, unless it's explicitly overlaid
+            if self._holds(self._preview_generation) and (not self.has_evolution() or overlay_preview):
+                preview = self.worker.call('projections', var_list=var_list, source='preview')
+                if dataframes:
+                    preview['_loc'] = preview['_loc'] + ' (simulation)'
+                    preview['_polytope_id'] += dataframes[0]['_polytope_id'].max()
+                self._first_preview_id = preview['_polytope_id'].min() if not preview.empty else None
+                dataframes.append(preview)
+            self.polytopes = pd.concat(dataframes, ignore_index=True) if len(dataframes) > 1 else dataframes[0]
+            evicted = self._projection_cache.put(key, (self.polytopes, self._first_preview_id))
+            self._log_evictions(f'projections of ({", ".join(variables)})' for variables, *_ in evicted)
+        # built along with the polytopes, since it's only useful for the current plot
+        self.spatial_index = GridIndex(self.polytopes, *var_list) if len(var_list) == 2 else None
         return self.polytopes
+    
+    def projection_store(self, projections):
+        """
+        :param projections: the list of (x, y) projections needed
+        :return: the `ProjectionStore` of the evolution with (at least) the given projections, or None if there's no evolution
+        """
+        
+        from backend.projection_store import ProjectionStore
+        
+        if self._evolution_store is not None:
+            return self._evolution_store
+        if not self._holds(self._orbit_generation):
+            return None
+        return ProjectionStore(*(self.worker.call('store_table', projections=projections, table=table) for table in ('polytopes', 'vertices')))
+    
+    def extract_scatter_matrix(self, variables):
+        """
+        Extract the projections of every pair of the given variables (and of each of them over time) in a single pass over the orbit, see
+        `plot_scatter_matrix(*)`; the worker keeps them, so the trajectory plots of the same variables need no further pass.
+        
+        :param variables: the state variables of the matrix
+        :return: the `ProjectionStore`, or None if there's no evolution
+        """
+        
+        from backend.batch_export import all_projections
+        
+        self.matrix_variables = sorted(dict.fromkeys(var for var in variables if var != 't'))
+        self.matrix_store = self.projection_store(all_projections(self.matrix_variables))
+        return self.matrix_store
+    
+    def extract_envelopes(self, var, polytopes_df=None, max_points=500):
+        """
+        Compute the envelopes of a variable over time from the (t, var) polytopes, by default the last extracted ones (see `compute_envelopes(*)`).
+        """
+        
+        from backend.polygon_geometry import compute_envelopes
+        
+        self.envelopes = compute_envelopes(self.polytopes if polytopes_df is None else polytopes_df, var, max_points)
+        return self.envelopes
+    
+    def reduce_projections(self, polytopes_df, var_x, var_y, prune=False, tolerance_px=0, time_edges=None):
+        """
+        Reduce the 2D polytopes of the evolution before plotting them: drop the ones contained in others and simplify the rest, with a tolerance in
+        pixels of the plot. The simulation curves are kept as they are.
+        
+        :param time_edges: optional, the frames of a playback, only the polytopes appearing in the same frame are pruned
+        :return: the reduced dataframe and the reports of the pruning and of the simplification (see `prune_subsumed_polytopes(*)` and
+                 `simplify_polytopes(*)`), None when not performed
+        """
+        
+        import pandas as pd
+        from backend.polygon_geometry import prune_subsumed_polytopes, simplify_polytopes
+        
+        is_simulated = polytopes_df['_polytope_id'] >= self._first_preview_id if self._first_preview_id is not None \
+            else pd.Series(False, index=polytopes_df.index)
+        reduced_df = polytopes_df[~is_simulated]
+        prune_stats, simplify_stats = None, None
+        # the pruning is exact, so it's done on the original polytopes
+        if prune:
+            reduced_df, prune_stats = prune_subsumed_polytopes(reduced_df, var_x, var_y, time_edges=time_edges)
+        if tolerance_px:
+            # the scale is taken from the whole orbit, so that it doesn't change while moving the time slider
+            spans = [self.polytopes[var].max() - self.polytopes[var].min() for var in (var_x, var_y)]
+            screen_scale = tuple(span / size if span > 0 else 1.0 for span, size in zip(spans, self.plot_size_px))
+            reduced_df, simplify_stats = simplify_polytopes(reduced_df, var_x, var_y, tolerance_px, screen_scale=screen_scale)
+        if is_simulated.any():
+            reduced_df = pd.concat([reduced_df, polytopes_df[is_simulated]], ignore_index=True)
+        return reduced_df, prune_stats, simplify_stats
+    
+    def release_orbit(self):
+        """
+        Extract every projection, the bounding boxes and the activity of the orbit held by the worker, then let the worker free it: from then on
+        the evolution is served from the extracted tables, like the ones of a subdivided evolution.
+        
+        :return: True if the orbit was released
+        """
+        
+        from backend.batch_export import all_projections
+        
+        if not self._holds(self._orbit_generation) or self._orbit_released:
+            return False
+        activity = self.orbit_activity()
+        boxes = self.orbit_boxes()
+        store = self.projection_store(all_projections([var for var in self.all_variables_names if var != 't']))
+        self.worker.call('release_orbit')
+        self._evolution_store = store
+        # the final set is only needed by the property checks, which keep using the boxes extracted from the orbit
+        self._evolution_boxes = boxes[~boxes['_final']].assign(_provenance=None)
+        self._activity_source = self._orbit_boxes_source = (self._orbit_generation, id(store))
+        self._activity, self._orbit_boxes = activity, boxes
+        self._orbit_released = True
+        self._log_evictions(['orbit of the worker'])
+        return True
+    
+    def clear_evolution(self):
+        """
+        Forget the evolution, its preview and everything extracted from them, letting the worker free the orbits; the run configuration is kept, e.g.
+        for the reachability analysis and the tuning.
+        """
+        
+        held = self._holds(self._orbit_generation) or self._holds(self._preview_generation)
+        self.state = EvolutionState.MISSING
+        self.error = ''
+        self.partial_summary = ''
+        self._orbit_generation, self._preview_generation = None, None
+        self._evolution_store, self._evolution_boxes, self._subdivision_progress = None, None, None
+        self._activity, self._activity_source = None, None
+        self._orbit_boxes, self._orbit_boxes_source = None, None
+        self._orbit_released = False
+        self._projection_cache.clear()
+        self.polytopes, self.boxes, self.envelopes = None, None, None
+        self.spatial_index, self._first_preview_id = None, None
+        self.matrix_store = None
+        self._evolution_reported, self._preview_reported = True, True
+        if held:
+            self.worker.call('release_orbit', preview=True)
+    
+    def _log_evictions(self, descriptions):
+        self.evictions = (self.evictions + [f'{time.strftime("%H:%M:%S")} {description}' for description in descriptions])[-self.max_evictions_shown:]
+    
+    def memory_report(self, tracemalloc_limit=10):
+        """
+        Estimate the memory held by the artifacts of the session (see `estimate_size(*)`), both here and in the worker, along with the RSS of the
+        processes and, when tracing, the top allocation sites of this process (see `tracemalloc_report(*)`).
+        
+        :return: a dictionary of plain Python objects, see `format_memory_report(*)`
+        """
+        
+        from backend.memory_accounting import estimate_size, tracemalloc_report
+        from backend.resource_budgets import process_rss_mb
+        
+        artifacts = {
+            'polytopes': self.polytopes,
+            'bounding boxes': self.boxes,
+            'envelopes': self.envelopes,
+            'spatial index': self.spatial_index,
+            'scatter matrix store': self.matrix_store,
+            'evolution store': self._evolution_store,
+            'evolution boxes': self._evolution_boxes,
+            'orbit boxes': self._orbit_boxes,
+            'orbit activity': self._activity,
+            'product graph': self.product_graph
+        }
+        # the artifacts sharing data (e.g. the scatter matrix and the evolution stores) are counted once, in this order
+        seen = set()
+        sizes = [{'name': name, 'mb': estimate_size(value, seen) / 2 ** 20} for name, value in artifacts.items() if value is not None]
+        worker = None
+        if self.worker is not None:
+            try:
+                worker = dict(self.worker.call('memory_report', timeout=1), rss_mb=process_rss_mb(self.worker.pid))
+            except (WorkerCrashed, WorkerError, FutureTimeoutError):
+                # the futures time out with their own exception before Python 3.11
+                pass
+        if self._orbit_released:
+            orbit = 'released'
+        else:
+            orbit = 'held by the worker' if self._holds(self._orbit_generation) else 'none'
+        return {
+            'process': {'rss_mb': process_rss_mb(os.getpid())},
+            'artifacts': sizes,
+            'cache': {
+                'entries': len(self._projection_cache),
+                'mb': self._projection_cache.size_mb(),
+                'max_mb': self._projection_cache.max_mb
+            },
+            'orbit': orbit,
+            'worker': worker,
+            'tracemalloc': tracemalloc_report(tracemalloc_limit),
+            'evictions': list(self.evictions)
+        }
 
 
 # TODO add more conditions, not just BETWEEN and EQUAL_TO
-def _make_variable_selector(variable_name):
-    return \
-        html.Div([
-            html.H6(f'{variable_name.capitalize()}'),
-            html.Div([
-                core.Checklist(
-                    id={
-                        'type': 'config-init-variable-is_range',
-                        'index': variable_name
-                    },
-                    options=[{'label': 'Range', 'value': 'true'}],
-                    value=[],
-                    labelStyle={'display': 'inline-block'},
-                    style={'width': '15%', 'display': 'inline-block'}
-                ),
-                core.Checklist(
-                    id={
-                        'type': 'config-init-variable-include_lower',
-                        'index': variable_name
-                    },
-                    options=[{'label': '', 'value': 'true'}],
-                    value=[],
-                    labelStyle={'display': 'inline-block'},
-                    style={'width': '5%', 'text-align': 'center'}
-                ),
-                core.Input(
-                    id={
-                        'type': 'config-init-variable-lower',
-                        'index': variable_name
-                    },
-                    type='number',
-                    step=0.1,
-                    placeholder='Lower bound',
-                    style={'width': '37.5%'}
-                ),
-                core.Input(
-                    id={
-                        'type': 'config-init-variable-upper',
-                        'index': variable_name
-                    },
-                    type='number',
-                    step=0.1,
-                    placeholder='Upper bound',
-                    style={'width': '37.5%'}
-                ),
-                core.Checklist(
-                    id={
-                        'type': 'config-init-variable-include_upper',
-                        'index': variable_name
-                    },
-                    options=[{'label': '', 'value': 'true'}],
-                    value=[],
-                    labelStyle={'display': 'inline-block'},
-                    style={'width': '5%', 'text-align': 'center'}
-                )
-            ],
-                style={
-                    'margin-bottom': '1%',
-                    'display': 'flex',
-                    'flex-direction': 'row',
-                    'place-content': 'space-around',
-                    'justify-content': 'space-around',
-                    'align-content': 'center',
-                    'align-items': 'center'
-                }
-            )
-        ])
+def _make_conditions_table():
+    # a single table for all the variables, which only renders the visible rows; a value is a row without upper bound
+    return dash_table.DataTable(
+        id='config-init-table',
+        columns=[
+            {'name': 'Variable', 'id': 'variable', 'editable': False},
+            {'name': 'Value / lower bound', 'id': 'lower', 'type': 'numeric'},
+            {'name': 'Upper bound', 'id': 'upper', 'type': 'numeric'},
+            {'name': 'Bounds', 'id': 'bounds', 'presentation': 'dropdown'}
+        ],
+        data=[],
+        editable=True,
+        dropdown={'bounds': {'options': [{'label': kind, 'value': kind} for kind in BOUNDS], 'clearable': False}},
+        virtualization=True,
+        fixed_rows={'headers': True},
+        page_action='none',
+        style_table={'height': '300px', 'overflowY': 'auto', 'margin-bottom': '1%'},
+        style_cell={'text-align': 'left', 'min-width': '80px'}
+    )
+
+
+app_logic = None
+_system_error = None
+
 
+def load_system(system_spec=DEFAULT_SYSTEM, budgets=None, memory_budgets=None):
+    """
+    Build and analyze the hybrid system in background; meanwhile, the dashboard shows a loading page.
+    
+    :param system_spec: the system factory, in the `package.module:factory` format
+    :param budgets: optional, the server-wide resource budgets of the evolutions, overriding `DEFAULT_BUDGETS`
+    :param memory_budgets: optional, the memory budgets of the session, overriding `DEFAULT_MEMORY_BUDGETS`
+    :return: the loading thread
+    """
+    
+    def load():
+        global app_logic, _system_error
+        try:
+            print(f'Loading system {system_spec}...')
+            started = time.perf_counter()
+            # the worker imports the system and analyzes it, so that pyariadne is never loaded here
+            worker = start_worker(system_spec)
+            app_logic = AppLogic(worker.call('analysis'), system_spec, worker, budgets, memory_budgets)
+            print(f'System loaded in {time.perf_counter() - started:.2f}s')
+        except Exception as ex:
+            _system_error = f'{ex}'
+            print(f'Error loading system {system_spec}: {ex}')
+    
+    loader = Thread(target=load, daemon=True)
+    loader.start()
+    return loader
 
-app_logic = AppLogic(tutorial_system.get_system())
 
 # build dashboard
 app = dash.Dash(__name__,
@@ -180,263 +820,703 @@ app = dash.Dash(__name__,
                 ],
                 meta_tags=[
                     {"name": "viewport", "content": "width=device-width, initial-scale=1"}
-                ])
-app.layout = html.Div([
-    html.H1('Ariadne Dashboard'),
-    html.Div([
+                ],
+                suppress_callback_exceptions=True)
+
+
+def _make_loading_layout():
+    return [
+        html.H1('Ariadne Dashboard'),
+        html.H5(
+            'Loading system...' if _system_error is None else 'Error loading system!',
+            id='system-loading-state',
+            style={'text-align': 'center', 'text-transform': 'uppercase'}
+        ),
+        html.Plaintext(
+            '' if _system_error is None else _system_error,
+            style={'text-align': 'center', 'font-family': 'monospace'}
+        ),
+        core.Interval(
+            id='system-loading-interval',
+            interval=500,
+            disabled=_system_error is not None
+        )
+    ]
+
+
+def _make_dashboard_layout():
+    return [
+        html.H1('Ariadne Dashboard'),
         html.Div([
-            html.H4('Automaton Viewer'),
             html.Div([
-                html.H6('Automaton selector'),
+                html.H4('Automaton Viewer'),
+                html.Div([
+                    html.H6('Automaton selector'),
+                    core.Loading(
+                        id="loading-system",
+                        type="default",
+                        fullscreen=True,
+                        children=[
+                            html.Div([
+                                core.ConfirmDialog(
+                                    id='system-import-not-implemented',
+                                    message='This feature is currently not implemented',
+                                ),
+                                html.Div([
+                                    html.Button('Import hybrid system', id='system-import', n_clicks=0)
+                                ],
+                                    style={
+                                        'margin-bottom': '1%',
+                                        'display': 'flex',
+                                        'flex-direction': 'row',
+                                        'place-content': 'center space-around',
+                                        'align-items': 'center'
+                                    }
+                                )
+                            ])
+                        ]
+                    ),
+                    core.Loading(
+                        id="loading-automaton-plot",
+                        type="default",
+                        children=[
+                            core.Dropdown(
+                                id='automaton-selector',
+                                options=[{'label': automaton_name, 'value': automaton_name} for automaton_name in
+                                         sorted(app_logic.automatons_analysis.keys())] +
+                                        ([{'label': 'Product of all the automata', 'value': PRODUCT_GRAPH}]
+                                         if len(app_logic.automatons_analysis) > 1 else [])
+                            ),
+                            html.Div(
+                                id='automaton-plot',
+                                children=[]
+                            )
+                        ]
+                    ),
+                    core.Checklist(
+                        id='automaton-activity-selector',
+                        options=[{'label': 'Show the activity of the evolution', 'value': 'show'}],
+                        value=[]
+                    ),
+                    html.Div([
+                        html.Plaintext(
+                            id='automaton-plot-info-node',
+                            children=[]
+                        )
+                    ]),
+                    html.Div([
+                        html.Plaintext(
+                            id='automaton-plot-info-edge',
+                            children=[]
+                        )
+                    ])
+                ])
+            ],
+                style={'width': '29%', 'display': 'inline-block'}
+            ),
+            html.Div([
+                html.H4('Evolver Configurator'),
                 core.Loading(
-                    id="loading-system",
+                    id='loading-evolution',
                     type="default",
-                    fullscreen=True,
                     children=[
+                        html.H6('Initial Location'),
+                        # initial locations
                         html.Div([
-                            core.ConfirmDialog(
-                                id='system-import-not-implemented',
-                                message='This feature is currently not implemented',
+                            core.Dropdown(
+                                id={
+                                    'type': 'config-init-location',
+                                    'index': automaton_name
+                                },
+                                placeholder=f'Choose \"{automaton_name}\" automaton initial location',
+                                options=[{'label': f'{automaton_name}|{location}', 'value': location}
+                                         for location in sorted(app_logic.automatons_analysis[automaton_name]['locations'])],
+                                style={'margin-bottom': '1%'}
+                            )
+                            for automaton_name in app_logic.configurable_automatons
+                        ]),
+                        # initial conditions in the selected locations, which can be imported from a file
+                        html.Div([
+                            html.H6('Initial Conditions'),
+                            core.Upload(
+                                html.Button('Import CSV/JSON'),
+                                id='config-init-upload',
+                                accept='.csv,.json'
+                            )
+                        ],
+                            style={
+                                'display': 'flex',
+                                'flex-direction': 'row',
+                                'justify-content': 'space-between',
+                                'align-items': 'center'
+                            }
+                        ),
+                        _make_conditions_table(),
+                        html.Plaintext(
+                            '',
+                            id='config-init-info',
+                            style={'font-family': 'monospace'}
+                        ),
+                        # termination conditions
+                        html.Div([
+                            html.Div([
+                                html.H6('Final Time'),
+                                core.Input(
+                                    id='config-final-time',
+                                    type='number',
+                                    min=0.0,
+                                    step=0.1,
+                                    placeholder='in seconds',
+                                    style={'width': '100%'}
+                                )
+                            ],
+                                style={'width': '32%', 'display': 'inline-block'}
+                            ),
+                            html.Div([
+                                html.H6('Max Transitions'),
+                                core.Input(
+                                    id='config-max-transitions',
+                                    type='number',
+                                    min=0,
+                                    step=1,
+                                    placeholder='set number',
+                                    style={'width': '100%'}
+                                )
+                            ],
+                                style={'width': '32%', 'display': 'inline-block'}
+                            ),
+                            html.Div([
+                                html.H6('Parallel Sub-boxes'),
+                                core.Input(
+                                    id='config-subdivisions',
+                                    type='number',
+                                    min=1,
+                                    step=1,
+                                    value=1,
+                                    style={'width': '100%'}
+                                )
+                            ],
+                                style={'width': '32%', 'display': 'inline-block'}
                             ),
+                        ],
+                            style={'display': 'flex', 'justify-content': 'space-between', 'margin-bottom': '1%'}
+                        ),
+                        # resource budgets, empty for unlimited
+                        html.Div([
                             html.Div([
-                                html.Button('Import hybrid system', id='system-import', n_clicks=0)
+                                html.H6(title),
+                                core.Input(
+                                    id=f'config-budget-{budget}',
+                                    type='number',
+                                    min=0,
+                                    value=app_logic.default_budgets[budget],
+                                    placeholder='unlimited',
+                                    style={'width': '100%'}
+                                )
                             ],
-                                style={
-                                    'margin-bottom': '1%',
-                                    'display': 'flex',
-                                    'flex-direction': 'row',
-                                    'place-content': 'center space-around',
-                                    'align-items': 'center'
-                                }
+                                style={'width': '32%', 'display': 'inline-block'}
                             )
-                        ])
-                    ]
-                ),
-                core.Loading(
-                    id="loading-automaton-plot",
-                    type="default",
-                    children=[
-                        core.Dropdown(
-                            id='automaton-selector',
-                            options=[{'label': automaton_name, 'value': automaton_name} for automaton_name in
-                                     sorted(app_logic.automatons_analysis.keys())]
+                            for budget, title in [('wall_seconds', 'Time Budget (s)'), ('max_rss_mb', 'Memory Budget (MB)'),
+                                                  ('max_enclosures', 'Max Enclosures')]
+                        ],
+                            style={'display': 'flex', 'justify-content': 'space-between', 'margin-bottom': '1%'}
                         ),
-                        html.Div(
-                            id='automaton-plot',
-                            children=[]
+                        # run/clean evolution buttons
+                        html.Div([
+                            html.Button('Run evolution', id='run-evolution', n_clicks=0),
+                            html.Button('Clear evolution', id='clear-evolution', n_clicks=0)
+                        ],
+                            style={
+                                'margin-bottom': '1%',
+                                'display': 'flex',
+                                'flex-direction': 'row',
+                                'place-content': 'space-around',
+                                'justify-content': 'space-around',
+                                'align-content': 'center',
+                                'align-items': 'center'
+                            }
                         )
                     ]
                 ),
+                # info/error log
                 html.Div([
+                    html.H5(
+                        '',
+                        id='run-state',
+                        style={
+                            'text-align': 'center',
+                            'text-transform': 'uppercase'
+                        }
+                    ),
                     html.Plaintext(
-                        id='automaton-plot-info-node',
-                        children=[]
-                    )
-                ]),
-                html.Div([
+                        '',
+                        id='run-error',
+                        style={
+                            'font-family': 'monospace',
+                            'padding-left': '10pt',
+                            'padding-right': '10pt'
+                        }
+                    ),
                     html.Plaintext(
-                        id='automaton-plot-info-edge',
-                        children=[]
+                        '',
+                        id='run-telemetry',
+                        style={
+                            'font-family': 'monospace',
+                            'padding-left': '10pt',
+                            'padding-right': '10pt'
+                        }
+                    ),
+                    # the evolution runs in background, so its progress is polled every second
+                    core.Interval(
+                        id='run-telemetry-interval',
+                        interval=1000
                     )
-                ])
-            ])
-        ],
-            style={'width': '29%', 'display': 'inline-block'}
-        ),
-        html.Div([
-            html.H4('Evolver Configurator'),
-            core.Loading(
-                id='loading-evolution',
-                type="default",
+                ],
+                    style={
+                        'background-color': '#eeeeee',
+                        'border-radius': '10pt',
+                        'margin-top': '2%'
+                    }
+                )
+            ],
+                style={'width': '19%', 'display': 'inline-block'}
+            ),
+            html.Div(
+                id='trajectory-plotter',
+                className='unavailable',
                 children=[
-                    html.H6('Initial Location'),
-                    # initial locations
-                    html.Div([
-                        core.Dropdown(
-                            id={
-                                'type': 'config-init-location',
-                                'index': automaton_name
-                            },
-                            placeholder=f'Choose \"{automaton_name}\" automaton initial location',
-                            options=[{'label': f'{automaton_name}|{location}', 'value': location}
-                                     for location in sorted(app_logic.automatons_analysis[automaton_name]['locations'])],
-                            style={'margin-bottom': '1%'}
-                        )
-                        for automaton_name in app_logic.configurable_automatons
-                    ]),
-                    # initial conditions in the selected locations
-                    html.Div(
-                        id='config-init-variables',
-                        children=[]
-                    ),
-                    # termination conditions
+                    html.H4('Trajectory Plotter'),
                     html.Div([
+                        # axes selection
                         html.Div([
-                            html.H6('Final Time'),
-                            core.Input(
-                                id='config-final-time',
-                                type='number',
-                                min=0.0,
-                                step=0.1,
-                                placeholder='in seconds',
-                                style={'width': '100%'}
+                            html.Div([
+                                html.H6('X axis'),
+                                core.Dropdown(
+                                    id='x-variable',
+                                    options=[]
+                                )
+                            ],
+                                style={'width': '29%', 'display': 'inline-block'}
+                            ),
+                            html.Div([
+                                html.H6('Y axis'),
+                                core.Dropdown(
+                                    id='y-variable',
+                                    options=[]
+                                )
+                            ],
+                                style={'width': '29%', 'display': 'inline-block'}
+                            ),
+                            html.Div([
+                                html.H6('Z axis'),
+                                core.Dropdown(
+                                    id='z-variable',
+                                    options=[]
+                                )
+                            ],
+                                style={'width': '29%', 'display': 'inline-block'}
+                            ),
+                            core.Checklist(
+                                id='use_mesh-selector',
+                                options=[{'label': '3D Mesh', 'value': 'true'}],
+                                value=[],
+                                labelStyle={'display': 'inline-block'},
+                                style={'width': '10%', 'text-align': 'center'}
                             )
                         ],
-                            style={'width': '49%', 'display': 'inline-block'}
+                            style={
+                                'display': 'flex',
+                                'flex-direction': 'row',
+                                'place-content': 'center space-around',
+                                'align-items': 'flex-end'
+                            }
                         ),
+                        # time selection
                         html.Div([
-                            html.H6('Max Transitions'),
-                            core.Input(
-                                id='config-max-transitions',
-                                type='number',
+                            html.H6('Time'),
+                            core.RangeSlider(
+                                id='time-slider',
                                 min=0,
-                                step=1,
-                                placeholder='set number',
-                                style={'width': '100%'}
+                                max=0,
+                                value=[0, 0],
+                                marks={},
+                                tooltip={
+                                    'always_visible': True,
+                                    'placement': 'bottom'
+                                },
+                                step=0,
+                                dots=False,
+                                allowCross=False
                             )
+                        ]),
+                        # display options
+                        html.Div([
+                            core.RadioItems(
+                                id='render-mode-selector',
+                                options=[
+                                    {'label': 'Polytopes', 'value': 'polytopes'},
+                                    {'label': 'Bounding boxes', 'value': 'boxes'},
+                                    {'label': 'Error bars', 'value': 'error_bars'},
+                                    {'label': 'Envelope (t, var)', 'value': 'envelope'}
+                                ],
+                                value='polytopes',
+                                labelStyle={'display': 'inline-block'}
+                            ),
+                            core.Checklist(
+                                id='overlay-preview-selector',
+                                options=[{'label': 'Overlay simulation', 'value': 'true'}],
+                                value=[],
+                                labelStyle={'display': 'inline-block'}
+                            ),
+                            core.Checklist(
+                                id='playback-selector',
+                                options=[{'label': 'Playback', 'value': 'true'}],
+                                value=[],
+                                labelStyle={'display': 'inline-block'}
+                            ),
+                            core.Checklist(
+                                id='prune-subsumed-selector',
+                                options=[{'label': 'Prune subsumed polytopes', 'value': 'true'}],
+                                value=[],
+                                labelStyle={'display': 'inline-block'}
+                            ),
+                            html.Div([
+                                html.Label('Simplify (px)', htmlFor='simplify-tolerance'),
+                                core.Input(
+                                    id='simplify-tolerance',
+                                    type='number',
+                                    min=0,
+                                    step=0.5,
+                                    value=0,
+                                    debounce=True,
+                                    style={'width': '60px', 'margin-left': '5px'}
+                                ),
+                                html.Span(id='polytopes-info', style={'margin-left': '5px'})
+                            ])
                         ],
-                            style={'width': '49%', 'display': 'inline-block'}
-                        ),
-                    ],
-                        style={'display': 'flex', 'justify-content': 'space-between', 'margin-bottom': '1%'}
-                    ),
-                    # run/clean evolution buttons
-                    html.Div([
-                        html.Button('Run evolution', id='run-evolution', n_clicks=0),
-                        html.Button('Clear evolution', id='clear-evolution', n_clicks=0)
-                    ],
-                        style={
-                            'margin-bottom': '1%',
-                            'display': 'flex',
-                            'flex-direction': 'row',
-                            'place-content': 'space-around',
-                            'justify-content': 'space-around',
-                            'align-content': 'center',
-                            'align-items': 'center'
-                        }
-                    ),
-                    # info/error log
-                    html.Div([
-                        html.H5(
-                            '',
-                            id='run-state',
                             style={
-                                'text-align': 'center',
-                                'text-transform': 'uppercase'
+                                'margin-top': '2%',
+                                'display': 'flex',
+                                'flex-direction': 'row',
+                                'place-content': 'center space-around',
+                                'align-items': 'center'
                             }
+                        )
+                    ]),
+                    html.Div([
+                        core.Loading(
+                            id="loading-graph",
+                            type="default",
+                            children=[
+                                core.Graph(
+                                    id='trajectory-graph',
+                                    figure={'data': [], 'layout': {}}
+                                )
+                            ],
+                            parent_style={'width': '75%'}
                         ),
-                        html.Plaintext(
-                            '',
-                            id='run-error',
-                            style={
-                                'font-family': 'monospace',
-                                'padding-left': '10pt',
-                                'padding-right': '10pt'
-                            }
+                        # the enclosures under the clicked point or the selected box
+                        html.Div([
+                            html.H6('Inspector'),
+                            html.Pre(
+                                'Click a polytope or select a box',
+                                id='inspector-info',
+                                style={'font-size': 'smaller', 'max-height': '450px', 'overflow-y': 'auto', 'white-space': 'pre-wrap'}
+                            )
+                        ],
+                            style={'width': '25%'}
                         )
                     ],
-                        style={
-                            'background-color': '#eeeeee',
-                            'border-radius': '10pt',
-                            'margin-top': '2%'
-                        }
+                        style={'display': 'flex', 'flex-direction': 'row'}
                     )
-                ]
+                ],
+                style={'width': '49%', 'display': 'inline-block'}
             )
         ],
-            style={'width': '19%', 'display': 'inline-block'}
+            style={
+                'display': 'flex',
+                'flex-direction': 'row',
+                'place-content': 'center space-around',
+                'align-items': 'stretch'
+            }
         ),
         html.Div(
-            id='trajectory-plotter',
-            className='unavailable',
+            id='reach-plotter',
             children=[
-                html.H4('Trajectory Plotter'),
+                html.H4('Reachability Analyser'),
                 html.Div([
-                    # axes selection
                     html.Div([
-                        html.Div([
-                            html.H6('X axis'),
-                            core.Dropdown(
-                                id='x-variable',
-                                options=[]
-                            )
-                        ],
-                            style={'width': '29%', 'display': 'inline-block'}
-                        ),
-                        html.Div([
-                            html.H6('Y axis'),
-                            core.Dropdown(
-                                id='y-variable',
-                                options=[]
-                            )
-                        ],
-                            style={'width': '29%', 'display': 'inline-block'}
-                        ),
-                        html.Div([
-                            html.H6('Z axis'),
-                            core.Dropdown(
-                                id='z-variable',
-                                options=[]
-                            )
-                        ],
-                            style={'width': '29%', 'display': 'inline-block'}
-                        ),
-                        core.Checklist(
-                            id='use_mesh-selector',
-                            options=[{'label': '3D Mesh', 'value': 'true'}],
-                            value=[],
-                            labelStyle={'display': 'inline-block'},
-                            style={'width': '10%', 'text-align': 'center'}
+                        html.H6('X axis'),
+                        core.Dropdown(
+                            id='reach-x-variable',
+                            options=[{'label': i, 'value': i} for i in sorted(app_logic.all_variables_names) if i != 't']
                         )
                     ],
-                        style={
-                            'display': 'flex',
-                            'flex-direction': 'row',
-                            'place-content': 'center space-around',
-                            'align-items': 'flex-end'
-                        }
+                        style={'width': '24%', 'display': 'inline-block'}
                     ),
-                    # time selection
                     html.Div([
-                        html.H6('Time'),
-                        core.RangeSlider(
-                            id='time-slider',
-                            min=0,
-                            max=0,
-                            value=[0, 0],
-                            marks={},
-                            tooltip={
-                                'always_visible': True,
-                                'placement': 'bottom'
-                            },
-                            step=0,
-                            dots=False,
-                            allowCross=False
+                        html.H6('Y axis'),
+                        core.Dropdown(
+                            id='reach-y-variable',
+                            options=[{'label': i, 'value': i} for i in sorted(app_logic.all_variables_names) if i != 't']
                         )
-                    ]),
+                    ],
+                        style={'width': '24%', 'display': 'inline-block'}
+                    ),
+                    core.RadioItems(
+                        id='reach-kind',
+                        options=[
+                            {'label': 'Upper reach', 'value': 'upper_reach'},
+                            {'label': 'Outer chain reach', 'value': 'outer_chain_reach'}
+                        ],
+                        value='upper_reach',
+                        labelStyle={'display': 'inline-block'},
+                        style={'width': '24%'}
+                    ),
+                    html.Button('Run reachability', id='run-reach', n_clicks=0)
+                ],
+                    style={
+                        'display': 'flex',
+                        'flex-direction': 'row',
+                        'place-content': 'center space-around',
+                        'align-items': 'flex-end'
+                    }
+                ),
+                html.H5(
+                    '',
+                    id='reach-state',
+                    style={
+                        'text-align': 'center',
+                        'text-transform': 'uppercase'
+                    }
+                ),
+                core.Loading(
+                    id='loading-reach-graph',
+                    type='default',
+                    children=[
+                        core.Graph(
+                            id='reach-graph',
+                            figure={'data': [], 'layout': {}}
+                        )
+                    ]
+                )
+            ],
+            style={'width': '49%', 'margin-left': 'auto', 'margin-right': '1%'}
+        ),
+        html.Div(
+            id='evolver-tuner',
+            children=[
+                html.H4('Evolver Tuner'),
+                html.Pre(id='evolver-settings'),
+                html.Div([
+                    html.Button('Tune evolver', id='run-tuning', n_clicks=0),
+                    html.Button('Apply recommendation', id='apply-tuning', n_clicks=0)
+                ],
+                    style={
+                        'display': 'flex',
+                        'flex-direction': 'row',
+                        'place-content': 'center space-around',
+                        'align-items': 'flex-end'
+                    }
+                ),
+                html.H5(
+                    '',
+                    id='tuning-state',
+                    style={
+                        'text-align': 'center',
+                        'text-transform': 'uppercase'
+                    }
+                ),
+                html.Pre(id='tuning-results')
+            ],
+            style={'width': '49%', 'margin-left': 'auto', 'margin-right': '1%'}
+        ),
+        html.Div(
+            id='scatter-matrix',
+            children=[
+                html.H4('Scatter Matrix'),
+                html.Div([
+                    html.Div([
+                        html.H6('Variables'),
+                        core.Dropdown(
+                            id='matrix-variables',
+                            options=[{'label': i, 'value': i} for i in sorted(app_logic.all_variables_names) if i != 't'],
+                            value=[i for i in sorted(app_logic.all_variables_names) if i != 't'],
+                            multi=True
+                        )
+                    ],
+                        style={'width': '74%', 'display': 'inline-block'}
+                    ),
+                    html.Button('Show all the pairs', id='show-scatter-matrix', n_clicks=0)
+                ],
+                    style={
+                        'display': 'flex',
+                        'flex-direction': 'row',
+                        'place-content': 'center space-around',
+                        'align-items': 'flex-end'
+                    }
+                ),
+                # a single time window for all the cells
+                html.Div([
+                    html.H6('Time'),
+                    core.RangeSlider(
+                        id='matrix-time-slider',
+                        min=0,
+                        max=0,
+                        value=[0, 0],
+                        marks={},
+                        tooltip={
+                            'always_visible': True,
+                            'placement': 'bottom'
+                        },
+                        step=0,
+                        dots=False,
+                        allowCross=False
+                    )
                 ]),
+                html.H5(
+                    '',
+                    id='matrix-state',
+                    style={
+                        'text-align': 'center',
+                        'text-transform': 'uppercase'
+                    }
+                ),
                 core.Loading(
-                    id="loading-graph",
-                    type="default",
+                    id='loading-matrix-graph',
+                    type='default',
                     children=[
                         core.Graph(
-                            id='trajectory-graph',
-                            figure=px.line()
+                            id='scatter-matrix-graph',
+                            figure={'data': [], 'layout': {}}
                         )
                     ]
                 )
             ],
-            style={'width': '49%', 'display': 'inline-block'}
+            style={'width': '98%', 'margin-left': '1%', 'margin-right': '1%'}
+        ),
+        html.Div(
+            id='property-checker',
+            children=[
+                html.H4('Property Checker'),
+                # see `check_properties()` for the format
+                core.Textarea(
+                    id='property-specs',
+                    value=DEFAULT_PROPERTIES,
+                    style={'width': '100%', 'height': '150px', 'font-family': 'monospace'}
+                ),
+                html.Div([
+                    html.Button('Check properties', id='run-property-check', n_clicks=0)
+                ],
+                    style={
+                        'display': 'flex',
+                        'flex-direction': 'row',
+                        'place-content': 'center space-around',
+                        'align-items': 'flex-end'
+                    }
+                ),
+                html.Pre(id='property-results')
+            ],
+            style={'width': '49%', 'margin-left': 'auto', 'margin-right': '1%'}
+        ),
+        # a debug panel, collapsed by default; the same report is served as JSON by /api/metrics/memory
+        html.Details(
+            id='memory-panel',
+            children=[
+                html.Summary('Memory'),
+                html.Button('Refresh', id='refresh-memory', n_clicks=0),
+                html.Pre(id='memory-report')
+            ],
+            style={'width': '98%', 'margin-left': '1%', 'margin-right': '1%'}
         )
-    ],
-        style={
-            'display': 'flex',
-            'flex-direction': 'row',
-            'place-content': 'center space-around',
-            'align-items': 'stretch'
-        }
+    ]
+
+
+def _serve_layout():
+    return html.Div(
+        id='dashboard-root',
+        children=_make_loading_layout() if app_logic is None else _make_dashboard_layout()
     )
-])
+
+
+app.layout = _serve_layout
+
+
+@app.server.after_request
+def _measure_first_response(response):
+    global _import_time
+    if _import_time is not None:
+        elapsed = time.perf_counter() - _import_time
+        _import_time = None
+        print(f'First response after {elapsed:.2f}s (target {FIRST_RESPONSE_TARGET:.2f}s)' +
+              ('' if elapsed <= FIRST_RESPONSE_TARGET else ', TARGET MISSED'))
+    return response
+
+
+@app.server.route('/api/geometry/<table>.arrow')
+def export_geometry(table):
+    """
+    Stream a table of the geometry of the current evolution in the Arrow IPC streaming format, e.g. to read it in a notebook with
+    `pyarrow.ipc.open_stream(urlopen(url)).read_pandas()`.
+    
+    The query parameters select the variables (`vars=x,y` for the (x, y) projection, `vars=t,x,y` for the (t, var) projections, by default all of
+    them) and the time window (`t_min`, `t_max`).
+    """
+    
+    from flask import Response, request
+    from backend.arrow_export import ARROW_STREAM_MIMETYPE, GEOMETRY_TABLES, arrow_stream, requested_projections, select_geometry
+    
+    # the geometry of the session is only shared with the local machine
+    if request.remote_addr not in ('127.0.0.1', '::1'):
+        return Response('Only available to local clients\n', status=403, mimetype='text/plain')
+    if table not in GEOMETRY_TABLES:
+        return Response(f'Unknown table {table}, expected one of {", ".join(GEOMETRY_TABLES)}\n', status=404, mimetype='text/plain')
+    if app_logic is None or app_logic.state != EvolutionState.DONE:
+        return Response('No evolution available\n', status=404, mimetype='text/plain')
+    
+    variables = request.args.get('vars', '').split(',') if request.args.get('vars') else ['t'] + app_logic.all_variables_names
+    unknown = [var for var in variables if var != 't' and var not in app_logic.all_variables_names]
+    if unknown:
+        return Response(f'Unknown variables {", ".join(unknown)}\n', status=400, mimetype='text/plain')
+    try:
+        time_window = tuple(request.args.get(bound, type=float) for bound in ('t_min', 't_max'))
+        projections = requested_projections(variables)
+        store = app_logic.projection_store(projections)
+        if store is None:
+            return Response('No evolution available\n', status=404, mimetype='text/plain')
+        polytopes, vertices = select_geometry(store, projections, time_window)
+        return Response(arrow_stream(polytopes if table == 'polytopes' else vertices), mimetype=ARROW_STREAM_MIMETYPE)
+    except ImportError:
+        return Response('The Arrow export requires pyarrow\n', status=501, mimetype='text/plain')
+    except (WorkerCrashed, WorkerError) as ex:
+        return Response(f'{ex}'.splitlines()[0] + '\n', status=500, mimetype='text/plain')
+
+
+@app.server.route('/api/metrics/memory')
+def export_memory_metrics():
+    """
+    Serve the memory report of the session as JSON (see `AppLogic.memory_report()`), e.g. to watch a long session from a script.
+    """
+    
+    from flask import Response, jsonify, request
+    
+    # like the geometry, the allocation sites are only shared with the local machine
+    if request.remote_addr not in ('127.0.0.1', '::1'):
+        return Response('Only available to local clients\n', status=403, mimetype='text/plain')
+    if app_logic is None:
+        return Response('No system loaded\n', status=404, mimetype='text/plain')
+    return jsonify(app_logic.memory_report())
+
+
+@app.callback(
+    Output('dashboard-root', 'children'),
+    Input('system-loading-interval', 'n_intervals'),
+    prevent_initial_call=True
+)
+def wait_system_loading(_):
+    if app_logic is None and _system_error is None:
+        raise dash.exceptions.PreventUpdate
+    return _make_loading_layout() if app_logic is None else _make_dashboard_layout()
 
 
 @app.callback(
@@ -449,10 +1529,16 @@ def import_system(_):
 
 
 @app.callback(
-    Output('config-init-variables', 'children'),
-    Input({'type': 'config-init-location', 'index': ALL}, 'value')
+    Output('config-init-table', 'data'),
+    Output('config-init-info', 'children'),
+    Input({'type': 'config-init-location', 'index': ALL}, 'value'),
+    Input('config-init-upload', 'contents'),
+    State('config-init-upload', 'filename'),
+    State('config-init-table', 'data')
 )
-def update_variable_selectors(locations):
+def update_initial_conditions(locations, contents, filename, rows):
+    from backend.initial_conditions import condition_rows, merge_conditions, parse_conditions
+    
     variables = \
         [
             # multi-locations automatons
@@ -466,114 +1552,124 @@ def update_variable_selectors(locations):
             for var in automaton_locations['--']
         ]
     app_logic.current_variables = sorted(list(set(variables)))
-    return [_make_variable_selector(variable_name) for variable_name in app_logic.current_variables]
-
-
-@app.callback(
-    Output({'type': 'config-init-variable-lower', 'index': MATCH}, 'placeholder'),
-    Output({'type': 'config-init-variable-upper', 'index': MATCH}, 'className'),
-    Output({'type': 'config-init-variable-include_lower', 'index': MATCH}, 'className'),
-    Output({'type': 'config-init-variable-include_upper', 'index': MATCH}, 'className'),
-    Input({'type': 'config-init-variable-is_range', 'index': MATCH}, 'value')
-)
-def update_variable_initializer(is_range):
-    if not is_range:
-        return 'Value', 'disabled', 'disabled', 'disabled'
-    return 'Lower bound', '', '', ''
+    # the values already entered are kept when changing the locations
+    rows = condition_rows(app_logic.current_variables, rows)
+    
+    triggered = [trigger['prop_id'] for trigger in dash.callback_context.triggered]
+    if 'config-init-upload.contents' not in triggered or contents is None:
+        return rows, ''
+    try:
+        rows, unknown = merge_conditions(rows, parse_conditions(contents, filename))
+    except (ValueError, KeyError, TypeError) as ex:
+        return rows, f'Cannot import {filename}: {ex}'
+    info = f'Imported {filename}'
+    if unknown:
+        info += f', ignoring the variables not in the selected locations: {", ".join(unknown)}'
+    return rows, info
 
 
 @app.callback(
     Output('run-state', 'children'),
     Output('run-error', 'children'),
+    Output('run-telemetry', 'children'),
     Input('run-evolution', 'n_clicks'),
     Input('clear-evolution', 'n_clicks'),
+    Input('run-telemetry-interval', 'n_intervals'),
     State('config-final-time', 'value'),
     State('config-max-transitions', 'value'),
+    State('config-subdivisions', 'value'),
+    State('config-budget-wall_seconds', 'value'),
+    State('config-budget-max_rss_mb', 'value'),
+    State('config-budget-max_enclosures', 'value'),
     State({'type': 'config-init-location', 'index': ALL}, 'value'),
-    State({'type': 'config-init-variable-is_range', 'index': ALL}, 'value'),
-    State({'type': 'config-init-variable-lower', 'index': ALL}, 'value'),
-    State({'type': 'config-init-variable-upper', 'index': ALL}, 'value'),
-    State({'type': 'config-init-variable-include_lower', 'index': ALL}, 'value'),
-    State({'type': 'config-init-variable-include_upper', 'index': ALL}, 'value')
+    State('config-init-table', 'data')
 )
-def run_system_evolution(_, __, final_time, max_transitions, locations, are_range, lower_bounds, upper_bounds, include_lowers, include_uppers):
+def run_system_evolution(_, __, ___, final_time, max_transitions, subdivisions, wall_seconds, max_rss_mb, max_enclosures, locations, conditions):
+    from backend.initial_conditions import validate_conditions
+    
     if not dash.callback_context.triggered:
-        print("WIP: reload last orbit as YAML")
+        # a new page shows the evolution still held by the server (in the worker or in the projection store), if any
+        if app_logic.state == EvolutionState.EVOLVING:
+            return 'Evolving...', '', app_logic.telemetry_summary()
+        if app_logic.has_trajectories() and app_logic.state in _STATE_MESSAGES:
+            return _STATE_MESSAGES[app_logic.state], app_logic.error, app_logic.telemetry_summary()
         app_logic.state = EvolutionState.MISSING
-        return 'Run the evolution to enable the trajectory plotter', ''
+        return 'Run the evolution to enable the trajectory plotter', '', ''
     
-    if dash.callback_context.triggered[0]['prop_id'].split('.')[0] == 'clear-evolution':
-        print("WIP: clear saved orbit")
-        app_logic.state = EvolutionState.MISSING
-        return 'Not implemented yet!', ''
+    trigger = dash.callback_context.triggered[0]['prop_id'].split('.')[0]
+    if trigger == 'run-telemetry-interval':
+        return _poll_system_evolution()
+    
+    if app_logic.state == EvolutionState.EVOLVING:
+        return dash.no_update, 'Wait for the running evolution to finish', dash.no_update
+    
+    if trigger == 'clear-evolution':
+        try:
+            app_logic.clear_evolution()
+        except (WorkerCrashed, WorkerError) as ex:
+            # the evolution is forgotten anyway, the worker frees it when restarted
+            print(f'Cannot release the orbit ({ex})')
+        return 'Run the evolution to enable the trajectory plotter', '', ''
     
     if final_time is None:
-        return 'Missing parameters', 'Specify a valid final time'
+        return 'Missing parameters', 'Specify a valid final time', ''
     if max_transitions is None:
-        return 'Missing parameters', 'Specify a maximum number of transitions'
+        return 'Missing parameters', 'Specify a maximum number of transitions', ''
     for automaton_name, automaton_location in zip(app_logic.configurable_automatons, locations):
         if automaton_location is None:
-            return 'Missing parameters', f'Specify initial location for automaton \"{automaton_name}\"'
-    for variable_name, r, l, u in zip(app_logic.current_variables, are_range, lower_bounds, upper_bounds):
-        if r:
-            if l is None:
-                return 'Missing parameters', f'Specify lower bound for variable \"{variable_name}\"'
-            if u is None:
-                return 'Missing parameters', f'Specify upper bound for variable \"{variable_name}\"'
-        else:
-            if l is None:
-                return 'Missing parameters', f'Specify value for variable \"{variable_name}\"'
+            return 'Missing parameters', f'Specify initial location for automaton \"{automaton_name}\"', ''
+    # every row is checked at once, so that all the problems are reported together
+    values, strict_bounds, errors = validate_conditions(conditions)
+    if errors:
+        return 'Missing parameters', '\n'.join(errors), ''
     
     try:
-        initial_location = {
-            ari.StringVariable(automaton_name): ari.String(automaton_location)
-            for automaton_name, automaton_location in zip(app_logic.configurable_automatons, locations)
+        # points of the initial set to simulate for the preview
+        preview_points = sample_box_points({
+            variable_name: value if isinstance(value, tuple) else (value, value)
+            for variable_name, value in values.items()
+        }, app_logic.preview_samples, strict_bounds=strict_bounds)
+        # the initial set is built by the worker from these plain values
+        app_logic.run_spec = {
+            'locations': dict(zip(app_logic.configurable_automatons, locations)),
+            'values': values,
+            'final_time': float(final_time),
+            'max_transitions': int(max_transitions),
+            # FIXME GERETTI: strict bounds break Ariadne, so they are only used when explicitly chosen
+            'strict_bounds': strict_bounds
         }
-        initial_conditions = [
-            variable == lower_bound
-            if not is_range else
-            (
-                ari.dec(lower_bound) <= variable
-                if include_lower else
-                ari.dec(lower_bound) < variable  # FIXME GERETTI: this breaks Ariadne
-            ) & (
-                variable <= ari.dec(upper_bound)
-                if include_upper else
-                variable < ari.dec(upper_bound)  # FIXME GERETTI: this breaks Ariadne
-            )
-            for variable, is_range, lower_bound, upper_bound, include_lower, include_upper
-            in zip([ari.RealVariable(var) for var in app_logic.current_variables], are_range, lower_bounds, upper_bounds, include_lowers, include_uppers)
-        ]
-        
-        initial_set = ari.HybridBoundedConstraintSet(initial_location, initial_conditions)
-        final_time = ari.HybridTime(ari.dec(float(final_time)), int(max_transitions))
         app_logic.state = EvolutionState.READY
     except Exception as ex:
-        # PyAriadne errors, should never happen though...
-        app_logic.state = EvolutionState.ERROR
-        return 'Error configuring!', f'{ex}'
-    
-    try:
-        # let the system evolve over the given time
-        print('Evolving...', end='')
-        app_logic.run_evolution(initial_set, final_time)
-        app_logic.state = EvolutionState.DONE
-        print('done')
-    except Exception as ex:
-        # PyAriadne errors, should never happen though...
+        # invalid values, should never happen though...
         app_logic.state = EvolutionState.ERROR
-        return 'Error evolving!', f'{ex}'
+        return 'Error configuring!', f'{ex}', ''
     
-    print('WIP: save computed orbit as YAML')
-    # try:
-    #     print('Dumping to file...', end='')
-    #     app_logic.save_orbit()
-    #     print('done')
-    # except Exception as ex:
-    #     app_logic.state = EvolutionState.ERROR
-    #     return 'Error dumping!', f'{ex}'
+    # let the system evolve over the given time, in background
+    budgets = {'wall_seconds': wall_seconds, 'max_rss_mb': max_rss_mb, 'max_enclosures': max_enclosures}
+    app_logic.start_evolution(preview_points, subdivisions=int(subdivisions or 1), budgets=budgets)
+    return 'Evolving...', '', app_logic.telemetry_summary()
+
+
+# the run state shown for the end of an evolution
+_STATE_MESSAGES = {
+    EvolutionState.ERROR: 'Error evolving!',
+    EvolutionState.BUDGET_EXCEEDED: 'Budget exceeded, evolution stopped',
+    EvolutionState.DONE: 'Done'
+}
+
+
+def _poll_system_evolution():
+    if app_logic.state == EvolutionState.EVOLVING:
+        if app_logic.poll_preview():
+            # enables the trajectory plotter on the simulated trajectories
+            return 'Simulation ready, evolving...', dash.no_update, app_logic.telemetry_summary()
+        return dash.no_update, dash.no_update, app_logic.telemetry_summary()
     
-    return 'Done', ''
+    # only notify the end of the evolution once, since changing the state enables the trajectory plotter
+    state = app_logic.poll_evolution()
+    if state in _STATE_MESSAGES:
+        return _STATE_MESSAGES[state], app_logic.error, app_logic.telemetry_summary()
+    raise dash.exceptions.PreventUpdate
 
 
 @app.callback(
@@ -584,13 +1680,18 @@ def run_system_evolution(_, __, final_time, max_transitions, locations, are_rang
     Input('run-state', 'children')
 )
 def enable_trajectory_plotter(_):
-    if app_logic.state == EvolutionState.DONE:
+    if app_logic.state == EvolutionState.DONE or app_logic.has_trajectories():
         options = [{'label': i, 'value': i} for i in sorted(app_logic.all_variables_names)]
         return 'available', options, options, options
     else:
         return 'unavailable', [], [], []
 
 
+def _uses_bounding_boxes(render_mode):
+    # boxes are only available for the evolution, the simulation preview is always drawn as is
+    return render_mode in ('boxes', 'error_bars') and app_logic.state == EvolutionState.DONE
+
+
 @app.callback(
     Output('time-slider', 'max'),
     Output('time-slider', 'step'),
@@ -598,53 +1699,381 @@ def enable_trajectory_plotter(_):
     Input('x-variable', 'value'),
     Input('y-variable', 'value'),
     Input('z-variable', 'value'),
+    Input('overlay-preview-selector', 'value'),
+    Input('render-mode-selector', 'value'),
+    # the simulation preview is replaced by the evolution when ready
+    Input('run-state', 'children'),
     prevent_initial_call=True
 )
-def update_time_slider(var_x, var_y, var_z):
-    if var_x is None or var_y is None:
+def update_time_slider(var_x, var_y, var_z, overlay_preview, render_mode, _):
+    if var_x is None or var_y is None or not app_logic.has_trajectories():
         raise dash.exceptions.PreventUpdate
     
     try:
-        print('Extracting projections...', end='')
         var_list = [var_x, var_y] + ([var_z] if var_z else [])
-        # TODO for some strange reason, asking the orbit here returns an exit(245)
-        #  no idea why though, the trajectory_plotter.py works...
-        app_logic.extract_projections(var_list)
+        if _uses_bounding_boxes(render_mode):
+            # a single box query per enclosure, whatever the number of variables
+            print('Extracting bounding boxes...', end='')
+            data = app_logic.extract_bounding_boxes(var_list)
+        else:
+            print('Extracting projections...', end='')
+            # the orbit lives in the worker, so a pyariadne crash here (it used to exit(245)) only restarts the worker
+            data = app_logic.extract_projections(var_list, overlay_preview=bool(overlay_preview))
         print('done')
     except Exception as ex:
-        # should never happen, just in case...
+        # e.g. the worker crashed meanwhile
+        print(f'failed ({ex})')
         return 0, 0, [0, 0]
     
-    range_max_val = app_logic.polytopes['_time'].max()
+    range_max_val = data['_time'].max()
     return range_max_val, range_max_val / 100, [0, range_max_val]
 
 
 @app.callback(
     Output('trajectory-graph', 'figure'),
+    Output('polytopes-info', 'children'),
     Input('time-slider', 'value'),
     Input('use_mesh-selector', 'value'),
+    Input('prune-subsumed-selector', 'value'),
+    Input('simplify-tolerance', 'value'),
+    Input('playback-selector', 'value'),
     State('x-variable', 'value'),
     State('y-variable', 'value'),
     State('z-variable', 'value'),
+    State('render-mode-selector', 'value'),
     prevent_initial_call=True
 )
-def update_trajectory_plot(selected_time, use_mesh, var_x, var_y, var_z):
+def update_trajectory_plot(selected_time, use_mesh, prune, tolerance_px, playback, var_x, var_y, var_z, render_mode):
+    from backend.plotting_backend import animation_frame_edges, plot_bounding_boxes, plot_envelopes, plot_trajectory, plot_trajectory_animation
+    
+    if app_logic.polytopes is None and app_logic.boxes is None:
+        raise dash.exceptions.PreventUpdate
+    
+    if _uses_bounding_boxes(render_mode) and app_logic.boxes is not None:
+        boxes_df = app_logic.boxes[(selected_time[0] <= app_logic.boxes['_time']) & (app_logic.boxes['_time'] <= selected_time[1])]
+        return plot_bounding_boxes(boxes_df, var_x, var_y, var_z, use_error_bars=(render_mode == 'error_bars')), ''
+    
     polytopes_df = app_logic.polytopes[(selected_time[0] <= app_logic.polytopes['_time']) & (app_logic.polytopes['_time'] <= selected_time[1])]
-    return plot_trajectory(polytopes_df, var_x, var_y, var_z, use_mesh)
+    if render_mode == 'envelope':
+        # the size of the bands depends on the time resolution only, whatever the number of enclosures
+        if var_x == 't' and var_z is None and var_y != 't':
+            return plot_envelopes(app_logic.extract_envelopes(var_y, polytopes_df), var_y), ''
+        info = ['envelopes are only available for (t, var) plots']
+    else:
+        info = []
+    animate = playback and render_mode == 'polytopes' and not use_mesh
+    # the frames are fixed before the reduction, so that a polytope is only pruned by one appearing along with it
+    edges = animation_frame_edges(polytopes_df, [var_x, var_y] + ([var_z] if var_z else []), app_logic.animation_max_frames) if animate else None
+    # only the 2D polytopes can be reduced, the (t, x, y) plots are made of collapsed points; the pruning loses the inner outlines, so it's opt-in
+    if var_z is None and not polytopes_df.empty and (prune or tolerance_px):
+        polytopes_df, prune_stats, simplify_stats = app_logic.reduce_projections(polytopes_df, var_x, var_y, bool(prune), tolerance_px, edges)
+        if prune_stats is not None:
+            info.append(f'{prune_stats["polytopes_before"]} \u2192 {prune_stats["polytopes_after"]} polytopes')
+        if simplify_stats is not None:
+            info.append(f'{simplify_stats["vertices_before"]} \u2192 {simplify_stats["vertices_after"]} vertices (-{simplify_stats["reduction"]:.0%})')
+    if animate:
+        # the frames are played in the browser, the time slider only bounds them
+        return plot_trajectory_animation(polytopes_df, var_x, var_y, var_z, app_logic.animation_max_frames, edges), ', '.join(info)
+    return plot_trajectory(polytopes_df, var_x, var_y, var_z, use_mesh), ', '.join(info)
+
+
+def _format_enclosures(enclosures, max_shown=20):
+    import pandas as pd
+    
+    lines = []
+    variables = [column[:-len('_lower')] for column in enclosures.columns if column.endswith('_lower') and not column.startswith('_')]
+    for row in enclosures.head(max_shown).to_dict('records'):
+        # the simulated curves have no time range
+        if pd.notna(row.get('_time_lower')):
+            lines.append(f'#{row["_polytope_id"]} {row["_loc"]}, t \u2208 [{row["_time_lower"]:.4g}, {row["_time"]:.4g}]')
+        else:
+            lines.append(f'#{row["_polytope_id"]} {row["_loc"]}, t \u2264 {row["_time"]:.4g}')
+        if row.get('_events'):
+            lines.append(f'  events: {row["_events"]}')
+        lines += [
+            f'  {var} \u2208 [{row[f"{var}_lower"]:.6g}, {row[f"{var}_upper"]:.6g}]'
+            for var in variables if pd.notna(row[f'{var}_lower'])
+        ]
+    if len(enclosures) > max_shown:
+        lines.append(f'... and {len(enclosures) - max_shown} more')
+    return '\n'.join(lines)
+
+
+@app.callback(
+    Output('inspector-info', 'children'),
+    Input('trajectory-graph', 'clickData'),
+    Input('trajectory-graph', 'selectedData'),
+    State('time-slider', 'value'),
+    State('z-variable', 'value'),
+    prevent_initial_call=True
+)
+def inspect_trajectory_plot(click_data, selected_data, selected_time, var_z):
+    trigger = dash.callback_context.triggered[0]['prop_id'].split('.')[1]
+    if var_z is not None or app_logic.spatial_index is None:
+        return 'Only available for 2D plots of the polytopes'
+    if trigger == 'clickData' and click_data and click_data.get('points'):
+        point = click_data['points'][0]
+        x_range, y_range = (point['x'], point['x']), (point['y'], point['y'])
+    elif trigger == 'selectedData' and selected_data and 'range' in selected_data:
+        x_range, y_range = selected_data['range']['x'], selected_data['range']['y']
+    else:
+        raise dash.exceptions.PreventUpdate
+    
+    started = time.perf_counter()
+    try:
+        enclosures = app_logic.inspect(sorted(x_range), sorted(y_range), selected_time)
+    except (WorkerCrashed, WorkerError) as ex:
+        return f'Cannot extract the bounds: {ex}'.splitlines()[0]
+    elapsed = time.perf_counter() - started
+    return f'{len(enclosures)} enclosures found in {1000 * elapsed:.0f}ms\n\n' + _format_enclosures(enclosures)
+
+
+@app.callback(
+    Output('reach-state', 'children'),
+    Input('run-reach', 'n_clicks'),
+    Input('run-telemetry-interval', 'n_intervals'),
+    prevent_initial_call=True
+)
+def run_reachability(_, __):
+    trigger = dash.callback_context.triggered[0]['prop_id'].split('.')[0]
+    if trigger == 'run-telemetry-interval':
+        # report only once when the analysis ends, to avoid redrawing the plot at every poll
+        if not app_logic.poll_reachability():
+            raise dash.exceptions.PreventUpdate
+        return 'Done' if not app_logic.reach_error else f'Error computing reachability! {app_logic.reach_error}'
+    
+    if app_logic.is_reachability_running():
+        return 'Computing upper reach and outer chain reach...'
+    if app_logic.run_spec is None:
+        return 'Configure and run an evolution first'
+    if app_logic.system_spec is None:
+        return 'The system factory is unknown, cannot run the analysis in background'
+    app_logic.start_reachability()
+    return 'Computing upper reach and outer chain reach...'
+
+
+@app.callback(
+    Output('matrix-time-slider', 'max'),
+    Output('matrix-time-slider', 'step'),
+    Output('matrix-time-slider', 'value'),
+    Output('matrix-state', 'children'),
+    Input('show-scatter-matrix', 'n_clicks'),
+    State('matrix-variables', 'value'),
+    prevent_initial_call=True
+)
+def update_scatter_matrix_store(_, variables):
+    if len([var for var in variables or [] if var != 't']) < 2:
+        return 0, 0, [0, 0], 'select at least two variables'
+    if not app_logic.has_evolution():
+        return 0, 0, [0, 0], 'no evolution available'
+    
+    started = time.perf_counter()
+    try:
+        store = app_logic.extract_scatter_matrix(variables)
+    except (WorkerCrashed, WorkerError) as ex:
+        return 0, 0, [0, 0], f'extraction failed: {ex}'.splitlines()[0]
+    elapsed = time.perf_counter() - started
+    pairs = len(app_logic.matrix_variables) * (len(app_logic.matrix_variables) - 1) // 2
+    range_max_val = store.polytopes['_time'].max() if not store.polytopes.empty else 0
+    return range_max_val, range_max_val / 100, [0, range_max_val], f'{pairs} pairs extracted in {elapsed:.1f}s'
+
+
+@app.callback(
+    Output('scatter-matrix-graph', 'figure'),
+    Input('matrix-time-slider', 'value'),
+    prevent_initial_call=True
+)
+def update_scatter_matrix_plot(selected_time):
+    from backend.plotting_backend import plot_scatter_matrix
+    
+    # the time window only filters the extracted store
+    if app_logic.matrix_store is None or len(app_logic.matrix_variables) < 2:
+        raise dash.exceptions.PreventUpdate
+    return plot_scatter_matrix(app_logic.matrix_store, app_logic.matrix_variables, selected_time)
+
+
+def _format_tuning_results(results, recommendation):
+    import pandas as pd
+    
+    front = pareto_front(results)
+    if not front:
+        return 'Every probe failed' if results else ''
+    rows = [
+        dict({'': '*' if result is recommendation else ''}, **result['settings'], **{objective: result[objective] for objective in TUNING_OBJECTIVES})
+        for result in sorted(front, key=lambda r: r['wall_seconds'])
+    ]
+    failed = sum(1 for result in results if result['error'] is not None)
+    return f'Pareto front of {len(results)} probes ({failed} failed), * is recommended:\n' + \
+        pd.DataFrame(rows).to_string(index=False, float_format=lambda value: f'{value:.4g}')
+
+
+@app.callback(
+    Output('tuning-state', 'children'),
+    Output('tuning-results', 'children'),
+    Input('run-tuning', 'n_clicks'),
+    Input('run-telemetry-interval', 'n_intervals')
+)
+def run_evolver_tuning(_, __):
+    if not dash.callback_context.triggered:
+        # show the results of the last tuning of the system for the configured run, if any
+        if app_logic.tuning_results is None:
+            return '', ''
+        return 'Last tuning', _format_tuning_results(app_logic.tuning_results, app_logic.tuning_recommendation)
+    
+    trigger = dash.callback_context.triggered[0]['prop_id'].split('.')[0]
+    if trigger == 'run-telemetry-interval':
+        # report only once when the tuning ends
+        if not app_logic.poll_tuning():
+            raise dash.exceptions.PreventUpdate
+        state = 'Done' if not app_logic.tuning_error else f'Error tuning! {app_logic.tuning_error}'
+        return state, _format_tuning_results(app_logic.tuning_results, app_logic.tuning_recommendation)
+    
+    if app_logic.is_tuning_running():
+        return 'Probing evolver settings...', dash.no_update
+    if app_logic.run_spec is None:
+        return 'Configure and run an evolution first', dash.no_update
+    if app_logic.system_spec is None:
+        return 'The system factory is unknown, cannot run the probes in background', dash.no_update
+    app_logic.start_tuning()
+    return 'Probing evolver settings...', ''
+
+
+@app.callback(
+    Output('property-results', 'children'),
+    Input('run-property-check', 'n_clicks'),
+    State('property-specs', 'value'),
+    prevent_initial_call=True
+)
+def run_property_check(_, specs):
+    import json
+    from backend.property_checker import format_results
+    
+    if app_logic.state != EvolutionState.DONE:
+        return 'Run an evolution first'
+    try:
+        properties = json.loads(specs or '[]')
+    except ValueError as ex:
+        return f'Invalid properties: {ex}'
+    if not isinstance(properties, list):
+        return 'The properties must be a list'
+    try:
+        return format_results(app_logic.check_properties(properties))
+    except (WorkerCrashed, WorkerError) as ex:
+        return f'Cannot extract the bounding boxes: {ex}'.splitlines()[0]
+
+
+@app.callback(
+    Output('evolver-settings', 'children'),
+    Input('apply-tuning', 'n_clicks')
+)
+def apply_evolver_tuning(n_clicks):
+    applied = bool(n_clicks) and app_logic.apply_tuning()
+    settings = '\n'.join(f'{name}: {"default" if value is None else value}' for name, value in app_logic.evolver_settings.items())
+    return ('Recommendation applied\n' if applied else 'Current settings\n') + settings
+
+
+@app.callback(
+    Output('reach-graph', 'figure'),
+    Input('reach-kind', 'value'),
+    Input('reach-x-variable', 'value'),
+    Input('reach-y-variable', 'value'),
+    Input('reach-state', 'children'),
+    prevent_initial_call=True
+)
+def update_reach_plot(kind, var_x, var_y, _):
+    from backend.reachability import cells_to_raster, plot_reach_raster
+    
+    if var_x is None or var_y is None or kind not in app_logic.reach_cells:
+        raise dash.exceptions.PreventUpdate
+    raster = cells_to_raster(app_logic.reach_cells[kind], var_x, var_y)
+    if raster is None:
+        return {'data': [], 'layout': {}}
+    return plot_reach_raster(raster, var_x, var_y)
 
 
 @app.callback(
     Output('automaton-plot', 'children'),
     Input('automaton-selector', 'value'),
+    State({'type': 'config-init-location', 'index': ALL}, 'value'),
     prevent_initial_call=True
 )
-def update_automaton_graph(selected_automaton):
+def update_automaton_graph(selected_automaton, locations):
     if selected_automaton is None:
         raise dash.exceptions.PreventUpdate
-    graph = app_logic.automatons_graphs[selected_automaton]
+    from backend.plotting_backend import plot_automaton
+    
+    if selected_automaton == PRODUCT_GRAPH:
+        # the exploration starts from the initial locations chosen in the configurator, if any
+        start = {automaton_name: location for automaton_name, location in zip(app_logic.configurable_automatons, locations) if location is not None}
+        product_graph = app_logic.reset_product_graph(start)
+        graph, info = product_graph.elements(), product_graph.summary()
+    else:
+        graph, info = app_logic.automatons_graphs[selected_automaton], ''
     cyto = plot_automaton(graph)
     setattr(cyto, 'style', {'width': '100%', 'height': '500px'})
-    return cyto
+    return [cyto, html.Plaintext(info, id='automaton-product-info')]
+
+
+@app.callback(
+    Output('automaton-cytoscape', 'elements'),
+    Output('automaton-product-info', 'children'),
+    Input('automaton-cytoscape', 'tapNodeData'),
+    State('automaton-selector', 'value'),
+    prevent_initial_call=True
+)
+def expand_product_graph(node_data, selected_automaton):
+    # only the product graph is expanded on tap, the graphs of the single automata are complete
+    if node_data is None or selected_automaton != PRODUCT_GRAPH or app_logic.product_graph is None:
+        raise dash.exceptions.PreventUpdate
+    app_logic.product_graph.expand_id(node_data['id'])
+    return app_logic.product_graph.elements(), app_logic.product_graph.summary()
+
+
+@app.callback(
+    Output('automaton-cytoscape', 'stylesheet'),
+    Input('automaton-activity-selector', 'value'),
+    Input('automaton-plot', 'children'),
+    Input('run-state', 'children'),
+    State('automaton-selector', 'value'),
+    prevent_initial_call=True
+)
+def update_automaton_activity(show_activity, _, __, selected_automaton):
+    # only the style changes, so the graph is not rebuilt and keeps its zoom and expansions
+    from backend.orbit_activity import activity_stylesheet, component_activity, product_activity
+    from backend.plotting_backend import AUTOMATON_STYLESHEET
+    
+    if selected_automaton is None:
+        raise dash.exceptions.PreventUpdate
+    if 'show' not in (show_activity or []) or app_logic.state != EvolutionState.DONE:
+        return AUTOMATON_STYLESHEET
+    try:
+        activity = app_logic.orbit_activity()
+    except (WorkerCrashed, WorkerError) as ex:
+        print(f'Cannot compute the orbit activity: {ex}')
+        return AUTOMATON_STYLESHEET
+    if activity is None:
+        return AUTOMATON_STYLESHEET
+    if selected_automaton == PRODUCT_GRAPH:
+        nodes, edges = product_activity(activity, app_logic.automatons_analysis.keys())
+        labels = {
+            node: app_logic.product_graph.label(tuple(tuple(part.split('|', 1)) for part in node.split(',')))
+            for node in nodes
+        } if app_logic.product_graph is not None else None
+    else:
+        nodes, edges = component_activity(activity, selected_automaton)
+        labels = None
+    return AUTOMATON_STYLESHEET + activity_stylesheet(nodes, edges, labels)
+
+
+@app.callback(
+    Output('memory-report', 'children'),
+    Input('refresh-memory', 'n_clicks'),
+    prevent_initial_call=True
+)
+def update_memory_report(_):
+    from backend.memory_accounting import format_memory_report
+    
+    return format_memory_report(app_logic.memory_report())
 
 
 # TODO display info when tapping the graph
@@ -666,7 +2095,11 @@ def update_automaton_graph(selected_automaton):
 #     return str(edge_data)
 
 
-def launch(debug=False):
+def launch(debug=False, system=DEFAULT_SYSTEM, budgets=None, memory_budgets=None, trace_memory=False):
+    if trace_memory:
+        from backend.memory_accounting import start_tracing
+        start_tracing()
+    load_system(system, budgets, memory_budgets)
     app.run_server(debug=debug)
 
 
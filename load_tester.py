@@ -0,0 +1,79 @@
+import argparse
+import json
+import sys
+
+from backend.load_testing import DEFAULT_MIX, FlaskTransport, HttpTransport, compare_reports, format_report, run_load_test
+
+
+def parse_pairs(items, separator='='):
+    return dict(item.split(separator, 1) for item in items)
+
+
+def parse_value(text):
+    # a single value or a lower:upper range
+    if ':' in text:
+        lower, upper = text.split(':', 1)
+        return [float(lower), float(upper)]
+    return float(text)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Ariadne Dashboard load tester')
+    parser.add_argument('--url', dest='url', type=str, default=None, help='base URL of a running dashboard, e.g. http://127.0.0.1:8050')
+    parser.add_argument('--system', dest='system', type=str, default=None,
+                        help='hybrid system to load in this process, as a module:factory pair, instead of a running dashboard')
+    parser.add_argument('-u', dest='users', type=int, default=4, help='number of concurrent virtual users')
+    parser.add_argument('-n', dest='sessions', type=int, default=5, help='number of interaction scripts run by each user')
+    parser.add_argument('--mix', dest='mix', nargs='+', default=None,
+                        help=f'weights of the interaction scripts as script=weight (default: {" ".join(f"{k}={v}" for k, v in DEFAULT_MIX.items())})')
+    parser.add_argument('--seed', dest='seed', type=int, default=0, help='seed of the choices of the users')
+    parser.add_argument('--think-time', dest='think_time', type=float, nargs=2, default=[0.0, 0.0], metavar=('MIN', 'MAX'),
+                        help='pause between two scripts of a user, in seconds')
+    parser.add_argument('--final-time', dest='final_time', type=float, default=None, help='final time of the evolutions')
+    parser.add_argument('--max-transitions', dest='max_transitions', type=int, default=None, help='maximum number of transitions of the evolutions')
+    parser.add_argument('--location', dest='locations', action='append', default=[], help='initial location as automaton=location')
+    parser.add_argument('--init', dest='values', action='append', default=[], help='initial value as variable=value or variable=lower:upper')
+    parser.add_argument('--save', dest='save', type=str, default=None, help='save the report to this JSON file')
+    parser.add_argument('--baseline', dest='baseline', type=str, default=None, help='compare the p95 latencies with a previously saved report')
+    parser.add_argument('--tolerance', dest='tolerance', type=float, default=0.2, help='relative slowdown allowed by the comparison (default: 0.2)')
+    
+    args = parser.parse_args()
+    if (args.url is None) == (args.system is None):
+        parser.error('specify either --url or --system')
+    evolution = None
+    if args.values:
+        if args.final_time is None or args.max_transitions is None:
+            parser.error('the evolutions need --final-time and --max-transitions')
+        evolution = {
+            'final_time': args.final_time,
+            'max_transitions': args.max_transitions,
+            'locations': parse_pairs(args.locations),
+            'values': {var: parse_value(value) for var, value in parse_pairs(args.values).items()}
+        }
+    
+    if args.url is not None:
+        def make_transport():
+            return HttpTransport(args.url)
+    else:
+        import dashboard.ariadne_dashboard as dashboard
+        
+        dashboard.load_system(args.system).join()
+        if dashboard.app_logic is None:
+            sys.exit(f'Cannot load system {args.system}')
+        
+        def make_transport():
+            return FlaskTransport(dashboard.app.server)
+    
+    mix = {name: float(weight) for name, weight in parse_pairs(args.mix).items()} if args.mix else None
+    report = run_load_test(make_transport, args.users, args.sessions, mix, args.seed, tuple(args.think_time), evolution)
+    print(format_report(report))
+    if args.save:
+        with open(args.save, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare_reports(report, json.load(baseline_file), args.tolerance)
+        for name, previous, current in regressions:
+            print(f'REGRESSION {name}: p95 {previous:.1f}ms -> {current:.1f}ms')
+        # a non-zero exit code on regressions, for scripts and CI
+        sys.exit(1 if regressions else 0)
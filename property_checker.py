@@ -0,0 +1,41 @@
+import argparse
+import sys
+
+import pandas as pd
+
+from backend.property_checker import check_properties, extract_orbit_boxes, format_results, load_properties
+from backend.systems_loader import evolve_system_module
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Ariadne orbit property checker')
+    parser.add_argument('--module', dest='module', type=str, default=None,
+                        help='system module to evolve (providing get_system, get_initial_set, get_final_time, create_evolver and compute_evolution)')
+    parser.add_argument('--boxes', dest='boxes', type=str, default=None, help='bounding boxes previously saved with --save-boxes')
+    parser.add_argument('-p', dest='properties', type=str, default=None,
+                        help='JSON file with the list of properties (default: the PROPERTIES of the module, if any)')
+    parser.add_argument('--save-boxes', dest='save_boxes', type=str, default=None, help='save the bounding boxes of the orbit to this file')
+    
+    args = parser.parse_args()
+    if (args.module is None) == (args.boxes is None):
+        parser.error('specify either --module or --boxes')
+    
+    properties = load_properties(args.properties) if args.properties else None
+    if args.boxes is not None:
+        boxes = pd.read_pickle(args.boxes)
+    else:
+        import importlib
+        
+        print(f'Evolving {args.module}...')
+        orbit, variables = evolve_system_module(args.module)
+        boxes = extract_orbit_boxes(orbit, variables)
+        if args.save_boxes:
+            boxes.to_pickle(args.save_boxes)
+        if properties is None:
+            properties = getattr(importlib.import_module(args.module), 'PROPERTIES', None)
+    if properties is None:
+        parser.error('specify the properties to check with -p')
+    
+    results = check_properties(boxes, properties)
+    print(format_results(results))
+    # a non-zero exit code when any property is violated (or can't be checked), for scripts and CI
+    sys.exit(0 if all(result['satisfied'] for result in results) else 1)
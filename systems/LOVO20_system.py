@@ -54,6 +54,12 @@ def get_initial_set():
     return initial_set
 
 
+def get_final_time():
+    # Define the final time: continuous time and maximum number of transitions
+    final_time = HybridTime(dec(3.64), 3)
+    return final_time
+
+
 def create_evolver(automaton):
     # Create a GeneralHybridEvolver object
     integrator = TaylorPicardIntegrator(1e-5)
@@ -68,6 +74,20 @@ def create_evolver(automaton):
     return evolver
 
 
+def compute_evolution(evolver, initial_set, final_time):
+    # Compute the evolution flow tube using upper semantics
+    return evolver.orbit(initial_set, HybridTerminationCriterion(final_time), Semantics.UPPER)
+
+
+# the properties checked by `verify(*)`, in the format of the property checker
+PROPERTIES = [
+    {'name': 'a final set with zero transitions exists', 'kind': 'exists', 'over': 'final', 'transitions': 0},
+    {'name': 'a final set with two transitions exists', 'kind': 'exists', 'over': 'final', 'transitions': 2},
+    {'name': 'the trajectory stays in the reference circle for at most 0.2 time units', 'kind': 'bounds', 'over': 'final',
+     'box': {'cnt': [None, 0.2]}}
+]
+
+
 def get_circle_orbit():
     x = RealVariable("x")
     y = RealVariable("y")
@@ -107,36 +127,22 @@ def plot_all(LOVO20_orbit, circle_orbit):
 
 
 def verify(orbit):
-    has_any_zero_transitions = False
-    has_any_two_transitions = False
-    
-    for enclosure in orbit.final():
-        if (not has_any_zero_transitions) and len(enclosure.previous_events()) == 0:
-            has_any_zero_transitions = True
-        if (not has_any_two_transitions) and len(enclosure.previous_events()) == 2:
-            has_any_two_transitions = True
-    
-    if has_any_zero_transitions:
-        print("A final set with zero transitions has been found correctly.")
-    else:
-        print("No final set with zero transitions has been found!")
+    # imported here, so that the module can be loaded as a system without the dashboard backend
+    from backend.property_checker import check_properties, extract_orbit_boxes, format_results
     
-    if has_any_two_transitions:
-        print("A final set with two transitions has been found correctly.")
-    else:
-        print("No final set with two transitions has been found!")
-    
-    x = RealVariable("x")
-    y = RealVariable("y")
-    cnt = RealVariable("cnt")
-    
-    final_bounds = orbit.final().bounding_box()
-    
-    print("Trajectory stays in the reference circle for at most", final_bounds[cnt].upper_bound(), "time units: ", end='')
-    print("constraint satisfied") if final_bounds[cnt].upper_bound().raw() <= FloatDP(0.2, DoublePrecision()) else print("constraint NOT satisfied!")
+    results = check_properties(extract_orbit_boxes(orbit, ['cnt']), PROPERTIES)
+    print(format_results(results))
+    return results
 
 
 if __name__ == '__main__':
+    import os
+    import sys
+    
+    # `verify(*)` needs the dashboard backend: when run as `python systems/LOVO20_system.py`, only systems/ is in the path, so the root of the
+    # repository is added too (running `python -m systems.LOVO20_system` from the root works either way)
+    sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    
     # Get the system
     LOVO20 = get_automaton()
     print(LOVO20)
@@ -146,14 +152,14 @@ if __name__ == '__main__':
     print("initial_set =", initial_set)
     
     # Get the final time
-    final_time = HybridTerminationCriterion(dec(3.64), 3)
+    final_time = get_final_time()
     
     # Create an evolver object
     evolver = create_evolver(LOVO20)
     print("evolver.configuration() =", evolver.configuration())
     
     # Compute the evolution
-    LOVO20_orbit = evolver.orbit(initial_set, final_time, Semantics.UPPER)
+    LOVO20_orbit = compute_evolution(evolver, initial_set, final_time)
     
     # Check number of events
     verify(LOVO20_orbit)
@@ -0,0 +1,180 @@
+#!/usr/bin/python3
+
+# A scalable synthetic system, to stress test the dashboard, the analyses and the extractions with large inputs.
+#
+# The system is the composition of `components` automata, each with `locations` locations visited in a ring, `variables` continuous variables
+# relaxing towards a different value in each location, and a clock deciding when the component moves on. The ring transitions are urgent; with
+# `density` > 0, a fraction of the other pairs of locations gets a permissive transition too, which makes the evolution branch. Component i also
+# reads the first variable of component i - 1 (`coupling`), so that the components don't evolve independently.
+#
+# The size is read from the ARIADNE_SYNTHETIC environment variable (e.g. "components=8,locations=5,variables=2,density=0.2"), which is inherited
+# by the worker processes rebuilding the system from 'systems.synthetic_system:get_system'; the functions also accept explicit overrides. Since the
+# source of the module is the same for every size, the parameters are exposed by `cache_parameters()` for the cached analyses and tunings.
+
+import os
+import random
+
+from pyariadne import *
+
+DEFAULT_PARAMETERS = {
+    'components': 4,
+    'locations': 3,
+    'variables': 1,
+    'density': 0.0,
+    'coupling': 0.1,
+    'final_time': 5.0,
+    'max_transitions': 8,
+    'seed': 0
+}
+
+
+def get_parameters(**overrides):
+    # defaults, then the environment, then the explicit overrides
+    parameters = dict(DEFAULT_PARAMETERS)
+    for item in filter(None, os.environ.get('ARIADNE_SYNTHETIC', '').split(',')):
+        name, _, value = item.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_PARAMETERS:
+            raise ValueError(f'unknown synthetic system parameter "{name}", expected one of {", ".join(DEFAULT_PARAMETERS)}')
+        parameters[name] = type(DEFAULT_PARAMETERS[name])(value.strip())
+    parameters.update({name: value for name, value in overrides.items() if value is not None})
+    if parameters['components'] < 1 or parameters['locations'] < 2 or parameters['variables'] < 1:
+        raise ValueError('the synthetic system needs at least 1 component, 2 locations and 1 variable')
+    return parameters
+
+
+def cache_parameters():
+    # the parameters of the system built by `get_system()`, part of the key of its cached analysis (see `cache_key()`)
+    return get_parameters()
+
+
+def _component_plan(parameters, component):
+    # the random choices of a component, independent of the other components so that the systems of different sizes share them
+    rng = random.Random(f'{parameters["seed"]}:{component}')
+    locations = parameters['locations']
+    plan = {
+        'rates': [[rng.uniform(0.5, 1.5) for _ in range(parameters['variables'])] for _ in range(locations)],
+        'dwell': [rng.uniform(0.5, 1.5) for _ in range(locations)],
+        'extra': []
+    }
+    for source in range(locations):
+        for target in range(locations):
+            if target not in (source, (source + 1) % locations) and rng.random() < parameters['density']:
+                # enabled a bit before the ring transition, which is urgent
+                plan['extra'].append((source, target, plan['dwell'][source] * rng.uniform(0.5, 0.9)))
+    return plan
+
+
+def _target_value(location, var_index):
+    # the value the variables relax to in a location, alternating between low and high
+    return (1 + var_index) * (2 if location % 2 else 1)
+
+
+def get_component(component, parameters=None):
+    parameters = parameters or get_parameters()
+    plan = _component_plan(parameters, component)
+    
+    # Declare the variables: the continuous ones, the clock and the one of the automaton name
+    variables = [RealVariable(f"x{component}_{k}") for k in range(parameters['variables'])]
+    clock = RealVariable(f"clk{component}")
+    previous = RealVariable(f"x{component - 1}_0") if component > 0 and parameters['coupling'] else None
+    name = StringVariable(f"comp{component}")
+    automaton = HybridAutomaton(name.name())
+    
+    locations = [DiscreteLocation({name: f"l{j}"}) for j in range(parameters['locations'])]
+    coupling = RealConstant(f"coupling{component}", dec(parameters['coupling']))
+    for j, location in enumerate(locations):
+        dynamics = []
+        for k, var in enumerate(variables):
+            rate = RealConstant(f"rate{component}_{j}_{k}", dec(round(plan['rates'][j][k], 3)))
+            target = RealConstant(f"target{component}_{j}_{k}", _target_value(j, k))
+            derivative = rate * (target - var)
+            if previous is not None and k == 0:
+                derivative = derivative + coupling * (previous - var)
+            dynamics.append(dot(var) << derivative)
+        automaton.new_mode(location, dynamics + [dot(clock) << 1])
+    
+    # Every transition keeps the variables and resets the clock; the event names are prefixed by the component, since the shared events would
+    # synchronize the components
+    resets = [next(var) << var for var in variables] + [next(clock) << 0]
+    for j, location in enumerate(locations):
+        dwell = RealConstant(f"dwell{component}_{j}", dec(round(plan['dwell'][j], 3)))
+        automaton.new_transition(location, DiscreteEvent(f"c{component}_next{j}"), locations[(j + 1) % len(locations)], resets, clock >= dwell,
+                                 URGENT)
+    for source, target, dwell_value in plan['extra']:
+        dwell = RealConstant(f"dwell{component}_{source}_{target}", dec(round(dwell_value, 3)))
+        automaton.new_transition(locations[source], DiscreteEvent(f"c{component}_jump{source}_{target}"), locations[target], resets,
+                                 clock >= dwell, PERMISSIVE)
+    
+    return automaton
+
+
+def get_system(**overrides):
+    # Create the composed automaton
+    parameters = get_parameters(**overrides)
+    system = CompositeHybridAutomaton("synthetic", [get_component(i, parameters) for i in range(parameters['components'])])
+    return system
+
+
+def get_initial_set(**overrides):
+    # Every component starts from its first location, with the variables in a small box around their target and the clock at zero
+    parameters = get_parameters(**overrides)
+    locations = {StringVariable(f"comp{i}"): String("l0") for i in range(parameters['components'])}
+    constraints = []
+    for i in range(parameters['components']):
+        for k in range(parameters['variables']):
+            var = RealVariable(f"x{i}_{k}")
+            constraints.append((dec(_target_value(0, k) - 0.05) <= var) & (var <= dec(_target_value(0, k) + 0.05)))
+        constraints.append(RealVariable(f"clk{i}") << 0)
+    initial_set = HybridBoundedConstraintSet(locations, constraints)
+    return initial_set
+
+
+def get_final_time(**overrides):
+    # Define the final time: continuous time and maximum number of transitions
+    parameters = get_parameters(**overrides)
+    final_time = HybridTime(dec(parameters['final_time']), parameters['max_transitions'])
+    return final_time
+
+
+def create_simulator(system):
+    # Create a simulator object
+    simulator = HybridSimulator(system)
+    simulator.configuration().set_step_size(0.01)
+    return simulator
+
+
+def compute_simulation(simulator, initial_set, final_time):
+    # Compute a simulation trajectory
+    orbit = simulator.orbit(initial_set, HybridTerminationCriterion(final_time))
+    return orbit
+
+
+def create_evolver(system):
+    # Create a GeneralHybridEvolver object
+    evolver = GeneralHybridEvolver(system)
+    
+    # Set the evolver configuration
+    evolver.configuration().set_maximum_enclosure_radius(1.0)
+    evolver.configuration().set_maximum_step_size(0.1)
+    return evolver
+
+
+def compute_evolution(evolver, initial_set, final_time):
+    # Compute the evolution flow tube using upper semantics
+    return evolver.orbit(initial_set, HybridTerminationCriterion(final_time), Semantics.UPPER)
+
+
+if __name__ == '__main__':
+    import time
+    
+    parameters = get_parameters()
+    print("parameters =", parameters)
+    system = get_system()
+    initial_set = get_initial_set()
+    final_time = get_final_time()
+    evolver = create_evolver(system)
+    
+    started = time.perf_counter()
+    orbit = compute_evolution(evolver, initial_set, final_time)
+    print(f"{sum(1 for _ in orbit.reach())} enclosures, {sum(1 for _ in orbit.final())} final, in {time.perf_counter() - started:.1f}s")